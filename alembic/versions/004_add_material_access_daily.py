@@ -0,0 +1,35 @@
+"""Add daily material access rollups
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('material_access_daily',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('material_id', sa.Integer(), nullable=False),
+    sa.Column('access_date', sa.Date(), nullable=False),
+    sa.Column('access_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['material_id'], ['materials.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('material_id', 'access_date', name='uq_material_access_daily_material_date')
+    )
+    op.create_index(op.f('ix_material_access_daily_id'), 'material_access_daily', ['id'], unique=False)
+    op.create_index(op.f('ix_material_access_daily_access_date'), 'material_access_daily', ['access_date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_material_access_daily_access_date'), table_name='material_access_daily')
+    op.drop_index(op.f('ix_material_access_daily_id'), table_name='material_access_daily')
+    op.drop_table('material_access_daily')
\ No newline at end of file
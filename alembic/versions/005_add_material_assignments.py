@@ -0,0 +1,38 @@
+"""Add material assignments
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('material_assignments',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('material_id', sa.Integer(), nullable=False),
+    sa.Column('student_id', sa.Integer(), nullable=False),
+    sa.Column('assigned_by', sa.String(length=50), nullable=True),
+    sa.Column('assigned_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.ForeignKeyConstraint(['material_id'], ['materials.id'], ),
+    sa.ForeignKeyConstraint(['student_id'], ['students.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_material_assignments_id'), 'material_assignments', ['id'], unique=False)
+    op.create_index('ix_material_assignments_student_material', 'material_assignments', ['student_id', 'material_id'], unique=True)
+    op.create_index('ix_material_assignments_material_id', 'material_assignments', ['material_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_material_assignments_material_id', table_name='material_assignments')
+    op.drop_index('ix_material_assignments_student_material', table_name='material_assignments')
+    op.drop_index(op.f('ix_material_assignments_id'), table_name='material_assignments')
+    op.drop_table('material_assignments')
\ No newline at end of file
@@ -0,0 +1,39 @@
+"""Add material catalog columns and facet indexes
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('materials', sa.Column('instrument', sa.String(length=50), nullable=True))
+    op.add_column('materials', sa.Column('skill_level', sa.String(length=20), nullable=True))
+    op.add_column('materials', sa.Column('is_active', sa.Boolean(), nullable=True, server_default=sa.true()))
+    
+    op.create_index(op.f('ix_materials_file_type'), 'materials', ['file_type'], unique=False)
+    op.create_index(op.f('ix_materials_instructor'), 'materials', ['instructor'], unique=False)
+    op.create_index(op.f('ix_materials_instrument'), 'materials', ['instrument'], unique=False)
+    op.create_index(op.f('ix_materials_skill_level'), 'materials', ['skill_level'], unique=False)
+    op.create_index(op.f('ix_materials_is_active'), 'materials', ['is_active'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_materials_is_active'), table_name='materials')
+    op.drop_index(op.f('ix_materials_skill_level'), table_name='materials')
+    op.drop_index(op.f('ix_materials_instrument'), table_name='materials')
+    op.drop_index(op.f('ix_materials_instructor'), table_name='materials')
+    op.drop_index(op.f('ix_materials_file_type'), table_name='materials')
+    
+    op.drop_column('materials', 'is_active')
+    op.drop_column('materials', 'skill_level')
+    op.drop_column('materials', 'instrument')
\ No newline at end of file
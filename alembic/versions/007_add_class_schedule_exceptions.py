@@ -0,0 +1,42 @@
+"""Add per-occurrence exceptions for recurring class schedules
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('class_schedule_exceptions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('class_schedule_id', sa.Integer(), nullable=False),
+    sa.Column('original_date', sa.DateTime(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('new_date', sa.DateTime(), nullable=True),
+    sa.Column('new_duration_minutes', sa.Integer(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['class_schedule_id'], ['class_schedules.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('class_schedule_id', 'original_date', name='uq_class_schedule_exceptions_schedule_date')
+    )
+    op.create_index(op.f('ix_class_schedule_exceptions_id'), 'class_schedule_exceptions', ['id'], unique=False)
+    op.create_index(op.f('ix_class_schedule_exceptions_original_date'), 'class_schedule_exceptions', ['original_date'], unique=False)
+    op.create_index(op.f('ix_class_schedule_exceptions_new_date'), 'class_schedule_exceptions', ['new_date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_class_schedule_exceptions_new_date'), table_name='class_schedule_exceptions')
+    op.drop_index(op.f('ix_class_schedule_exceptions_original_date'), table_name='class_schedule_exceptions')
+    op.drop_index(op.f('ix_class_schedule_exceptions_id'), table_name='class_schedule_exceptions')
+    op.drop_table('class_schedule_exceptions')
\ No newline at end of file
@@ -0,0 +1,25 @@
+"""Add class schedule range indexes
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_class_schedules_instructor_class_date', 'class_schedules', ['instructor', 'class_date'], unique=False)
+    op.create_index('ix_class_schedules_student_class_date', 'class_schedules', ['student_id', 'class_date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_class_schedules_student_class_date', table_name='class_schedules')
+    op.drop_index('ix_class_schedules_instructor_class_date', table_name='class_schedules')
\ No newline at end of file
@@ -0,0 +1,31 @@
+"""Add receipt sequences
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('receipt_sequences',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('sequence_date', sa.String(length=8), nullable=False),
+    sa.Column('next_value', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('sequence_date')
+    )
+    op.create_index(op.f('ix_receipt_sequences_id'), 'receipt_sequences', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_receipt_sequences_id'), table_name='receipt_sequences')
+    op.drop_table('receipt_sequences')
\ No newline at end of file
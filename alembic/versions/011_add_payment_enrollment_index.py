@@ -0,0 +1,23 @@
+"""Add payment enrollment/status index
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_payments_enrollment_status', 'payments', ['enrollment_id', 'status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_payments_enrollment_status', table_name='payments')
\ No newline at end of file
@@ -0,0 +1,27 @@
+"""Add payment reconciliation columns
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('payments', sa.Column('reconciled_at', sa.DateTime(), nullable=True))
+    op.add_column('payments', sa.Column('statement_reference', sa.String(length=100), nullable=True))
+    op.create_index(op.f('ix_payments_reconciled_at'), 'payments', ['reconciled_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_payments_reconciled_at'), table_name='payments')
+    op.drop_column('payments', 'statement_reference')
+    op.drop_column('payments', 'reconciled_at')
\ No newline at end of file
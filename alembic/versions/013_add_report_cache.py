@@ -0,0 +1,34 @@
+"""Add report cache
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '013'
+down_revision = '012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('report_cache',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('report_name', sa.String(length=50), nullable=False),
+    sa.Column('params_hash', sa.String(length=64), nullable=False),
+    sa.Column('data_version', sa.String(length=64), nullable=False),
+    sa.Column('result', sa.JSON(), nullable=False),
+    sa.Column('computed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('report_name', 'params_hash', name='uq_report_cache_report_params')
+    )
+    op.create_index(op.f('ix_report_cache_id'), 'report_cache', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_report_cache_id'), table_name='report_cache')
+    op.drop_table('report_cache')
\ No newline at end of file
@@ -0,0 +1,48 @@
+"""Add student cohorts and cohort retention
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '014'
+down_revision = '013'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('student_cohorts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('student_id', sa.Integer(), nullable=False),
+    sa.Column('cohort_month', sa.String(length=7), nullable=False),
+    sa.Column('last_enrollment_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['student_id'], ['students.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('student_id')
+    )
+    op.create_index(op.f('ix_student_cohorts_id'), 'student_cohorts', ['id'], unique=False)
+    op.create_index(op.f('ix_student_cohorts_cohort_month'), 'student_cohorts', ['cohort_month'], unique=False)
+    op.create_index(op.f('ix_student_cohorts_last_enrollment_id'), 'student_cohorts', ['last_enrollment_id'], unique=False)
+    op.create_table('cohort_retention',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('cohort_month', sa.String(length=7), nullable=False),
+    sa.Column('period', sa.Integer(), nullable=False),
+    sa.Column('students', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('cohort_month', 'period', name='uq_cohort_retention_cohort_period')
+    )
+    op.create_index(op.f('ix_cohort_retention_id'), 'cohort_retention', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_cohort_retention_id'), table_name='cohort_retention')
+    op.drop_table('cohort_retention')
+    op.drop_index(op.f('ix_student_cohorts_last_enrollment_id'), table_name='student_cohorts')
+    op.drop_index(op.f('ix_student_cohorts_cohort_month'), table_name='student_cohorts')
+    op.drop_index(op.f('ix_student_cohorts_id'), table_name='student_cohorts')
+    op.drop_table('student_cohorts')
\ No newline at end of file
@@ -0,0 +1,25 @@
+"""Add recurring class schedule indexes
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '015'
+down_revision = '014'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_class_schedules_instructor_recurring_class_date', 'class_schedules', ['instructor', 'is_recurring', 'class_date'], unique=False)
+    op.create_index('ix_class_schedules_recurring_class_date', 'class_schedules', ['is_recurring', 'class_date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_class_schedules_recurring_class_date', table_name='class_schedules')
+    op.drop_index('ix_class_schedules_instructor_recurring_class_date', table_name='class_schedules')
\ No newline at end of file
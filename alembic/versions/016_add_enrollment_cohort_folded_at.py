@@ -0,0 +1,28 @@
+"""Track which enrollments are folded into cohort retention
+
+Revision ID: 016
+Revises: 015
+Create Date: 2026-10-19 22:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '016'
+down_revision = '015'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('enrollments', sa.Column('cohort_folded_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(op.f('ix_enrollments_cohort_folded_at'), 'enrollments', ['cohort_folded_at'], unique=False)
+    # Enrollments at or below the old watermark were already counted
+    op.execute("UPDATE enrollments SET cohort_folded_at = CURRENT_TIMESTAMP "
+               "WHERE id <= (SELECT COALESCE(MAX(last_enrollment_id), 0) FROM student_cohorts)")
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_enrollments_cohort_folded_at'), table_name='enrollments')
+    op.drop_column('enrollments', 'cohort_folded_at')
\ No newline at end of file
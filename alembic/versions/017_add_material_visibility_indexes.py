@@ -0,0 +1,25 @@
+"""Add material visibility indexes
+
+Revision ID: 017
+Revises: 016
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '017'
+down_revision = '016'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_materials_student_id', 'materials', ['student_id'], unique=False)
+    op.create_index('ix_materials_instructor_is_public', 'materials', ['instructor', 'is_public'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_materials_instructor_is_public', table_name='materials')
+    op.drop_index('ix_materials_student_id', table_name='materials')
\ No newline at end of file
@@ -0,0 +1,26 @@
+"""Make attendance unique per student and class time
+
+Revision ID: 018
+Revises: 017
+Create Date: 2026-10-19 23:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '018'
+down_revision = '017'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keep the first mark of any class recorded twice; run reconcile_counters.py --fix afterwards
+    op.execute("DELETE FROM attendance WHERE id NOT IN "
+               "(SELECT keep_id FROM (SELECT MIN(id) AS keep_id FROM attendance GROUP BY student_id, class_date) AS firsts)")
+    op.create_index('ix_attendance_student_class_date', 'attendance', ['student_id', 'class_date'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_attendance_student_class_date', table_name='attendance')
\ No newline at end of file
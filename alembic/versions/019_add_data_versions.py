@@ -0,0 +1,31 @@
+"""Add per-table data versions
+
+Revision ID: 019
+Revises: 018
+Create Date: 2026-10-19 23:45:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '019'
+down_revision = '018'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('data_versions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('table_name', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('table_name')
+    )
+    op.create_index(op.f('ix_data_versions_id'), 'data_versions', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_data_versions_id'), table_name='data_versions')
+    op.drop_table('data_versions')
\ No newline at end of file
@@ -1,11 +1,28 @@
 import streamlit as st
+import streamlit.components.v1 as components
 import pandas as pd
 from datetime import datetime, timedelta
 from sqlalchemy.orm import sessionmaker
 from models.base import engine, Base
 from models import User, Student, Enrollment, Payment, Attendance, ClassSchedule, Material, NotificationLog
-from utils.auth import hash_password, verify_password
+from utils.auth import create_access_token, session_claims, revoke_token, require_secret_key
+from services.password_policy import authenticate, hash_passwords
+from utils.helpers import format_currency
 from services.notifications import Fast2SMSService
+from services.storage import StorageService
+from services.access_tracker import popular_materials
+from services.expiry import get_expiry_sweeper
+from services.calendar import week_calendar
+from services.dues import DUES_SORTS, outstanding_dues, dues_breakdown
+from services.receipt_pdf import month_receipts_zip
+from services.reconciliation import reconcile_statement
+from services.reports import REPORTS, DIMENSIONS, run_report
+from services.cohorts import retention_matrix
+from services.attendance_analytics import WEEKDAYS, attendance_heatmap, instructor_utilization
+from services.forecast import revenue_forecast
+from services.conflicts import find_conflicts, find_series_conflicts
+from services.attendance import ATTENDANCE_STATUSES, roll_call_sheet, record_roll_call
+from services.materials import filter_students, assign_material, facet_counts, matching_total, search_materials, material_titles, student_materials, remove_material
 from config import Config
 import os
 import io
@@ -168,39 +185,89 @@ def init_default_users():
     """Initialize default admin and instructor users"""
     db = SessionLocal()
     try:
+        new_users = []
+        
         # Check if admin exists
         admin = db.query(User).filter(User.username == "admin").first()
         if not admin:
-            admin_user = User(
+            new_users.append((User(
                 username="admin",
                 email="admin@chordsmusic.com",
-                hashed_password=hash_password("admin123"),
                 full_name="Administrator",
                 role="admin"
-            )
-            db.add(admin_user)
+            ), "admin123"))
         
         # Check if instructors exist
         for instructor in Config.INSTRUCTORS:
             user = db.query(User).filter(User.instructor_name == instructor).first()
             if not user:
-                instructor_user = User(
+                new_users.append((User(
                     username=instructor.lower(),
                     email=f"{instructor.lower()}@chordsmusic.com",
-                    hashed_password=hash_password("instructor123"),
                     full_name=instructor,
                     role="instructor",
                     instructor_name=instructor
-                )
-                db.add(instructor_user)
+                ), "instructor123"))
         
-        db.commit()
+        if new_users:
+            # Hashed in parallel on a short-lived pool
+            for (new_user, _), hashed in zip(new_users, hash_passwords(password for _, password in new_users)):
+                new_user.hashed_password = hashed
+                db.add(new_user)
+            db.commit()
     except Exception as e:
         st.error(f"Error initializing users: {str(e)}")
         db.rollback()
     finally:
         db.close()
 
+SESSION_COOKIE = "chords_session"
+
+def session_user(user) -> dict:
+    """The user fields pages read from st.session_state.user"""
+    return {
+        'id': user.id,
+        'username': user.username,
+        'full_name': user.full_name,
+        'role': user.role,
+        'instructor_name': user.instructor_name
+    }
+
+def set_session_cookie(token=None):
+    """Keep the session token in a SameSite=Strict cookie (never the URL); no token clears it.
+    
+    The cookie is written from the page, so it cannot be HttpOnly; logout
+    therefore revokes the token in the database rather than just clearing it.
+    """
+    max_age = Config.SESSION_TOKEN_TTL if token else 0
+    components.html(f"""
+    <script>
+        const secure = window.parent.location.protocol === "https:" ? "; Secure" : "";
+        window.parent.document.cookie = "{SESSION_COOKIE}={token or ''}; Max-Age={max_age}; Path=/; SameSite=Strict" + secure;
+    </script>
+    """, height=0)
+
+def restore_session(token):
+    """Log a reloaded page back in from its signed session token.
+    
+    The token only names the user; role and active status are read from
+    the database, so no bcrypt check runs but changes apply at once.
+    """
+    db = SessionLocal()
+    try:
+        claims = session_claims(db, token)
+        if not claims:
+            return False
+        user = db.query(User).filter(User.id == claims.get('sub'), User.is_active == True).first()
+        if not user:
+            return False
+        st.session_state.authenticated = True
+        st.session_state.user = session_user(user)
+        st.session_state.session_token = token
+        return True
+    finally:
+        db.close()
+
 def login_page():
     """Enhanced login page with better UX"""
     # Header
@@ -231,20 +298,19 @@ def login_page():
                     if username and password:
                         db = SessionLocal()
                         try:
-                            user = db.query(User).filter(User.username == username, User.is_active == True).first()
-                            if user and verify_password(password, user.hashed_password):
+                            user = authenticate(db, username, password)
+                            if user:
                                 st.session_state.authenticated = True
-                                st.session_state.user = {
-                                    'id': user.id,
-                                    'username': user.username,
-                                    'full_name': user.full_name,
-                                    'role': user.role,
-                                    'instructor_name': user.instructor_name
-                                }
+                                st.session_state.user = session_user(user)
+                                # Lets a reload restore the session without another password check
+                                st.session_state.session_token = create_access_token({'sub': user.id})
+                                st.session_state.store_session_cookie = True
                                 st.success("🎉 Login successful! Redirecting...")
                                 st.rerun()
                             else:
                                 st.error("❌ Invalid credentials. Please try again.")
+                        except TimeoutError:
+                            st.error("⏳ The server is busy checking other logins. Please try again in a moment.")
                         finally:
                             db.close()
                     else:
@@ -265,6 +331,12 @@ def main_app():
     """Enhanced main application with better navigation"""
     user = st.session_state.user
     
+    if st.session_state.pop('store_session_cookie', False):
+        set_session_cookie(st.session_state.session_token)
+    
+    # Keeps enrollment statuses current for the dashboard counts and the cohort matrix up to date
+    get_expiry_sweeper()
+    
     # Enhanced sidebar
     with st.sidebar:
         st.markdown(f"""
@@ -277,6 +349,12 @@ def main_app():
         
         # Logout button
         if st.button("🚪 Logout", use_container_width=True):
+            db = SessionLocal()
+            try:
+                revoke_token(db, st.session_state.pop('session_token', None))
+            finally:
+                db.close()
+            st.session_state.clear_session_cookie = True
             st.session_state.authenticated = False
             st.session_state.user = None
             st.rerun()
@@ -433,6 +511,30 @@ def dashboard_page():
             })
             
             st.line_chart(revenue_data.set_index('Month'))
+        
+        if user['role'] == 'admin':
+            st.markdown('<div class="section-header"><h3>🔮 Revenue Forecast</h3></div>', unsafe_allow_html=True)
+            
+            horizon = st.select_slider("Months ahead", options=[3, 6, 12], value=6)
+            forecast = revenue_forecast(db, months=horizon)
+            forecast_df = pd.DataFrame(forecast["months"])
+            
+            col1, col2 = st.columns([1, 2])
+            with col1:
+                st.markdown(f"""
+                <div class="quick-stat">
+                    <h2>💰</h2>
+                    <h3>{format_currency(forecast['total_revenue'])}</h3>
+                    <p>Expected renewals revenue</p>
+                </div>
+                """, unsafe_allow_html=True)
+            with col2:
+                st.bar_chart(forecast_df.set_index("month")["expected_revenue"])
+            
+            st.dataframe(forecast_df.rename(columns={
+                "month": "Month", "expiring": "Expiring", "expected_renewals": "Expected Renewals",
+                "expected_revenue": "Expected Revenue"
+            }), use_container_width=True, hide_index=True)
     
     finally:
         db.close()
@@ -740,17 +842,301 @@ def students_page():
 def payments_page():
     """Enhanced payments page"""
     st.markdown('<div class="main-header"><h1>💰 Payment Management</h1><p>Track and manage all payments</p></div>', unsafe_allow_html=True)
-    st.info("🚧 Payment functionality will be implemented here")
+    
+    user = st.session_state.user
+    if user['role'] == 'student':
+        st.info("💳 Your payment history will appear here")
+        return
+    
+    db = SessionLocal()
+    
+    try:
+        # Filters
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            if user['role'] == 'admin':
+                dues_instructor = st.selectbox("👨‍🏫 Instructor", ["All"] + Config.INSTRUCTORS)
+            else:
+                dues_instructor = user['instructor_name']
+                st.info(f"Dues for: **{dues_instructor}'s students**")
+        with col2:
+            dues_package = st.selectbox("📦 Package", ["All"] + list(Config.PACKAGES),
+                                        format_func=lambda x: Config.PACKAGES.get(x, {}).get("name", x))
+        with col3:
+            dues_sort = st.selectbox("↕️ Sort by", list(DUES_SORTS),
+                                     format_func=lambda x: {"balance": "Balance due", "end_date": "Package end date", "student": "Student name"}[x])
+        with col4:
+            outstanding_only = st.checkbox("Only outstanding", value=True)
+        
+        page_size = 25
+        # Reserve the pager's place; it is drawn once the query has counted the pages
+        pager = st.empty()
+        page = st.session_state.get('dues_page', 1)
+        dues_query = dict(instructor=dues_instructor, package_type=dues_package,
+                          outstanding_only=outstanding_only, sort=dues_sort, page_size=page_size)
+        dues = outstanding_dues(db, page=page, **dues_query)
+        pages = max(1, -(-dues['total'] // page_size))
+        if page > pages:
+            # Filters left fewer pages than the one selected; show the last one
+            page = pages
+            dues = outstanding_dues(db, page=page, **dues_query)
+        if pages > 1:
+            st.session_state.dues_page = page
+            pager.selectbox("📄 Page", range(1, pages + 1), key="dues_page",
+                            format_func=lambda p: f"Page {p} of {pages}")
+        
+        col1, col2, col3 = st.columns(3)
+        for column, icon, value, label in ((col1, "🧾", format_currency(dues['total_fees']), "Fees"),
+                                           (col2, "✅", format_currency(dues['total_paid']), "Collected"),
+                                           (col3, "⏳", format_currency(dues['total_due']), "Outstanding")):
+            with column:
+                st.markdown(f"""
+                <div class="quick-stat">
+                    <h2>{icon}</h2>
+                    <h3>{value}</h3>
+                    <p>{label}</p>
+                </div>
+                """, unsafe_allow_html=True)
+        
+        st.markdown('<div class="section-header"><h3>⏳ Outstanding Dues</h3></div>', unsafe_allow_html=True)
+        
+        if dues['rows']:
+            st.dataframe(pd.DataFrame(dues['rows']).drop(columns=['enrollment_id', 'student_id']),
+                         use_container_width=True, hide_index=True)
+        else:
+            st.success("🎉 No outstanding dues")
+        
+        if user['role'] == 'admin':
+            st.markdown('<div class="section-header"><h3>📊 Collections Breakdown</h3></div>', unsafe_allow_html=True)
+            breakdown_by = st.radio("Group by", ["instructor", "package_type"], horizontal=True,
+                                    format_func=lambda x: "Instructor" if x == "instructor" else "Package")
+            st.dataframe(pd.DataFrame(dues_breakdown(db, by=breakdown_by)), use_container_width=True, hide_index=True)
+            
+            # Month-end receipt bundle
+            st.markdown('<div class="section-header"><h3>🧾 Monthly Receipts</h3></div>', unsafe_allow_html=True)
+            col1, col2 = st.columns(2)
+            with col1:
+                receipt_month = st.date_input("📅 Month", value=datetime.now().date().replace(day=1))
+            with col2:
+                if st.button("📦 Build Receipts ZIP", use_container_width=True):
+                    try:
+                        with st.spinner("Rendering receipts..."):
+                            bundle = month_receipts_zip(db, receipt_month.year, receipt_month.month)
+                        st.session_state.receipts_zip = bundle
+                    except Exception as e:
+                        st.error(f"❌ Error: {str(e)}")
+            
+            bundle = st.session_state.get('receipts_zip')
+            if bundle:
+                # Streamed from disk by the media server instead of being loaded into Streamlit
+                st.link_button(f"⬇️ Download {bundle['receipts']} receipts",
+                               StorageService().get_file_url(bundle['file_path'], expires_in=3600),
+                               use_container_width=True)
+            
+            # Bank / UPI statement reconciliation
+            st.markdown('<div class="section-header"><h3>🏦 Reconcile Statement</h3></div>', unsafe_allow_html=True)
+            statement = st.file_uploader("📄 Bank or UPI statement (CSV)", type=['csv'])
+            if statement and st.button("🔍 Reconcile", use_container_width=True):
+                try:
+                    with st.spinner("Matching statement lines..."):
+                        result = reconcile_statement(db, statement)
+                    st.success(f"🎉 {result['reconciled']} payments reconciled "
+                               f"({result['by_reference']} by reference, {result['by_fallback']} by amount and phone), "
+                               f"{result['created_pending']} pending payments created")
+                    if result['already_recorded']:
+                        st.info(f"ℹ️ {result['already_recorded']} lines were already reconciled")
+                    if result['unmatched']:
+                        st.warning(f"⚠️ {result['unmatched']} credits could not be matched to a student")
+                        st.dataframe(pd.DataFrame(result['unmatched_lines']), use_container_width=True, hide_index=True)
+                except Exception as e:
+                    st.error(f"❌ Error: {str(e)}")
+    
+    finally:
+        db.close()
 
 def schedule_page():
     """Enhanced schedule page"""
     st.markdown('<div class="main-header"><h1>📅 Class Schedule</h1><p>Manage class schedules and bookings</p></div>', unsafe_allow_html=True)
-    st.info("🚧 Schedule functionality will be implemented here")
+    
+    user = st.session_state.user
+    db = SessionLocal()
+    
+    try:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            picked_day = st.date_input("📅 Week of", value=datetime.now().date())
+            week_start = datetime.combine(picked_day - timedelta(days=picked_day.weekday()), datetime.min.time())
+        with col2:
+            if user['role'] == 'admin':
+                instructor = st.selectbox("👨‍🏫 Instructor", Config.INSTRUCTORS)
+            else:
+                instructor = user['instructor_name']
+                st.info(f"Schedule for: **{instructor}**")
+        with col3:
+            time_view = st.radio("🌍 Show times in", ["My time", "Student's time"], horizontal=True)
+        
+        if st.button("➕ Add Class", use_container_width=True):
+            st.session_state.show_add_class = True
+        
+        # Add class form
+        if st.session_state.get('show_add_class', False):
+            st.markdown('<div class="section-header"><h3>➕ Book a Class</h3></div>', unsafe_allow_html=True)
+            
+            enrollments = db.query(Enrollment.id, Enrollment.student_id, Enrollment.package_type, Student.name) \
+                .join(Student, Enrollment.student_id == Student.id) \
+                .filter(Student.instructor == instructor, Enrollment.status == 'active') \
+                .order_by(Student.name).all()
+            
+            with st.form("add_class"):
+                if enrollments:
+                    options = {row.id: row for row in enrollments}
+                    enrollment_id = st.selectbox("👤 Student", options=list(options),
+                                                 format_func=lambda x: f"{options[x].name} ({Config.PACKAGES.get(options[x].package_type, {}).get('name', options[x].package_type)})")
+                else:
+                    st.warning("No active enrollments for this instructor.")
+                    enrollment_id = None
+                
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    class_day = st.date_input("📅 Date", value=picked_day)
+                with col2:
+                    class_time = st.time_input("🕐 Time", value=datetime.strptime("17:00", "%H:%M").time())
+                with col3:
+                    duration = st.selectbox("⏱️ Duration (minutes)", [30, 45, 60, 90], index=2)
+                weekly = st.checkbox("🔁 Repeat weekly")
+                
+                col_a, col_b = st.columns([1, 1])
+                with col_a:
+                    if st.form_submit_button("💾 Book Class", use_container_width=True):
+                        if enrollment_id:
+                            try:
+                                class_date = datetime.combine(class_day, class_time)
+                                student_id = options[enrollment_id].student_id
+                                if weekly:
+                                    # Every week of the series, not just the first class
+                                    conflicts = find_series_conflicts(db, class_date, duration, "FREQ=WEEKLY",
+                                                                      instructor=instructor, student_id=student_id)
+                                else:
+                                    conflicts = find_conflicts(db, class_date, duration, instructor=instructor, student_id=student_id)
+                                if conflicts:
+                                    for conflict in conflicts:
+                                        st.error(f"⚠️ Clashes with a class at {conflict['start'].strftime('%a %d %b %I:%M %p')} "
+                                                 f"({' and '.join(conflict['conflict_on']).replace('student_id', 'student')} busy)")
+                                else:
+                                    db.add(ClassSchedule(
+                                        student_id=student_id,
+                                        enrollment_id=enrollment_id,
+                                        instructor=instructor,
+                                        class_date=class_date,
+                                        duration_minutes=duration,
+                                        is_recurring=weekly,
+                                        recurrence_rule="FREQ=WEEKLY" if weekly else None
+                                    ))
+                                    db.commit()
+                                    st.success("🎉 Class booked!")
+                                    st.session_state.show_add_class = False
+                                    st.rerun()
+                            except Exception as e:
+                                st.error(f"❌ Error: {str(e)}")
+                                db.rollback()
+                        else:
+                            st.error("⚠️ Please select a student")
+                
+                with col_b:
+                    if st.form_submit_button("❌ Cancel", use_container_width=True):
+                        st.session_state.show_add_class = False
+                        st.rerun()
+        
+        st.markdown("---")
+        
+        # Weekly calendar
+        calendar = week_calendar(db, instructor, week_start)
+        st.markdown(f'<div class="section-header"><h3>🗓️ Week of {week_start.strftime("%d %b %Y")} · {calendar["total"]} classes</h3></div>', unsafe_allow_html=True)
+        
+        for column, day in zip(st.columns(7), calendar['days']):
+            with column:
+                st.markdown(f"**{day['date'].strftime('%a %d')}**")
+                for item in day['classes']:
+                    if time_view == "My time":
+                        shown = item['my_time'].strftime('%I:%M %p')
+                    else:
+                        shown = f"{item['student_time'].strftime('%I:%M %p')} ({item['student_timezone']})"
+                    st.markdown(f"""
+                    <div class="metric-card">
+                        <strong>{shown}</strong><br>
+                        👤 {item['student_name']}<br>
+                        🎵 {item['instrument'] or '-'} · {item['classes_remaining'] if item['classes_remaining'] is not None else '-'} left
+                        {'<br>🔁 Weekly' if item['is_recurring'] else ''}
+                    </div>
+                    """, unsafe_allow_html=True)
+    
+    finally:
+        db.close()
 
 def attendance_page():
     """Enhanced attendance page"""
     st.markdown('<div class="main-header"><h1>✅ Attendance Tracking</h1><p>Monitor student attendance</p></div>', unsafe_allow_html=True)
-    st.info("🚧 Attendance functionality will be implemented here")
+    
+    user = st.session_state.user
+    db = SessionLocal()
+    
+    try:
+        col1, col2 = st.columns(2)
+        with col1:
+            class_day = st.date_input("📅 Class Date", value=datetime.now().date())
+        with col2:
+            if user['role'] == 'admin':
+                instructor = st.selectbox("👨‍🏫 Instructor", Config.INSTRUCTORS)
+            else:
+                instructor = user['instructor_name']
+                st.info(f"Roll call for: **{instructor}**")
+        
+        st.markdown('<div class="section-header"><h3>📋 Roll Call</h3></div>', unsafe_allow_html=True)
+        
+        sheet = roll_call_sheet(db, instructor, class_day)
+        if not sheet:
+            st.info("📭 No classes scheduled for this day")
+            return
+        
+        with st.form("roll_call"):
+            marks = []
+            for row in sheet:
+                col1, col2, col3 = st.columns([2, 1, 2])
+                with col1:
+                    st.write(f"**{row['student_name']}** · {row['start'].strftime('%I:%M %p')}")
+                if row['marked_status']:
+                    with col2:
+                        st.write(f"✅ {row['marked_status'].title()}")
+                    continue
+                with col2:
+                    status = st.selectbox("Status", ATTENDANCE_STATUSES,
+                                          key=f"status_{row['schedule_id']}_{row['start']:%H%M}",
+                                          label_visibility="collapsed")
+                with col3:
+                    topic = st.text_input("Lesson topic", key=f"topic_{row['schedule_id']}_{row['start']:%H%M}",
+                                          label_visibility="collapsed", placeholder="Lesson topic")
+                marks.append({
+                    "student_id": row['student_id'],
+                    "enrollment_id": row['enrollment_id'],
+                    "class_schedule_id": row['schedule_id'],
+                    "class_date": row['start'],
+                    "status": status,
+                    "lesson_topic": topic or None
+                })
+            
+            if st.form_submit_button("💾 Save Attendance", use_container_width=True):
+                if marks:
+                    try:
+                        result = record_roll_call(db, instructor, class_day, marks)
+                        st.success(f"🎉 Attendance saved for {result['recorded']} classes!")
+                        st.rerun()
+                    except Exception as e:
+                        st.error(f"❌ Error: {str(e)}")
+                else:
+                    st.info("All classes for this day are already marked")
+    
+    finally:
+        db.close()
 
 def materials_page():
     """Enhanced materials page"""
@@ -760,6 +1146,10 @@ def materials_page():
     db = SessionLocal()
     
     try:
+        if user['role'] == 'student':
+            student_materials_view(db, user)
+            return
+        
         # Action buttons
         col1, col2 = st.columns(2)
         
@@ -787,6 +1177,7 @@ def materials_page():
                 
                 with col2:
                     # Dynamic input based on material type
+                    uploaded_file = None
                     if material_type == "Video":
                         file_input = st.text_input("🔗 YouTube Link", placeholder="https://youtube.com/watch?v=...")
                     elif material_type == "PDF":
@@ -801,6 +1192,8 @@ def materials_page():
                     else:  # Link
                         file_input = st.text_input("🔗 Web Link", placeholder="https://example.com")
                     
+                    instrument = st.selectbox("🎹 Instrument", Config.INSTRUMENTS)
+                    skill_level = st.selectbox("📊 Skill Level", ["Beginner", "Intermediate", "Advanced", "All Levels"])
                     is_public = st.checkbox("🌍 Make Public", value=True, help="Visible to all students of instructor")
                     lesson_number = st.number_input("📝 Lesson Number", min_value=1, value=1)
                 
@@ -808,13 +1201,25 @@ def materials_page():
                 with col_a:
                     if st.form_submit_button("✅ Add Material", use_container_width=True):
                         if title and file_input:
+                            stored = None
                             try:
+                                file_size = None
+                                if uploaded_file:
+                                    # Stream the upload to disk in chunks instead of copying it via getvalue()
+                                    uploaded_file.seek(0)
+                                    stored = StorageService().save_stream(uploaded_file, uploaded_file.name, subfolder="materials")
+                                    file_input = stored["file_path"]
+                                    file_size = stored["file_size"]
+                                
                                 material = Material(
                                     title=title,
                                     description=description,
                                     file_type=material_type,
                                     file_path=file_input,
+                                    file_size=file_size,
                                     instructor=user['instructor_name'] if user['role'] != 'admin' else 'Admin',
+                                    instrument=instrument,
+                                    skill_level=skill_level,
                                     is_public=is_public,
                                     lesson_number=lesson_number
                                 )
@@ -826,6 +1231,9 @@ def materials_page():
                             except Exception as e:
                                 st.error(f"❌ Error: {str(e)}")
                                 db.rollback()
+                                # The material was not saved, so its file (or blob reference) must not linger
+                                if stored:
+                                    StorageService().delete_file(stored["file_path"])
                         else:
                             st.error("⚠️ Title and file/link are required")
                 
@@ -842,11 +1250,11 @@ def materials_page():
                 col1, col2 = st.columns(2)
                 
                 with col1:
-                    materials = db.query(Material).all()
-                    if materials:
+                    titles = material_titles(db)
+                    if titles:
                         material_id = st.selectbox("📚 Select Material", 
-                                                 options=[m.id for m in materials],
-                                                 format_func=lambda x: next(m.title for m in materials if m.id == x))
+                                                 options=list(titles),
+                                                 format_func=lambda x: titles[x])
                     else:
                         st.warning("No materials available. Add materials first.")
                         material_id = None
@@ -865,28 +1273,39 @@ def materials_page():
                     if st.form_submit_button("📤 Share Material", use_container_width=True):
                         if material_id:
                             try:
-                                query = db.query(Student).filter(Student.is_active == True)
-                                
-                                if user['role'] != 'admin':
-                                    query = query.filter(Student.instructor == user['instructor_name'])
-                                elif share_instructor != "All":
-                                    query = query.filter(Student.instructor == share_instructor)
-                                
-                                if share_instrument != "All":
-                                    query = query.filter(Student.preferred_instrument == share_instrument)
+                                query = filter_students(
+                                    db,
+                                    instructor=user['instructor_name'] if user['role'] != 'admin' else share_instructor,
+                                    instrument=share_instrument,
+                                    skill_level=share_skill
+                                )
                                 
-                                if share_skill != "All":
-                                    query = query.filter(Student.skill_level == share_skill)
+                                # Record the fan-out in one INSERT ... SELECT before messaging
+                                assign_material(db, material_id, query, assigned_by=user['instructor_name'] or 'Admin')
+                                db.commit()
                                 
-                                target_students = query.all()
                                 material = db.query(Material).get(material_id)
-                                sent_count = len(target_students)
-                                
-                                st.success(f"🎉 Material '{material.title}' shared with {sent_count} students!")
-                                st.session_state.show_share_material = False
-                                st.rerun()
+                                if not material.file_path:
+                                    # Nothing to link to: students see it under their materials, but no message goes out
+                                    st.warning(f"⚠️ '{material.title}' has no file or link, so it was assigned without a WhatsApp message")
+                                else:
+                                    target_students = query.all()
+                                    if material.file_path.startswith(("http://", "https://")):
+                                        link = material.file_path
+                                    else:
+                                        link = StorageService().get_file_url(material.file_path)
+                                    
+                                    result = Fast2SMSService().send_material_share(material, target_students, link)
+                                    
+                                    if result["failed"]:
+                                        st.warning(f"⚠️ Material '{material.title}' sent to {result['sent']} students, {result['failed']} failed")
+                                    else:
+                                        st.success(f"🎉 Material '{material.title}' shared with {result['sent']} students!")
+                                    st.session_state.show_share_material = False
+                                    st.rerun()
                             except Exception as e:
                                 st.error(f"❌ Error: {str(e)}")
+                                db.rollback()
                         else:
                             st.error("⚠️ Please select a material to share")
                 
@@ -898,22 +1317,33 @@ def materials_page():
         # Materials library
         st.markdown('<div class="section-header"><h3>📚 Materials Library</h3></div>', unsafe_allow_html=True)
         
-        # Filters
-        col1, col2 = st.columns(2)
-        with col1:
-            filter_instructor = st.selectbox("👨🏫 Filter by Instructor", ["All"] + Config.INSTRUCTORS, key="mat_inst")
-        with col2:
-            filter_type = st.selectbox("📁 Filter by Type", ["All", "Video", "PDF", "Audio", "Document", "Link"], key="mat_type")
+        # Facet filters, each labelled with its count given the other filters
+        facet_options = {
+            "instructor": ("👨🏫 Filter by Instructor", Config.INSTRUCTORS + ["Admin"]),
+            "instrument": ("🎹 Filter by Instrument", Config.INSTRUMENTS),
+            "skill_level": ("📊 Filter by Skill", ["Beginner", "Intermediate", "Advanced", "All Levels"]),
+            "file_type": ("📁 Filter by Type", ["Video", "PDF", "Audio", "Document", "Link"])
+        }
+        filters = {facet: st.session_state.get(f"mat_{facet}", "All") for facet in facet_options}
+        counts = facet_counts(db, filters)
         
-        # Query materials
-        query = db.query(Material)
+        filter_cols = st.columns(len(facet_options))
+        for filter_col, (facet, (label, values)) in zip(filter_cols, facet_options.items()):
+            with filter_col:
+                filters[facet] = st.selectbox(
+                    label, ["All"] + values, key=f"mat_{facet}",
+                    format_func=lambda value, facet=facet: value if value == "All" else f"{value} ({counts[facet].get(value, 0)})"
+                )
         
-        if filter_instructor != "All":
-            query = query.filter(Material.instructor == filter_instructor)
-        if filter_type != "All":
-            query = query.filter(Material.file_type == filter_type)
+        # Paginated query
+        page_size = 20
+        total = matching_total(counts, filters)
+        total_pages = max((total + page_size - 1) // page_size, 1)
+        page = 1
+        if total_pages > 1:
+            page = st.selectbox("📄 Page", range(1, total_pages + 1), format_func=lambda p: f"Page {p} of {total_pages} ({total} materials)")
         
-        materials = query.order_by(Material.created_at.desc()).all()
+        materials = search_materials(db, filters, page=page, page_size=page_size)
         
         if materials:
             for material in materials:
@@ -932,6 +1362,7 @@ def materials_page():
                         st.markdown(f"""
                         <div style="padding: 1rem;">
                             <p><strong>👨🏫 Instructor:</strong> {material.instructor}</p>
+                            <p><strong>🎹 Instrument:</strong> {material.instrument or 'N/A'} · {material.skill_level or 'All Levels'}</p>
                             <p><strong>📁 Type:</strong> {material.file_type or 'N/A'}</p>
                         </div>
                         """, unsafe_allow_html=True)
@@ -946,7 +1377,13 @@ def materials_page():
                     
                     with col4:
                         if material.file_path:
-                            st.link_button("🔗 Open", material.file_path, use_container_width=True)
+                            # The media server counts the open and redirects to the file, so one click opens it
+                            material_url = StorageService().get_open_url(material.id, expires_in=3600)
+                            st.link_button("🔗 Open", material_url, use_container_width=True)
+                        if user['role'] == 'admin' or material.instructor == user['instructor_name']:
+                            if st.button("🗑️ Remove", key=f"remove_material_{material.id}", use_container_width=True):
+                                remove_material(db, material.id)
+                                st.rerun()
                 
                 st.markdown("---")
         else:
@@ -960,6 +1397,30 @@ def materials_page():
     finally:
         db.close()
 
+def student_materials_view(db, user):
+    """Materials shared with the signed-in student"""
+    st.markdown('<div class="section-header"><h3>📖 My Materials</h3></div>', unsafe_allow_html=True)
+    
+    # Student accounts are matched to their student record by email
+    student_id = db.query(Student.id).join(User, User.email == Student.email) \
+        .filter(User.id == user['id'], Student.is_active == True).limit(1).scalar()
+    materials = student_materials(db, student_id) if student_id else []
+    
+    if not materials:
+        st.info("📚 No materials have been shared with you yet")
+        return
+    
+    for material in materials:
+        col1, col2 = st.columns([4, 1])
+        with col1:
+            st.markdown(f"**📚 {material.title}**  \n{material.description or ''}")
+            st.caption(f"👨🏫 {material.instructor} · 🎹 {material.instrument or 'N/A'} · 📁 {material.file_type or 'N/A'}")
+        with col2:
+            if material.file_path:
+                material_url = StorageService().get_open_url(material.id, expires_in=3600)
+                st.link_button("▶️ Open", material_url, use_container_width=True)
+        st.markdown("---")
+
 def enrollments_page():
     """Enhanced enrollments page"""
     st.markdown('<div class="main-header"><h1>📝 Student Enrollments</h1><p>Manage course enrollments and packages</p></div>', unsafe_allow_html=True)
@@ -968,7 +1429,110 @@ def enrollments_page():
 def reports_page():
     """Enhanced reports page"""
     st.markdown('<div class="main-header"><h1>📈 Reports & Analytics</h1><p>Insights and performance metrics</p></div>', unsafe_allow_html=True)
-    st.info("🚧 Reports functionality will be implemented here")
+    
+    user = st.session_state.user
+    db = SessionLocal()
+    
+    try:
+        st.markdown('<div class="section-header"><h3>📊 Academy Reports</h3></div>', unsafe_allow_html=True)
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            report_name = st.selectbox("📋 Report", list(REPORTS), format_func=lambda name: REPORTS[name]["title"])
+        with col2:
+            dimensions = st.multiselect("🧩 Group by", list(DIMENSIONS), default=REPORTS[report_name]["dimensions"])
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            if user['role'] == 'instructor':
+                instructor = user['instructor_name']
+            else:
+                instructor = st.selectbox("👨‍🏫 Instructor", ["All"] + Config.INSTRUCTORS, key="report_instructor")
+        with col2:
+            instrument = st.selectbox("🎸 Instrument", ["All"] + Config.INSTRUMENTS, key="report_instrument")
+        with col3:
+            start = st.date_input("📅 From", value=datetime.now().date().replace(day=1) - timedelta(days=180))
+        with col4:
+            end = st.date_input("📅 To", value=datetime.now().date())
+        
+        filters = {
+            "instructor": instructor,
+            "instrument": instrument,
+            "start": datetime.combine(start, datetime.min.time()),
+            "end": datetime.combine(end + timedelta(days=1), datetime.min.time())
+        }
+        report = run_report(db, report_name, dimensions, filters)
+        
+        if report["rows"]:
+            report_df = pd.DataFrame(report["rows"], columns=report["columns"])
+            st.dataframe(report_df, use_container_width=True, hide_index=True)
+            if len(dimensions) == 1:
+                st.bar_chart(report_df.set_index(dimensions[0])[REPORTS[report_name]["measures"][0]])
+        else:
+            st.info("No data for the selected filters")
+        
+        source = "served from cache" if report["cached"] else "freshly computed"
+        st.caption(f"Computed {report['computed_at']:%d %b %Y %H:%M} · {source}")
+        
+        st.markdown('<div class="section-header"><h3>🧭 Cohort Retention</h3></div>', unsafe_allow_html=True)
+        
+        # New enrollments are folded in by the background sweeper; this page only reads
+        max_periods = st.slider("Months after joining", 3, 24, 12)
+        matrix = retention_matrix(db, max_periods=max_periods)
+        
+        if matrix:
+            cohort_df = pd.DataFrame(
+                [[row["cohort"], row["size"]] + row["retention"] for row in matrix],
+                columns=["Cohort", "Students"] + [f"M{period}" for period in range(max_periods + 1)]
+            )
+            st.dataframe(cohort_df, use_container_width=True, hide_index=True)
+            st.caption("Share of each cohort (students by month of first enrollment) with an enrollment starting N months later, in % · "
+                       f"updated every {Config.EXPIRY_SWEEP_INTERVAL // 60} minutes")
+        else:
+            st.info("No enrollments yet")
+        
+        st.markdown('<div class="section-header"><h3>🗓️ Attendance Heatmap</h3></div>', unsafe_allow_html=True)
+        
+        students = db.query(Student.id, Student.name).filter(Student.is_active == True)
+        if instructor != "All":
+            students = students.filter(Student.instructor == instructor)
+        student_names = dict(students.order_by(Student.name).all())
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            heatmap_student = st.selectbox("👤 Student", [None] + list(student_names),
+                                           format_func=lambda student_id: student_names.get(student_id, "All students"))
+        with col2:
+            heatmap_metric = st.radio("Show", ["Classes held", "No-show rate %"], horizontal=True)
+        
+        heatmap = attendance_heatmap(db, filters["start"], filters["end"],
+                                     instructor=None if instructor == "All" else instructor,
+                                     student_id=heatmap_student)
+        grid = heatmap["classes"] if heatmap_metric == "Classes held" else heatmap["no_show_rate"].round(1)
+        heatmap_df = pd.DataFrame(grid, index=WEEKDAYS, columns=[f"{hour:02d}:00" for hour in range(24)])
+        st.dataframe(heatmap_df.loc[:, heatmap["classes"].sum(axis=0) > 0], use_container_width=True)
+        
+        if user['role'] == 'admin':
+            st.markdown('<div class="section-header"><h3>⏱️ Instructor Utilization</h3></div>', unsafe_allow_html=True)
+            
+            utilization = instructor_utilization(db, filters["start"], filters["end"])
+            st.dataframe(pd.DataFrame(utilization).rename(columns={
+                "instructor": "Instructor", "booked_minutes": "Booked (min)", "delivered_minutes": "Delivered (min)",
+                "available_minutes": "Available (min)", "utilization": "Utilization %", "no_show_rate": "No-show %"
+            }), use_container_width=True, hide_index=True)
+        
+        st.markdown('<div class="section-header"><h3>🔥 Popular Materials</h3></div>', unsafe_allow_html=True)
+        
+        days = st.selectbox("📅 Period", [7, 30, 90], index=1, format_func=lambda d: f"Last {d} days")
+        popular = popular_materials(db, days=days)
+        
+        if popular:
+            st.dataframe(pd.DataFrame(popular), use_container_width=True, hide_index=True)
+        else:
+            st.info("No material views recorded yet")
+    
+    finally:
+        db.close()
 
 def notifications_page():
     """Enhanced notifications page"""
@@ -982,6 +1546,9 @@ def settings_page():
 
 # Main app logic
 def main():
+    # Session tokens are signed with SECRET_KEY; a placeholder would let anyone forge them
+    require_secret_key()
+    
     # Database migration - recreate table to remove email unique constraint
     try:
         import sqlite3
@@ -1031,7 +1598,19 @@ def main():
     # Initialize default users
     init_default_users()
     
+    # Tokens from older links must not linger in the address bar or history
+    if "session" in st.query_params:
+        st.query_params.pop("session")
+    
+    # Restore a login from the session cookie after a reload (no bcrypt work)
+    if not st.session_state.authenticated and not st.session_state.get('clear_session_cookie'):
+        token = st.context.cookies.get(SESSION_COOKIE)
+        if token and not restore_session(token):
+            st.session_state.clear_session_cookie = True
+    
     if not st.session_state.authenticated:
+        if st.session_state.pop('clear_session_cookie', False):
+            set_session_cookie(None)
         login_page()
     else:
         main_app()
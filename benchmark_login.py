@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Measure login latency and concurrent login throughput at the current bcrypt cost
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from config import Config
+from models.base import Base
+from models.user import User
+from services.password_policy import authenticate, current_rounds, hash_passwords
+
+def benchmark(logins=20, concurrency=8):
+    """Time logins one at a time, then ``concurrency`` at once, against a scratch database"""
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    
+    db = Session()
+    hashed = hash_passwords(f"password{i}" for i in range(concurrency))
+    db.add_all([User(username=f"user{i}", email=f"user{i}@example.com", hashed_password=hashed[i],
+                     full_name=f"User {i}") for i in range(concurrency)])
+    db.commit()
+    db.close()
+    
+    def login(i):
+        session = Session()
+        try:
+            started = time.perf_counter()
+            assert authenticate(session, f"user{i % concurrency}", f"password{i % concurrency}")
+            return (time.perf_counter() - started) * 1000
+        finally:
+            session.close()
+    
+    print(f"bcrypt cost {current_rounds()}, {Config.PASSWORD_HASH_WORKERS} bcrypt pool threads")
+    
+    latencies = sorted(login(i) for i in range(logins))
+    print(f"Sequential: median {statistics.median(latencies):.0f} ms, "
+          f"p95 {latencies[int(len(latencies) * 0.95) - 1]:.0f} ms")
+    
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as sessions:
+        list(sessions.map(login, range(logins)))
+    elapsed = time.perf_counter() - started
+    print(f"{concurrency} concurrent sessions: {logins / elapsed:.1f} logins/s "
+          f"(sequential {1000 * len(latencies) / sum(latencies):.1f} logins/s)")
+    
+    engine.dispose()
+    os.remove(path)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("--logins", type=int, default=20, help="logins per run")
+    parser.add_argument("--concurrency", type=int, default=8, help="simultaneous login sessions")
+    args = parser.parse_args()
+    benchmark(logins=args.logins, concurrency=args.concurrency)
\ No newline at end of file
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Remove unreferenced content-addressed blobs and abandoned partial uploads
+"""
+
+import argparse
+import sys
+from services.storage import StorageService
+
+def collect(grace_seconds=3600):
+    """Delete blobs no material references and stale files left by crashes or aborted uploads"""
+    try:
+        summary = StorageService().collect_garbage(grace_seconds=grace_seconds)
+        print(f"Removed {summary['blobs_removed']} unreferenced blobs, {summary['orphans_removed']} orphaned files "
+              f"and {summary['uploads_removed']} abandoned uploads ({summary['bytes_freed']} bytes freed)")
+    
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("--grace-seconds", type=int, default=3600,
+                        help="keep untracked files and partial uploads younger than this")
+    args = parser.parse_args()
+    collect(grace_seconds=args.grace_seconds)
\ No newline at end of file
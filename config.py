@@ -10,10 +10,26 @@ class Config:
     FAST2SMS_BASE_URL = os.getenv('FAST2SMS_BASE_URL', 'https://www.fast2sms.com/dev/whatsapp')
     TIMEZONE = os.getenv('TIMEZONE', 'Asia/Kolkata')
     UPLOAD_DIR = os.getenv('UPLOAD_DIR', 'data/uploads')
+    UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', str(1024 * 1024)))
+    CONTENT_ADDRESSED_STORAGE = os.getenv('CONTENT_ADDRESSED_STORAGE', 'false').lower() in ('1', 'true', 'yes')
+    
+    # Companion media server for uploaded audio/video (python -m services.media_server)
+    MEDIA_SERVER_HOST = os.getenv('MEDIA_SERVER_HOST', '0.0.0.0')
+    MEDIA_SERVER_PORT = int(os.getenv('MEDIA_SERVER_PORT', '8502'))
+    MEDIA_BASE_URL = os.getenv('MEDIA_BASE_URL', 'http://localhost:8502')
+    MEDIA_URL_TTL = int(os.getenv('MEDIA_URL_TTL', str(7 * 24 * 3600)))  # Seconds a signed link stays valid
+    
+    # Material access counts are buffered in memory and flushed in batches
+    ACCESS_FLUSH_INTERVAL = int(os.getenv('ACCESS_FLUSH_INTERVAL', '60'))  # Seconds
+    ACCESS_FLUSH_THRESHOLD = int(os.getenv('ACCESS_FLUSH_THRESHOLD', '500'))  # Pending accesses
     
     # Fast2SMS Template IDs
     TEMPLATE_FEE_REMINDER = 5170
     TEMPLATE_PAYMENT_RECEIPT = 5171
+    TEMPLATE_MATERIAL_SHARE = int(os.getenv('TEMPLATE_MATERIAL_SHARE', '5172'))
+    
+    # Numbers per multi-recipient Fast2SMS request when broadcasting
+    BROADCAST_CHUNK_SIZE = int(os.getenv('BROADCAST_CHUNK_SIZE', '100'))
     
     # Academy Details
     ACADEMY_NAME = "Chords Music Academy"
@@ -22,6 +38,41 @@ class Config:
     UPI_ID = "7702031818"
     SUPPORT_PHONE = "+917981585309"
     
+    # Longest class length; bounds how far back booking conflict checks look
+    MAX_CLASS_DURATION_MINUTES = int(os.getenv('MAX_CLASS_DURATION_MINUTES', '180'))
+    # How far ahead every occurrence of a new recurring booking is checked for clashes
+    RECURRING_CONFLICT_WEEKS = int(os.getenv('RECURRING_CONFLICT_WEEKS', '26'))
+    
+    # Makeup slot search: grid size and bookable hours (local time, [open, close))
+    SLOT_MINUTES = int(os.getenv('SLOT_MINUTES', '15'))
+    INSTRUCTOR_HOURS = (9, 21)  # In TIMEZONE
+    STUDENT_HOURS = (7, 22)  # In the student's own timezone
+    
+    # Rows per keyset page when reconciling counters and checking foreign keys
+    RECONCILE_CHUNK_SIZE = int(os.getenv('RECONCILE_CHUNK_SIZE', '1000'))
+    
+    # Receipt numbers reserved per database round trip (unused ones leave gaps)
+    RECEIPT_BLOCK_SIZE = int(os.getenv('RECEIPT_BLOCK_SIZE', '20'))
+    RECEIPT_WORKERS = int(os.getenv('RECEIPT_WORKERS', '0'))  # PDF render processes, 0 = one per CPU
+    
+    # Days either side of a statement line's date a payment may match it by amount and phone
+    STATEMENT_MATCH_WINDOW_DAYS = int(os.getenv('STATEMENT_MATCH_WINDOW_DAYS', '3'))
+    
+    # Cached report results are reused until their source tables change, at most this long
+    REPORT_CACHE_TTL = int(os.getenv('REPORT_CACHE_TTL', '3600'))  # Seconds
+    
+    # Signed session tokens let a reloaded page restore its login without a password check
+    SESSION_TOKEN_TTL = int(os.getenv('SESSION_TOKEN_TTL', str(12 * 3600)))  # Seconds
+    
+    # bcrypt cost for new password hashes; 0 picks the highest cost that hashes within BCRYPT_TARGET_MS here
+    BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '0'))
+    BCRYPT_TARGET_MS = int(os.getenv('BCRYPT_TARGET_MS', '250'))
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', '4'))  # Threads in the shared bcrypt pool
+    PASSWORD_CHECK_TIMEOUT = float(os.getenv('PASSWORD_CHECK_TIMEOUT', '10'))  # Seconds a login waits for the pool
+    
+    # How often active enrollments past their end date or class count are expired
+    EXPIRY_SWEEP_INTERVAL = int(os.getenv('EXPIRY_SWEEP_INTERVAL', '3600'))  # Seconds
+    
     # Package Options
     PACKAGES = {
         "1_month_8": {"name": "1 Month - 8 Classes", "classes": 8, "duration_months": 1},
@@ -3,12 +3,26 @@ from .user import User
 from .student import Student
 from .enrollment import Enrollment
 from .class_schedule import ClassSchedule
+from .class_schedule_exception import ClassScheduleException
 from .attendance import Attendance
 from .payment import Payment
 from .material import Material
 from .notification_log import NotificationLog
+from .file_blob import FileBlob
+from .material_access import MaterialAccessDaily
+from .material_assignment import MaterialAssignment
+from .job_run import JobRun
+from .receipt_sequence import ReceiptSequence
+from .report_cache import ReportCache
+from .student_cohort import StudentCohort
+from .cohort_retention import CohortRetention
+from .data_version import DataVersion
+from .revoked_token import RevokedToken
 
 __all__ = [
     'Base', 'User', 'Student', 'Enrollment', 'ClassSchedule', 
-    'Attendance', 'Payment', 'Material', 'NotificationLog'
+    'Attendance', 'Payment', 'Material', 'NotificationLog', 'FileBlob',
+    'MaterialAccessDaily', 'MaterialAssignment', 'ClassScheduleException', 'JobRun',
+    'ReceiptSequence', 'ReportCache', 'StudentCohort', 'CohortRetention', 'DataVersion',
+    'RevokedToken'
 ]
\ No newline at end of file
@@ -1,10 +1,18 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from .base import Base
 
 class ClassSchedule(Base):
     __tablename__ = "class_schedules"
+    __table_args__ = (
+        # Range lookups for calendars and booking conflict checks
+        Index("ix_class_schedules_instructor_class_date", "instructor", "class_date"),
+        Index("ix_class_schedules_student_class_date", "student_id", "class_date"),
+        # Recurring series that started before a window, without reading one-off bookings
+        Index("ix_class_schedules_instructor_recurring_class_date", "instructor", "is_recurring", "class_date"),
+        Index("ix_class_schedules_recurring_class_date", "is_recurring", "class_date"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, UniqueConstraint
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from .base import Base
+
+class ClassScheduleException(Base):
+    __tablename__ = "class_schedule_exceptions"
+    __table_args__ = (
+        UniqueConstraint("class_schedule_id", "original_date", name="uq_class_schedule_exceptions_schedule_date"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    class_schedule_id = Column(Integer, ForeignKey("class_schedules.id"), nullable=False)
+    original_date = Column(DateTime, nullable=False, index=True)  # Occurrence of the recurring series being changed
+    status = Column(String(20), nullable=False)  # cancelled, rescheduled
+    new_date = Column(DateTime, index=True)  # For rescheduled occurrences
+    new_duration_minutes = Column(Integer)
+    notes = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    # Relationships
+    class_schedule = relationship("ClassSchedule", backref="exceptions")
\ No newline at end of file
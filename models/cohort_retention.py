@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String, UniqueConstraint
+from .base import Base
+
+class CohortRetention(Base):
+    __tablename__ = "cohort_retention"
+    __table_args__ = (
+        UniqueConstraint("cohort_month", "period", name="uq_cohort_retention_cohort_period"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    cohort_month = Column(String(7), nullable=False)  # YYYY-MM
+    period = Column(Integer, nullable=False)  # Months after the cohort month
+    students = Column(Integer, nullable=False, default=0)  # Cohort students with an enrollment starting that month
\ No newline at end of file
@@ -0,0 +1,68 @@
+from sqlalchemy import Column, Integer, String, event, update
+from sqlalchemy.orm import Session
+from utils.db import dialect_insert, supports_upsert
+from .base import Base
+
+# Tables whose committed writes bump their version; cached reports key on these
+VERSIONED_TABLES = frozenset({"students", "enrollments", "payments", "attendance"})
+_WRITTEN = "versioned_tables_written"
+
+class DataVersion(Base):
+    __tablename__ = "data_versions"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    table_name = Column(String(50), nullable=False, unique=True)
+    version = Column(Integer, nullable=False, default=0)  # Bumped by every transaction that writes the table
+
+def bump_versions(session, tables):
+    """Add one to the version of each table in the session's transaction"""
+    versions = DataVersion.__table__
+    connection = session.connection()
+    # Sorted so concurrent transactions lock the counters in the same order
+    rows = [{"table_name": name, "version": 1} for name in sorted(tables)]
+    
+    if supports_upsert(session):
+        stmt = dialect_insert(session, versions)
+        connection.execute(stmt.on_conflict_do_update(
+            index_elements=[versions.c.table_name],
+            set_={"version": versions.c.version + 1}
+        ), rows)
+        return
+    
+    for row in rows:
+        bump = update(versions).where(versions.c.table_name == row["table_name"]).values(version=versions.c.version + 1)
+        if connection.execute(bump).rowcount == 0:
+            connection.execute(versions.insert().values(**row))
+
+# Every Session records the versioned tables it writes, through the ORM
+# unit of work or Core INSERT/UPDATE/DELETE, and bumps them once at commit
+def _note(session, tables):
+    written = VERSIONED_TABLES.intersection(tables)
+    if written:
+        session.info.setdefault(_WRITTEN, set()).update(written)
+
+def _pending_tables(session):
+    return [instance.__table__.name for instance in (*session.new, *session.dirty, *session.deleted)
+            if hasattr(instance, "__table__")]
+
+@event.listens_for(Session, "do_orm_execute")
+def _note_statement(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        _note(orm_execute_state.session, [getattr(table, "name", None)])
+
+@event.listens_for(Session, "after_flush")
+def _note_flush(session, flush_context):
+    _note(session, _pending_tables(session))
+
+@event.listens_for(Session, "before_commit")
+def _bump_written(session):
+    # Flush now so the commit's own flush has nothing left to record
+    session.flush()
+    written = session.info.pop(_WRITTEN, None)
+    if written:
+        bump_versions(session, written)
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_written(session, previous_transaction):
+    session.info.pop(_WRITTEN, None)
\ No newline at end of file
@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, DateTime, Numeric, Boolean, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, Numeric, Boolean, ForeignKey, Text, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from .base import Base
 
 class Enrollment(Base):
     __tablename__ = "enrollments"
+    __table_args__ = (
+        # Lets the expiry sweep find active enrollments past their end date
+        Index("ix_enrollments_status_end_date", "status", "end_date"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
@@ -17,6 +21,7 @@ class Enrollment(Base):
     end_date = Column(DateTime, nullable=False)
     status = Column(String(20), default="active")  # active, expired, cancelled
     notes = Column(Text)
+    cohort_folded_at = Column(DateTime(timezone=True), index=True)  # When refresh_cohorts counted it; NULL until then
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text
+from .base import Base
+
+class JobRun(Base):
+    __tablename__ = "job_runs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    job_name = Column(String(50), nullable=False, index=True)
+    started_at = Column(DateTime, nullable=False)
+    finished_at = Column(DateTime)
+    status = Column(String(20), default="running")  # running, completed, failed
+    rows_affected = Column(Integer, default=0)
+    error_message = Column(Text)
\ No newline at end of file
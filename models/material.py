@@ -1,10 +1,15 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from .base import Base
 
 class Material(Base):
     __tablename__ = "materials"
+    __table_args__ = (
+        # A student's materials: those addressed to them and their instructor's public ones
+        Index("ix_materials_student_id", "student_id"),
+        Index("ix_materials_instructor_is_public", "instructor", "is_public"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("students.id"))
@@ -12,11 +17,14 @@ class Material(Base):
     title = Column(String(200), nullable=False)
     description = Column(Text)
     file_path = Column(String(500))
-    file_type = Column(String(50))  # video, audio, pdf, image
+    file_type = Column(String(50), index=True)  # video, audio, pdf, image
     file_size = Column(Integer)
     lesson_number = Column(Integer)
-    instructor = Column(String(50), nullable=False)
+    instructor = Column(String(50), nullable=False, index=True)
+    instrument = Column(String(50), index=True)  # Piano, Keyboard, Guitar, Carnatic Vocal
+    skill_level = Column(String(20), index=True)  # Beginner, Intermediate, Advanced, All Levels
     is_public = Column(Boolean, default=False)  # If true, visible to all students of instructor
+    is_active = Column(Boolean, default=True, index=True)
     access_count = Column(Integer, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
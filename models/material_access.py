@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, Date, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import relationship
+from .base import Base
+
+class MaterialAccessDaily(Base):
+    __tablename__ = "material_access_daily"
+    __table_args__ = (
+        UniqueConstraint("material_id", "access_date", name="uq_material_access_daily_material_date"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    material_id = Column(Integer, ForeignKey("materials.id"), nullable=False)
+    access_date = Column(Date, nullable=False, index=True)
+    access_count = Column(Integer, nullable=False, default=0)
+    
+    # Relationships
+    material = relationship("Material", backref="daily_access")
\ No newline at end of file
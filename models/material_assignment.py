@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from .base import Base
+
+class MaterialAssignment(Base):
+    __tablename__ = "material_assignments"
+    __table_args__ = (
+        # Serves "my materials" lookups and prevents assigning a material twice
+        Index("ix_material_assignments_student_material", "student_id", "material_id", unique=True),
+        Index("ix_material_assignments_material_id", "material_id"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    material_id = Column(Integer, ForeignKey("materials.id"), nullable=False)
+    student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
+    assigned_by = Column(String(50))  # Instructor name or Admin
+    assigned_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    material = relationship("Material", backref="assignments")
+    student = relationship("Student", backref="material_assignments")
\ No newline at end of file
@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, DateTime, Numeric, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, Numeric, ForeignKey, Text, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from .base import Base
 
 class Payment(Base):
     __tablename__ = "payments"
+    __table_args__ = (
+        # Per-enrollment sums of completed payments for the dues report
+        Index("ix_payments_enrollment_status", "enrollment_id", "status"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
@@ -16,6 +20,8 @@ class Payment(Base):
     transaction_id = Column(String(100))
     status = Column(String(20), default="completed")  # pending, completed, failed, refunded
     notes = Column(Text)
+    reconciled_at = Column(DateTime, index=True)  # Set once matched to a bank/UPI statement line
+    statement_reference = Column(String(100))  # UTR / reference from the matching statement line
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -0,0 +1,9 @@
+from sqlalchemy import Column, Integer, String
+from .base import Base
+
+class ReceiptSequence(Base):
+    __tablename__ = "receipt_sequences"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    sequence_date = Column(String(8), nullable=False, unique=True)  # YYYYMMDD
+    next_value = Column(Integer, nullable=False, default=1)  # First number not yet reserved
\ No newline at end of file
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, UniqueConstraint
+from .base import Base
+
+class ReportCache(Base):
+    __tablename__ = "report_cache"
+    __table_args__ = (
+        UniqueConstraint("report_name", "params_hash", name="uq_report_cache_report_params"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    report_name = Column(String(50), nullable=False)
+    params_hash = Column(String(64), nullable=False)  # SHA-256 of the dimensions and filters
+    data_version = Column(String(64), nullable=False)  # Version stamp of the source tables when computed
+    result = Column(JSON, nullable=False)
+    computed_at = Column(DateTime, nullable=False)
\ No newline at end of file
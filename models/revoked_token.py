@@ -0,0 +1,9 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from .base import Base
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    jti = Column(String(32), nullable=False, unique=True)  # Token id from the session token's claims
+    expires_at = Column(DateTime, nullable=False, index=True)  # Row can be purged once the token has expired
\ No newline at end of file
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy.orm import relationship
+from .base import Base
+
+class StudentCohort(Base):
+    __tablename__ = "student_cohorts"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    student_id = Column(Integer, ForeignKey("students.id"), nullable=False, unique=True)
+    cohort_month = Column(String(7), nullable=False, index=True)  # YYYY-MM of the first enrollment
+    last_enrollment_id = Column(Integer, nullable=False, index=True)  # Highest enrollment id folded for the student
+    
+    # Relationships
+    student = relationship("Student", backref="cohort")
\ No newline at end of file
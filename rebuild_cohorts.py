@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Recompute student cohorts and the cohort retention matrix from all enrollments
+"""
+
+import argparse
+import sys
+from models.base import SessionLocal
+from services.cohorts import rebuild_cohorts
+
+def rebuild():
+    """Replace the incrementally maintained cohort tables with a full recount"""
+    db = SessionLocal()
+    
+    try:
+        result = rebuild_cohorts(db)
+        print(f"Rebuilt cohorts for {result['students']} students ({result['cells']} cohort cells)")
+    
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.parse_args()
+    rebuild()
\ No newline at end of file
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Check derived counters and foreign keys, optionally fixing counter drift
+"""
+
+import argparse
+import sys
+from models.base import SessionLocal
+from services.integrity import reconcile_class_counters, find_orphans
+
+def reconcile(fix=False, chunk_size=None):
+    """Report classes_used drift and orphaned rows"""
+    db = SessionLocal()
+    
+    try:
+        counters = reconcile_class_counters(db, fix=fix, chunk_size=chunk_size)
+        print(f"Checked {counters['checked']} enrollments: {counters['drifted']} drifted, {counters['fixed']} fixed")
+        for sample in counters['samples']:
+            print(f"  Enrollment {sample['enrollment_id']}: classes_used={sample['recorded']}, attendance={sample['actual']}")
+        
+        orphans = find_orphans(db, chunk_size=chunk_size)
+        if orphans:
+            print("\nOrphaned rows:")
+            for orphan in orphans:
+                sample_ids = ", ".join(str(row_id) for row_id in orphan['sample_ids'])
+                print(f"  {orphan['table']}.{orphan['column']} -> {orphan['references']}: {orphan['count']} (ids {sample_ids})")
+        else:
+            print("\nNo orphaned rows found")
+    
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("--fix", action="store_true", help="rewrite drifted classes_used counters")
+    parser.add_argument("--chunk-size", type=int, default=None, help="rows per keyset page")
+    args = parser.parse_args()
+    reconcile(fix=args.fix, chunk_size=args.chunk_size)
\ No newline at end of file
@@ -22,9 +22,13 @@ def setup_environment():
     if not env_file.exists():
         env_example = Path(".env.example")
         if env_example.exists():
-            import shutil
-            shutil.copy(env_example, env_file)
-            print("Created .env file from .env.example")
+            import secrets
+            # Session tokens are signed with SECRET_KEY, so every install gets its own
+            lines = env_example.read_text().splitlines()
+            lines = [f"SECRET_KEY={secrets.token_urlsafe(48)}" if line.startswith("SECRET_KEY=") else line
+                     for line in lines]
+            env_file.write_text("\n".join(lines) + "\n")
+            print("Created .env file from .env.example with a random SECRET_KEY")
             print("Please update .env with your settings before running the app")
             return False
     
@@ -58,6 +62,10 @@ def main():
         print("Failed to setup database. Please check your configuration.")
         return
     
+    # Start media server for uploaded audio/video
+    print("Starting media server...")
+    media_server = subprocess.Popen([sys.executable, "-m", "services.media_server"])
+    
     # Start Streamlit app
     print("Starting Streamlit application...")
     try:
@@ -66,6 +74,8 @@ def main():
         print("\nApplication stopped by user")
     except subprocess.CalledProcessError as e:
         print(f"Error running Streamlit: {e}")
+    finally:
+        media_server.terminate()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,226 @@
+import atexit
+import logging
+import threading
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import bindparam, func, update
+from config import Config
+from models.material import Material
+from models.material_access import MaterialAccessDaily
+from models.base import SessionLocal
+from utils.db import dialect_insert, supports_upsert
+
+logger = logging.getLogger(__name__)
+
+class MaterialAccessTracker:
+    """Accumulates material opens in memory and writes them in batches.
+    
+    Each flush issues one executemany UPDATE of materials.access_count and
+    one executemany upsert into the per-day rollup table, however many
+    opens were recorded since the last flush.
+    """
+    
+    def __init__(self, flush_interval: Optional[int] = None, flush_threshold: Optional[int] = None):
+        self.flush_interval = flush_interval or Config.ACCESS_FLUSH_INTERVAL
+        self.flush_threshold = flush_threshold or Config.ACCESS_FLUSH_THRESHOLD
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._counts: Dict[Tuple[int, date], int] = defaultdict(int)
+        self._pending = 0
+        self._retrying = set()  # Keys put back by the last failed flush
+        self._timer = None
+    
+    def record(self, material_id: int, when: Optional[datetime] = None):
+        """Count one access; flushes early once the threshold is reached"""
+        access_date = (when or datetime.now()).date()
+        with self._lock:
+            self._counts[(material_id, access_date)] += 1
+            self._pending += 1
+            should_flush = self._pending >= self.flush_threshold
+        
+        if should_flush:
+            self.flush()
+    
+    def pending(self) -> int:
+        """Number of accesses recorded but not yet written"""
+        with self._lock:
+            return self._pending
+    
+    def flush(self) -> int:
+        """Write accumulated counts to the database; returns accesses flushed.
+        
+        When the write fails, counts for materials deleted since they were
+        opened are dropped and the rest retried at once. Whatever still
+        fails goes back into the buffer for one more flush and is discarded
+        (and logged) if that fails too, so one bad row cannot block every
+        later flush or grow the buffer without limit.
+        """
+        with self._flush_lock:
+            with self._lock:
+                counts, self._counts = self._counts, defaultdict(int)
+                self._pending = 0
+            if not counts:
+                return 0
+            
+            try:
+                self._write(counts)
+            except Exception as e:
+                logger.error(f"Failed to flush material access counts: {str(e)}")
+                counts = self._drop_missing(counts)
+                try:
+                    if counts:
+                        self._write(counts)
+                except Exception as e:
+                    logger.error(f"Failed to flush material access counts again: {str(e)}")
+                    self._requeue(counts)
+                    return 0
+            
+            self._retrying = set()
+            return sum(counts.values())
+    
+    def _write(self, counts: Dict[Tuple[int, date], int]):
+        """One transaction adding counts to materials.access_count and the daily rollups"""
+        totals = defaultdict(int)
+        for (material_id, _), hits in counts.items():
+            totals[material_id] += hits
+        
+        db = SessionLocal()
+        try:
+            materials = Material.__table__
+            db.execute(
+                update(materials)
+                .where(materials.c.id == bindparam("b_material_id"))
+                .values(access_count=func.coalesce(materials.c.access_count, 0) + bindparam("b_hits")),
+                [{"b_material_id": material_id, "b_hits": hits} for material_id, hits in totals.items()]
+            )
+            self._upsert_daily(db, counts)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    
+    def _drop_missing(self, counts: Dict[Tuple[int, date], int]) -> Dict[Tuple[int, date], int]:
+        """Counts whose material still exists; the others are logged and dropped"""
+        material_ids = {material_id for material_id, _ in counts}
+        db = SessionLocal()
+        try:
+            existing = {row.id for row in db.query(Material.id).filter(Material.id.in_(material_ids))}
+        except Exception as e:
+            logger.error(f"Failed to check materials for access counts: {str(e)}")
+            return counts
+        finally:
+            db.close()
+        
+        missing = material_ids - existing
+        if missing:
+            dropped = sum(hits for (material_id, _), hits in counts.items() if material_id in missing)
+            logger.warning(f"Dropped {dropped} accesses to deleted materials {sorted(missing)}")
+        return {key: hits for key, hits in counts.items() if key[0] in existing}
+    
+    def _requeue(self, counts: Dict[Tuple[int, date], int]):
+        """Put failed counts back for the next flush, unless they already failed one"""
+        requeued = set()
+        dropped = 0
+        with self._lock:
+            for key, hits in counts.items():
+                if key in self._retrying:
+                    dropped += hits
+                    continue
+                self._counts[key] += hits
+                self._pending += hits
+                requeued.add(key)
+        self._retrying = requeued
+        if dropped:
+            logger.error(f"Discarded {dropped} material accesses that failed two flushes")
+    
+    def _upsert_daily(self, db, counts: Dict[Tuple[int, date], int]):
+        """Add counts to the (material, day) rollup rows"""
+        rows = [
+            {"material_id": material_id, "access_date": access_date, "access_count": hits}
+            for (material_id, access_date), hits in counts.items()
+        ]
+        daily = MaterialAccessDaily.__table__
+        
+        if supports_upsert(db):
+            stmt = dialect_insert(db, daily)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[daily.c.material_id, daily.c.access_date],
+                set_={"access_count": daily.c.access_count + stmt.excluded.access_count}
+            )
+            db.execute(stmt, rows)
+            return
+        
+        for row in rows:
+            result = db.execute(
+                update(daily)
+                .where(daily.c.material_id == row["material_id"], daily.c.access_date == row["access_date"])
+                .values(access_count=daily.c.access_count + row["access_count"])
+            )
+            if result.rowcount == 0:
+                db.execute(daily.insert(), row)
+    
+    def start(self):
+        """Flush every flush_interval seconds on a daemon timer"""
+        with self._lock:
+            if self._timer is not None:
+                return
+            self._schedule()
+        atexit.register(self.stop)
+    
+    def _schedule(self):
+        self._timer = threading.Timer(self.flush_interval, self._tick)
+        self._timer.daemon = True
+        self._timer.start()
+    
+    def _tick(self):
+        try:
+            self.flush()
+        finally:
+            with self._lock:
+                if self._timer is not None:
+                    self._schedule()
+    
+    def stop(self):
+        """Cancel the timer and write whatever is still pending"""
+        with self._lock:
+            timer, self._timer = self._timer, None
+        if timer:
+            timer.cancel()
+        self.flush()
+
+_tracker = None
+_tracker_lock = threading.Lock()
+
+def get_access_tracker() -> MaterialAccessTracker:
+    """Process-wide tracker, started on first use"""
+    global _tracker
+    with _tracker_lock:
+        if _tracker is None:
+            _tracker = MaterialAccessTracker()
+            _tracker.start()
+        return _tracker
+
+def popular_materials(db, days: int = 30, limit: int = 10, instructor: Optional[str] = None) -> List[Dict]:
+    """Most opened materials over the last ``days`` days, from the daily rollups"""
+    since = date.today() - timedelta(days=days - 1)
+    total = func.sum(MaterialAccessDaily.access_count).label("accesses")
+    
+    query = db.query(Material.id, Material.title, Material.instructor, Material.file_type, total) \
+        .join(MaterialAccessDaily, MaterialAccessDaily.material_id == Material.id) \
+        .filter(MaterialAccessDaily.access_date >= since)
+    if instructor:
+        query = query.filter(Material.instructor == instructor)
+    
+    rows = query.group_by(Material.id, Material.title, Material.instructor, Material.file_type) \
+        .order_by(total.desc()) \
+        .limit(limit) \
+        .all()
+    
+    return [
+        {"material_id": row.id, "title": row.title, "instructor": row.instructor,
+         "type": row.file_type, "accesses": int(row.accesses)}
+        for row in rows
+    ]
\ No newline at end of file
@@ -0,0 +1,115 @@
+import logging
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Dict, List
+from sqlalchemy import case, func, insert, update
+from models.attendance import Attendance
+from models.enrollment import Enrollment
+from models.student import Student
+from services.schedule_engine import schedule_engine
+from utils.db import dialect_insert, supports_upsert
+
+logger = logging.getLogger(__name__)
+
+ATTENDANCE_STATUSES = ["present", "absent", "makeup", "cancelled"]
+# Statuses that consume a class from the enrollment's package
+COUNTED_STATUSES = ("present", "makeup")
+
+def roll_call_sheet(db, instructor: str, day: date) -> List[Dict]:
+    """One row per class the instructor has on ``day``, with any status already marked"""
+    start = datetime.combine(day, datetime.min.time())
+    end = start + timedelta(days=1)
+    occurrences = schedule_engine.occurrences(db, start, end, instructor=instructor)
+    if not occurrences:
+        return []
+    
+    student_ids = {occurrence["student_id"] for occurrence in occurrences}
+    names = dict(db.query(Student.id, Student.name).filter(Student.id.in_(student_ids)).all())
+    marked = {
+        (row.student_id, row.class_date): row.status
+        for row in db.query(Attendance.student_id, Attendance.class_date, Attendance.status).filter(
+            Attendance.instructor == instructor,
+            Attendance.class_date >= start,
+            Attendance.class_date < end
+        )
+    }
+    
+    return [
+        dict(occurrence, student_name=names.get(occurrence["student_id"], "Unknown"),
+             marked_status=marked.get((occurrence["student_id"], occurrence["start"])))
+        for occurrence in occurrences
+    ]
+
+def record_roll_call(db, instructor: str, day: date, marks: List[Dict]) -> Dict:
+    """Record a day's attendance for an instructor in a single transaction.
+    
+    ``marks`` are dicts with student_id, enrollment_id, class_date, status
+    and optionally class_schedule_id, notes and lesson_topic. Whatever the
+    batch size this issues a fixed number of statements: one bulk
+    ``INSERT ... ON CONFLICT (student_id, class_date) DO NOTHING RETURNING``
+    into attendance and one set-based ``UPDATE enrollments SET
+    classes_used = classes_used + CASE id ...``. The unique index decides
+    which classes are new, so two roll calls saving the same class at once
+    record it once, and only the rows actually inserted are counted.
+    Dialects without ON CONFLICT read the day's marked rows first instead.
+    """
+    for mark in marks:
+        if mark["status"] not in ATTENDANCE_STATUSES:
+            raise ValueError(f"Invalid attendance status: {mark['status']}")
+    
+    rows = []
+    seen = set()
+    for mark in marks:
+        key = (mark["student_id"], mark["class_date"])
+        if key in seen:
+            continue
+        seen.add(key)
+        rows.append({
+            "student_id": mark["student_id"],
+            "enrollment_id": mark["enrollment_id"],
+            "class_schedule_id": mark.get("class_schedule_id"),
+            "class_date": mark["class_date"],
+            "instructor": instructor,
+            "status": mark["status"],
+            "notes": mark.get("notes"),
+            "lesson_topic": mark.get("lesson_topic")
+        })
+    
+    attendance = Attendance.__table__
+    try:
+        if not rows:
+            inserted = []
+        elif supports_upsert(db):
+            stmt = dialect_insert(db, attendance).on_conflict_do_nothing(
+                index_elements=[attendance.c.student_id, attendance.c.class_date]
+            ).returning(attendance.c.enrollment_id, attendance.c.status)
+            inserted = db.execute(stmt, rows).all()
+        else:
+            start = datetime.combine(day, datetime.min.time())
+            already_marked = set(db.query(Attendance.student_id, Attendance.class_date).filter(
+                Attendance.student_id.in_({row["student_id"] for row in rows}),
+                Attendance.class_date >= start,
+                Attendance.class_date < start + timedelta(days=1)
+            ).all())
+            rows = [row for row in rows if (row["student_id"], row["class_date"]) not in already_marked]
+            if rows:
+                db.execute(insert(attendance), rows)
+            inserted = [(row["enrollment_id"], row["status"]) for row in rows]
+        
+        increments = Counter(enrollment_id for enrollment_id, status in inserted if status in COUNTED_STATUSES)
+        if increments:
+            db.execute(
+                update(Enrollment)
+                .where(Enrollment.id.in_(list(increments)))
+                .values(classes_used=func.coalesce(Enrollment.classes_used, 0) +
+                        case(dict(increments), value=Enrollment.id, else_=0),
+                        updated_at=func.now())
+                .execution_options(synchronize_session=False)
+            )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    
+    logger.info(f"Roll call for {instructor} on {day}: {len(inserted)} recorded, {len(marks) - len(inserted)} skipped")
+    return {"recorded": len(inserted), "skipped": len(marks) - len(inserted), "enrollments_updated": len(increments)}
\ No newline at end of file
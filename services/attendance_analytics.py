@@ -0,0 +1,115 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, select
+from config import Config
+from models.attendance import Attendance
+from models.class_schedule import ClassSchedule
+from services.attendance import COUNTED_STATUSES
+from services.schedule_engine import schedule_engine
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+MINUTES_PER_DAY = 24 * 60
+
+def _attendance_arrays(db, start: datetime, end: datetime, instructor: Optional[str] = None,
+                       student_id: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """Attendance in [start, end) as one NumPy array per column.
+    
+    One projected query; the class length comes from the linked schedule
+    (60 minutes when there is none).
+    """
+    stmt = select(
+        Attendance.class_date, Attendance.status, Attendance.instructor,
+        func.coalesce(ClassSchedule.duration_minutes, 60)
+    ).outerjoin(ClassSchedule, Attendance.class_schedule_id == ClassSchedule.id) \
+        .where(Attendance.class_date >= start, Attendance.class_date < end)
+    if instructor:
+        stmt = stmt.where(Attendance.instructor == instructor)
+    if student_id:
+        stmt = stmt.where(Attendance.student_id == student_id)
+    
+    rows = db.execute(stmt).all()
+    class_dates, statuses, instructors, durations = zip(*rows) if rows else ((), (), (), ())
+    return {
+        "class_date": np.array(class_dates, dtype="datetime64[m]"),
+        "status": np.array(statuses, dtype=str),
+        "instructor": np.array(instructors, dtype=str),
+        "duration": np.array(durations, dtype=np.int64)
+    }
+
+def attendance_heatmap(db, start: datetime, end: datetime, instructor: Optional[str] = None,
+                       student_id: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """Weekday × hour grids (7 × 24, Monday first) of classes held, attended and no-shows.
+    
+    Each class falls in the bin weekday * 24 + hour of its academy-local
+    start time, computed on the whole array at once, and every grid is a
+    single np.bincount. ``no_show_rate`` is absences as a percentage of
+    classes held, NaN where nothing was held.
+    """
+    data = _attendance_arrays(db, start, end, instructor, student_id)
+    minutes = data["class_date"].astype(np.int64)
+    # 1970-01-01 was a Thursday, weekday 3 when Monday is 0
+    weekday = (minutes // MINUTES_PER_DAY + 3) % 7
+    hour = minutes % MINUTES_PER_DAY // 60
+    cells = weekday * 24 + hour
+    
+    held = data["status"] != "cancelled"
+    attended = np.isin(data["status"], COUNTED_STATUSES)
+    no_show = data["status"] == "absent"
+    
+    def grid(mask):
+        return np.bincount(cells[mask], minlength=7 * 24).reshape(7, 24)
+    
+    classes = grid(held)
+    no_shows = grid(no_show)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        no_show_rate = np.where(classes > 0, 100.0 * no_shows / classes, np.nan)
+    
+    return {"classes": classes, "attended": grid(attended), "no_shows": no_shows, "no_show_rate": no_show_rate}
+
+def instructor_utilization(db, start: datetime, end: datetime,
+                           instructors: Optional[Iterable[str]] = None) -> List[Dict]:
+    """Booked, delivered and available teaching minutes per instructor.
+    
+    Booked minutes are the scheduled (non-cancelled) class occurrences in
+    [start, end) and delivered minutes the attended or missed classes in
+    Attendance; both are summed per instructor with np.bincount over
+    factorized instructor codes. Available minutes are the instructor's
+    working hours (Config.INSTRUCTOR_HOURS) on every day of the range.
+    """
+    instructors = list(instructors or Config.INSTRUCTORS)
+    names = pd.Index(instructors)
+    
+    occurrences = schedule_engine.occurrences(db, start, end)
+    booked_codes = names.get_indexer([occurrence["instructor"] for occurrence in occurrences])
+    booked_minutes = np.array([occurrence["duration_minutes"] for occurrence in occurrences], dtype=np.int64)
+    known = booked_codes >= 0
+    booked = np.bincount(booked_codes[known], weights=booked_minutes[known], minlength=len(names))
+    
+    data = _attendance_arrays(db, start, end)
+    codes = names.get_indexer(data["instructor"])
+    held = (codes >= 0) & (data["status"] != "cancelled")
+    delivered = np.bincount(codes[held], weights=data["duration"][held], minlength=len(names))
+    classes = np.bincount(codes[held], minlength=len(names))
+    no_shows = np.bincount(codes[held & (data["status"] == "absent")], minlength=len(names))
+    
+    open_hour, close_hour = Config.INSTRUCTOR_HOURS
+    days = max((end - start).total_seconds() / 86400, 0)
+    available = days * (close_hour - open_hour) * 60
+    
+    with np.errstate(divide="ignore", invalid="ignore"):
+        utilization = np.round(100.0 * booked / available, 1) if available else np.zeros(len(names))
+        no_show_rate = np.where(classes > 0, np.round(100.0 * no_shows / classes, 1), 0.0)
+    
+    return [
+        {
+            "instructor": name,
+            "booked_minutes": int(booked[i]),
+            "delivered_minutes": int(delivered[i]),
+            "available_minutes": int(available),
+            "utilization": float(utilization[i]),
+            "no_show_rate": float(no_show_rate[i])
+        }
+        for i, name in enumerate(instructors)
+    ]
\ No newline at end of file
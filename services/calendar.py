@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+import pandas as pd
+from config import Config
+from models.enrollment import Enrollment
+from models.student import Student
+from services.schedule_engine import schedule_engine
+from utils.timezones import add_local_times
+
+def week_calendar(db, instructor: str, week_start: datetime, viewer_zone: Optional[str] = None) -> Dict:
+    """An instructor's week laid out day by day for the schedule page.
+    
+    Classes come from the schedule engine (two queries) and the student and
+    package details shown on each card from one projected join of
+    enrollments and students, so the page costs three queries however many
+    classes the week holds and never touches the lazy relationships. Times
+    are converted to the viewer's and each student's zone in one
+    vectorized pass.
+    """
+    week_start = week_start.replace(hour=0, minute=0, second=0, microsecond=0)
+    occurrences = schedule_engine.week(db, instructor, week_start)
+    days = [{"date": (week_start + timedelta(days=offset)).date(), "classes": []} for offset in range(7)]
+    if not occurrences:
+        return {"week_start": week_start, "instructor": instructor, "days": days, "total": 0}
+    
+    enrollment_ids = {occurrence["enrollment_id"] for occurrence in occurrences}
+    details = {
+        row.enrollment_id: row
+        for row in db.query(
+            Enrollment.id.label("enrollment_id"), Enrollment.package_type, Enrollment.total_classes,
+            Enrollment.classes_used, Student.name, Student.timezone, Student.preferred_instrument
+        ).join(Student, Enrollment.student_id == Student.id).filter(Enrollment.id.in_(enrollment_ids))
+    }
+    
+    frame = pd.DataFrame({
+        "class_date": [occurrence["start"] for occurrence in occurrences],
+        "student_timezone": [getattr(details.get(occurrence["enrollment_id"]), "timezone", None)
+                             for occurrence in occurrences]
+    })
+    frame = add_local_times(frame, viewer_zone or Config.TIMEZONE)
+    
+    for occurrence, my_time, student_time in zip(occurrences, frame["my_time"], frame["student_time"]):
+        detail = details.get(occurrence["enrollment_id"])
+        day_index = (occurrence["start"].date() - week_start.date()).days
+        days[day_index]["classes"].append({
+            "schedule_id": occurrence["schedule_id"],
+            "start": occurrence["start"],
+            "end": occurrence["end"],
+            "my_time": my_time.to_pydatetime(),
+            "student_time": student_time.to_pydatetime(),
+            "student_timezone": (detail.timezone if detail else None) or Config.TIMEZONE,
+            "student_name": detail.name if detail else "Unknown",
+            "instrument": detail.preferred_instrument if detail else None,
+            "package": Config.PACKAGES.get(detail.package_type, {}).get("name", detail.package_type) if detail else None,
+            "classes_remaining": detail.total_classes - (detail.classes_used or 0) if detail else None,
+            "status": occurrence["status"],
+            "is_recurring": occurrence["is_recurring"]
+        })
+    
+    return {"week_start": week_start, "instructor": instructor, "days": days, "total": len(occurrences)}
\ No newline at end of file
@@ -0,0 +1,287 @@
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+from sqlalchemy import bindparam, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from models.base import SessionLocal
+from models.cohort_retention import CohortRetention
+from models.enrollment import Enrollment
+from models.job_run import JobRun
+from models.student_cohort import StudentCohort
+from utils.db import dialect_insert, supports_upsert
+
+logger = logging.getLogger(__name__)
+
+# New enrollments folded into the matrix per batch
+BATCH_SIZE = 1000
+# Batches in a row another refresh may claim first before giving up
+MAX_CLAIM_RETRIES = 5
+JOB_NAME = "cohort_refresh"
+
+def _month(value: datetime) -> str:
+    return value.strftime("%Y-%m")
+
+def _period(cohort_month: str, month: str) -> int:
+    """Whole months from the cohort month to ``month``"""
+    cohort_year, cohort_mon = map(int, cohort_month.split("-"))
+    year, mon = map(int, month.split("-"))
+    return (year - cohort_year) * 12 + (mon - cohort_mon)
+
+def _cells(months: Set[str]) -> Dict:
+    """(cohort, period) cells a student with these enrollment months counts in"""
+    cohort_month = min(months)
+    return {(cohort_month, _period(cohort_month, month)): 1 for month in months}
+
+def refresh_cohorts(db, batch_size: Optional[int] = None) -> Dict:
+    """Fold enrollments not yet counted into the cohort matrix.
+    
+    Each enrollment is marked with cohort_folded_at in the same transaction
+    that counts it, so enrollments committed out of id order are still
+    picked up. A batch is claimed with a conditional UPDATE (only rows
+    still unmarked) and the students' cohort rows are locked before their
+    earlier months are read; when another refresh got there first the
+    batch is rolled back and re-read, so no enrollment is counted twice
+    even across processes.
+    
+    For each batch only the earlier enrollment months of the students
+    involved are loaded, the (cohort, period) cells each student gains
+    are worked out, and the differences are applied as counter
+    increments. A student whose new enrollment is backdated before their
+    cohort month moves cohort: their old cells are decremented and the new
+    ones incremented. Deleted enrollments and edited start dates need
+    rebuild_cohorts.
+    """
+    batch_size = batch_size or BATCH_SIZE
+    processed = 0
+    conflicts = 0
+    
+    while True:
+        batch = db.execute(
+            select(Enrollment.id, Enrollment.student_id, Enrollment.start_date)
+            .where(Enrollment.cohort_folded_at.is_(None))
+            .order_by(Enrollment.id)
+            .limit(batch_size)
+        ).all()
+        if not batch:
+            break
+        
+        try:
+            claimed = _fold_batch(db, batch)
+            if claimed:
+                db.commit()
+                processed += len(batch)
+                conflicts = 0
+                continue
+            db.rollback()
+        except IntegrityError:
+            # Another refresh created one of these students' cohort rows first
+            db.rollback()
+        except Exception as e:
+            logger.error(f"Failed to refresh cohorts from enrollment {batch[0].id}: {str(e)}")
+            db.rollback()
+            raise
+        
+        conflicts += 1
+        if conflicts > MAX_CLAIM_RETRIES:
+            raise RuntimeError("Cohort refresh kept colliding with another refresh")
+    
+    if processed:
+        logger.info(f"Folded {processed} enrollments into cohort retention")
+    return {"processed": processed}
+
+def run_cohort_refresh() -> int:
+    """Run refresh_cohorts in its own session and record it in job_runs.
+    
+    Called by the background sweeper so the reports page only reads the
+    matrix and never takes write locks.
+    """
+    db = SessionLocal()
+    started_at = datetime.now()
+    
+    try:
+        processed = refresh_cohorts(db)["processed"]
+        db.add(JobRun(job_name=JOB_NAME, started_at=started_at, finished_at=datetime.now(),
+                      status="completed", rows_affected=processed))
+        db.commit()
+        return processed
+    except Exception as e:
+        logger.error(f"Cohort refresh failed: {str(e)}")
+        db.rollback()
+        db.add(JobRun(job_name=JOB_NAME, started_at=started_at, finished_at=datetime.now(),
+                      status="failed", rows_affected=0, error_message=str(e)))
+        db.commit()
+        return 0
+    finally:
+        db.close()
+
+def _fold_batch(db, batch) -> bool:
+    """Count a batch into the matrix; False when another refresh claimed part of it"""
+    batch_ids = [row.id for row in batch]
+    enrollments = Enrollment.__table__
+    claimed = db.execute(
+        update(enrollments)
+        .where(enrollments.c.id.in_(batch_ids), enrollments.c.cohort_folded_at.is_(None))
+        .values(cohort_folded_at=func.now())
+    ).rowcount
+    if claimed != len(batch_ids):
+        return False
+    
+    new_months = defaultdict(set)
+    last_ids = {}
+    for enrollment_id, student_id, start_date in batch:
+        new_months[student_id].add(_month(start_date))
+        last_ids[student_id] = enrollment_id
+    
+    # Lock the students' cohort rows so a concurrent refresh folds them after us
+    known = dict(db.execute(
+        select(StudentCohort.student_id, StudentCohort.last_enrollment_id)
+        .where(StudentCohort.student_id.in_(list(new_months)))
+        .with_for_update()
+    ).all())
+    # Months each student was already counted for
+    old_months = defaultdict(set)
+    for student_id, start_date in db.execute(
+            select(Enrollment.student_id, Enrollment.start_date)
+            .where(Enrollment.student_id.in_(list(new_months)), Enrollment.cohort_folded_at.isnot(None),
+                   Enrollment.id.notin_(batch_ids))):
+        old_months[student_id].add(_month(start_date))
+    
+    deltas = defaultdict(int)
+    cohort_inserts, cohort_updates = [], []
+    for student_id, months in new_months.items():
+        before = old_months.get(student_id, set())
+        after = before | months
+        if before:
+            for cell in _cells(before):
+                deltas[cell] -= 1
+        for cell in _cells(after):
+            deltas[cell] += 1
+        
+        row = {"cohort_month": min(after), "last_enrollment_id": max(last_ids[student_id], known.get(student_id) or 0)}
+        if student_id in known:
+            cohort_updates.append({"b_student_id": student_id, **{f"b_{k}": v for k, v in row.items()}})
+        else:
+            cohort_inserts.append({"student_id": student_id, **row})
+    
+    _apply_deltas(db, {cell: delta for cell, delta in deltas.items() if delta})
+    if cohort_inserts:
+        db.execute(insert(StudentCohort), cohort_inserts)
+    if cohort_updates:
+        cohorts = StudentCohort.__table__
+        db.execute(
+            update(cohorts)
+            .where(cohorts.c.student_id == bindparam("b_student_id"))
+            .values(cohort_month=bindparam("b_cohort_month"), last_enrollment_id=bindparam("b_last_enrollment_id")),
+            cohort_updates
+        )
+    return True
+
+def _apply_deltas(db, deltas: Dict):
+    """Add each delta to its (cohort, period) counter, creating missing cells"""
+    if not deltas:
+        return
+    retention = CohortRetention.__table__
+    rows = [{"cohort_month": cohort_month, "period": period, "students": delta}
+            for (cohort_month, period), delta in deltas.items()]
+    
+    if supports_upsert(db):
+        stmt = dialect_insert(db, retention)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[retention.c.cohort_month, retention.c.period],
+            set_={"students": retention.c.students + stmt.excluded.students}
+        ), rows)
+        return
+    
+    for row in rows:
+        bump = update(retention).where(
+            retention.c.cohort_month == row["cohort_month"], retention.c.period == row["period"]
+        ).values(students=retention.c.students + row["students"])
+        if db.execute(bump).rowcount == 0:
+            db.execute(retention.insert().values(**row))
+
+def rebuild_cohorts(db) -> Dict:
+    """Recompute student cohorts and the retention matrix from every enrollment.
+    
+    For backfills and after enrollments are deleted or their start dates
+    edited. Every enrollment is first marked as folded, then the marked
+    ones are streamed in student order and each student's months are
+    reduced to cohort cells before the next student is read. Enrollments
+    added meanwhile stay unmarked for the next refresh_cohorts.
+    """
+    counts = defaultdict(int)
+    cohort_rows = []
+    current, months, last_id = None, set(), 0
+    
+    def finish():
+        for cell in _cells(months):
+            counts[cell] += 1
+        cohort_rows.append({"student_id": current, "cohort_month": min(months), "last_enrollment_id": last_id})
+    
+    try:
+        enrollments = Enrollment.__table__
+        db.execute(update(enrollments).where(enrollments.c.cohort_folded_at.is_(None))
+                   .values(cohort_folded_at=func.now()))
+        rows = db.execute(
+            select(Enrollment.student_id, Enrollment.id, Enrollment.start_date)
+            .where(Enrollment.cohort_folded_at.isnot(None))
+            .order_by(Enrollment.student_id)
+            .execution_options(yield_per=BATCH_SIZE)
+        )
+        for student_id, enrollment_id, start_date in rows:
+            if student_id != current:
+                if current is not None:
+                    finish()
+                current, months, last_id = student_id, set(), 0
+            months.add(_month(start_date))
+            last_id = max(last_id, enrollment_id)
+        if current is not None:
+            finish()
+        
+        db.query(CohortRetention).delete(synchronize_session=False)
+        db.query(StudentCohort).delete(synchronize_session=False)
+        if cohort_rows:
+            db.execute(insert(StudentCohort), cohort_rows)
+        if counts:
+            db.execute(insert(CohortRetention), [
+                {"cohort_month": cohort_month, "period": period, "students": students}
+                for (cohort_month, period), students in counts.items()
+            ])
+        db.commit()
+    except Exception as e:
+        logger.error(f"Failed to rebuild cohorts: {str(e)}")
+        db.rollback()
+        raise
+    
+    logger.info(f"Rebuilt cohorts for {len(cohort_rows)} students")
+    return {"students": len(cohort_rows), "cells": len(counts)}
+
+def retention_matrix(db, max_periods: int = 12, since: Optional[str] = None) -> List[Dict]:
+    """Cohort rows read from the precomputed matrix, oldest cohort first.
+    
+    Each row has the cohort month, its size (period 0) and, for periods 0 to
+    ``max_periods``, the number of students active and their share of the
+    cohort in percent (None for months that have not happened yet).
+    """
+    query = db.query(CohortRetention.cohort_month, CohortRetention.period, CohortRetention.students) \
+        .filter(CohortRetention.period <= max_periods)
+    if since:
+        query = query.filter(CohortRetention.cohort_month >= since)
+    
+    cohorts = defaultdict(lambda: [0] * (max_periods + 1))
+    for cohort_month, period, students in query:
+        cohorts[cohort_month][period] = students
+    
+    this_month = _month(datetime.now())
+    matrix = []
+    for cohort_month in sorted(cohorts):
+        elapsed = _period(cohort_month, this_month)
+        students = [count if period <= elapsed else None for period, count in enumerate(cohorts[cohort_month])]
+        size = students[0]
+        matrix.append({
+            "cohort": cohort_month,
+            "size": size,
+            "students": students,
+            "retention": [round(100.0 * count / size, 1) if count is not None and size else None for count in students]
+        })
+    return matrix
\ No newline at end of file
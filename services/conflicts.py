@@ -0,0 +1,129 @@
+import heapq
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+from dateutil.rrule import rrulestr
+from config import Config
+from services.schedule_engine import schedule_engine
+
+def _lookback() -> timedelta:
+    """How far before a window a class can start and still overlap it"""
+    return timedelta(minutes=Config.MAX_CLASS_DURATION_MINUTES)
+
+def find_conflicts(db, start: datetime, duration_minutes: int, instructor: Optional[str] = None,
+                   student_id: Optional[int] = None, exclude_schedule_id: Optional[int] = None) -> List[Dict]:
+    """Existing classes that overlap a proposed booking for its instructor or student.
+    
+    One-off classes are fetched through the (instructor, class_date) and
+    (student_id, class_date) indexes only when they start between
+    start - MAX_CLASS_DURATION_MINUTES and the proposed end. Recurring
+    series that began earlier come from a separate query on the
+    (instructor, is_recurring, class_date) index, so past one-off bookings
+    are never read.
+    """
+    return _conflicts(db, [start], duration_minutes, instructor, student_id, exclude_schedule_id)
+
+def find_series_conflicts(db, start: datetime, duration_minutes: int, recurrence_rule: str,
+                          instructor: Optional[str] = None, student_id: Optional[int] = None,
+                          weeks: Optional[int] = None) -> List[Dict]:
+    """Existing classes that overlap any occurrence of a proposed recurring booking.
+    
+    The rule is expanded from ``start`` over the following ``weeks`` weeks
+    (RECURRING_CONFLICT_WEEKS by default) and every occurrence is checked
+    with one engine call for the instructor and one for the student. Each
+    conflict carries the clashing occurrence as ``booking_start``.
+    """
+    horizon = start + timedelta(weeks=weeks or Config.RECURRING_CONFLICT_WEEKS)
+    rule = rrulestr(recurrence_rule, dtstart=start)
+    starts = [occurrence for occurrence in rule.between(start, horizon, inc=True) if occurrence < horizon]
+    return _conflicts(db, starts, duration_minutes, instructor, student_id)
+
+def _conflicts(db, starts: List[datetime], duration_minutes: int, instructor: Optional[str],
+               student_id: Optional[int], exclude_schedule_id: Optional[int] = None) -> List[Dict]:
+    """Existing classes overlapping any of several proposed starts of the same length"""
+    if not starts:
+        return []
+    starts = sorted(starts)
+    length = timedelta(minutes=duration_minutes)
+    conflicts = {}
+    
+    for conflict_on, value in (("instructor", instructor), ("student_id", student_id)):
+        if not value:
+            continue
+        occurrences = schedule_engine.occurrences(db, starts[0] - _lookback(), starts[-1] + length, **{conflict_on: value})
+        for occurrence in occurrences:
+            if occurrence["schedule_id"] == exclude_schedule_id:
+                continue
+            # Proposed starts that end after this class begins, while they begin before it ends
+            index = bisect_right(starts, occurrence["start"] - length)
+            while index < len(starts) and starts[index] < occurrence["end"]:
+                key = (occurrence["schedule_id"], occurrence["start"])
+                conflict = conflicts.setdefault(key, dict(occurrence, conflict_on=[], booking_start=starts[index]))
+                if conflict_on not in conflict["conflict_on"]:
+                    conflict["conflict_on"].append(conflict_on)
+                index += 1
+    
+    return sorted(conflicts.values(), key=lambda conflict: conflict["start"])
+
+def validate_timetable(db, entries: Iterable[Dict], check_existing: bool = True) -> List[Dict]:
+    """Find every overlap in an imported timetable in one sweep.
+    
+    ``entries`` are dicts with instructor, student_id, start and
+    duration_minutes. Existing classes in the timetable's date range are
+    loaded with a single engine call when ``check_existing`` is set. Each
+    instructor's and each student's intervals are then swept in start order
+    with a min-heap of end times, which is O(n log n) plus the number of
+    overlaps found. Returns one dict per overlapping pair.
+    """
+    intervals = []
+    for index, entry in enumerate(entries):
+        entry_start = entry["start"]
+        entry_end = entry_start + timedelta(minutes=entry.get("duration_minutes") or 60)
+        intervals.append({
+            "source": "import", "index": index, "start": entry_start, "end": entry_end,
+            "instructor": entry.get("instructor"), "student_id": entry.get("student_id")
+        })
+    if not intervals:
+        return []
+    
+    if check_existing:
+        window_start = min(interval["start"] for interval in intervals) - _lookback()
+        window_end = max(interval["end"] for interval in intervals)
+        for occurrence in schedule_engine.occurrences(db, window_start, window_end):
+            intervals.append({
+                "source": "existing", "schedule_id": occurrence["schedule_id"],
+                "start": occurrence["start"], "end": occurrence["end"],
+                "instructor": occurrence["instructor"], "student_id": occurrence["student_id"]
+            })
+    
+    conflicts = []
+    for conflict_on in ("instructor", "student_id"):
+        groups = defaultdict(list)
+        for interval in intervals:
+            if interval[conflict_on]:
+                groups[interval[conflict_on]].append(interval)
+        
+        for value, group in groups.items():
+            group.sort(key=lambda interval: interval["start"])
+            active = []  # (end, sequence, interval) of intervals still running
+            for sequence, interval in enumerate(group):
+                while active and active[0][0] <= interval["start"]:
+                    heapq.heappop(active)
+                for _, _, other in active:
+                    # Clashes between two existing classes are not the import's problem
+                    if other["source"] == "existing" and interval["source"] == "existing":
+                        continue
+                    conflicts.append({"conflict_on": conflict_on, "value": value,
+                                      "first": _describe(other), "second": _describe(interval)})
+                heapq.heappush(active, (interval["end"], sequence, interval))
+    
+    return conflicts
+
+def _describe(interval: Dict) -> Dict:
+    described = {"source": interval["source"], "start": interval["start"], "end": interval["end"]}
+    if interval["source"] == "import":
+        described["index"] = interval["index"]
+    else:
+        described["schedule_id"] = interval["schedule_id"]
+    return described
\ No newline at end of file
@@ -0,0 +1,116 @@
+from typing import Dict, List, Optional
+from sqlalchemy import and_, func, select
+from config import Config
+from models.enrollment import Enrollment
+from models.payment import Payment
+from models.student import Student
+
+# Sort options for the dues table
+DUES_SORTS = {
+    "balance": lambda columns: columns.balance.desc(),
+    "end_date": lambda columns: columns.end_date.asc(),
+    "student": lambda columns: columns.student_name.asc()
+}
+
+def _balances(instructor: Optional[str] = None, package_type: Optional[str] = None,
+              enrollment_status: Optional[str] = "active"):
+    """Per-enrollment fee, amount paid and balance as one grouped LEFT JOIN.
+    
+    Completed payments are joined on the (enrollment_id, status) index and
+    summed per enrollment, so the whole report is a single aggregate query
+    however many payments exist ("All"/None means no filter).
+    """
+    paid = func.coalesce(func.sum(Payment.amount), 0)
+    stmt = select(
+        Enrollment.id.label("enrollment_id"),
+        Student.id.label("student_id"),
+        Student.name.label("student_name"),
+        Student.instructor.label("instructor"),
+        Enrollment.package_type.label("package_type"),
+        Enrollment.fee_amount.label("fee_amount"),
+        paid.label("paid"),
+        (Enrollment.fee_amount - paid).label("balance"),
+        Enrollment.end_date.label("end_date"),
+        Enrollment.status.label("status")
+    ).join(Student, Enrollment.student_id == Student.id) \
+        .outerjoin(Payment, and_(Payment.enrollment_id == Enrollment.id, Payment.status == "completed")) \
+        .group_by(Enrollment.id, Student.id, Student.name, Student.instructor, Enrollment.package_type,
+                  Enrollment.fee_amount, Enrollment.end_date, Enrollment.status)
+    
+    if instructor and instructor != "All":
+        stmt = stmt.where(Student.instructor == instructor)
+    if package_type and package_type != "All":
+        stmt = stmt.where(Enrollment.package_type == package_type)
+    if enrollment_status and enrollment_status != "All":
+        stmt = stmt.where(Enrollment.status == enrollment_status)
+    return stmt
+
+def outstanding_dues(db, instructor: Optional[str] = None, package_type: Optional[str] = None,
+                     enrollment_status: Optional[str] = "active", outstanding_only: bool = True,
+                     sort: str = "balance", page: int = 1, page_size: int = 25) -> Dict:
+    """One page of enrollment balances plus the totals across every page"""
+    balances = _balances(instructor, package_type, enrollment_status)
+    if outstanding_only:
+        balances = balances.having(Enrollment.fee_amount - func.coalesce(func.sum(Payment.amount), 0) > 0)
+    balances = balances.subquery()
+    
+    totals = db.execute(select(
+        func.count(balances.c.enrollment_id),
+        func.coalesce(func.sum(balances.c.fee_amount), 0),
+        func.coalesce(func.sum(balances.c.paid), 0),
+        func.coalesce(func.sum(balances.c.balance), 0)
+    )).one()
+    
+    order = DUES_SORTS.get(sort, DUES_SORTS["balance"])(balances.c)
+    rows = db.execute(
+        select(balances).order_by(order, balances.c.enrollment_id)
+        .offset((max(page, 1) - 1) * page_size)
+        .limit(page_size)
+    ).all()
+    
+    return {
+        "rows": [_row(row) for row in rows],
+        "total": totals[0],
+        "total_fees": float(totals[1]),
+        "total_paid": float(totals[2]),
+        "total_due": float(totals[3])
+    }
+
+def dues_breakdown(db, by: str = "instructor", enrollment_status: Optional[str] = "active") -> List[Dict]:
+    """Fees, collections and balance due grouped by instructor or package_type"""
+    balances = _balances(enrollment_status=enrollment_status).subquery()
+    group = balances.c[by]
+    rows = db.execute(
+        select(
+            group.label("group"),
+            func.count(balances.c.enrollment_id).label("enrollments"),
+            func.sum(balances.c.fee_amount).label("fees"),
+            func.sum(balances.c.paid).label("paid"),
+            func.sum(balances.c.balance).label("balance")
+        ).group_by(group).order_by(func.sum(balances.c.balance).desc())
+    ).all()
+    
+    return [
+        {
+            by: Config.PACKAGES.get(row.group, {}).get("name", row.group) if by == "package_type" else row.group,
+            "enrollments": row.enrollments,
+            "fees": float(row.fees or 0),
+            "paid": float(row.paid or 0),
+            "balance": float(row.balance or 0)
+        }
+        for row in rows
+    ]
+
+def _row(row) -> Dict:
+    return {
+        "enrollment_id": row.enrollment_id,
+        "student_id": row.student_id,
+        "student_name": row.student_name,
+        "instructor": row.instructor,
+        "package": Config.PACKAGES.get(row.package_type, {}).get("name", row.package_type),
+        "fee_amount": float(row.fee_amount or 0),
+        "paid": float(row.paid or 0),
+        "balance": float(row.balance or 0),
+        "end_date": row.end_date,
+        "status": row.status
+    }
\ No newline at end of file
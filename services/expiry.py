@@ -0,0 +1,134 @@
+import atexit
+import logging
+import threading
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import func, or_, update
+from config import Config
+from models.base import SessionLocal
+from models.enrollment import Enrollment
+from models.job_run import JobRun
+from services.cohorts import run_cohort_refresh
+
+logger = logging.getLogger(__name__)
+
+JOB_NAME = "enrollment_expiry"
+
+def expire_enrollments(db, now: Optional[datetime] = None) -> List[int]:
+    """Mark finished enrollments expired with one UPDATE; returns their ids.
+    
+    An active enrollment is finished once its end date has passed or every
+    class in the package has been used. The (status, end_date) index keeps
+    the statement to the active rows however many expired ones pile up.
+    Ids come back via RETURNING where the database supports it, otherwise
+    they are selected first through the same index. A sweep with nothing
+    to expire issues no UPDATE, so it leaves the enrollments data version
+    (and the cached reports keyed on it) alone.
+    """
+    now = now or datetime.now()
+    finished = [
+        Enrollment.status == "active",
+        or_(Enrollment.end_date < now,
+            func.coalesce(Enrollment.classes_used, 0) >= Enrollment.total_classes)
+    ]
+    stmt = (
+        update(Enrollment)
+        .values(status="expired", updated_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+    
+    if db.query(Enrollment.id).filter(*finished).limit(1).first() is None:
+        return []
+    
+    if db.get_bind().dialect.update_returning:
+        return [row[0] for row in db.execute(stmt.where(*finished).returning(Enrollment.id)).all()]
+    
+    ids = [row[0] for row in db.query(Enrollment.id).filter(*finished).all()]
+    if ids:
+        db.execute(stmt.where(Enrollment.id.in_(ids), Enrollment.status == "active"))
+    return ids
+
+def run_expiry_sweep(now: Optional[datetime] = None) -> int:
+    """Run one sweep and record it in job_runs.
+    
+    The UPDATE bumps the enrollments data version (see
+    models.data_version), so cached reports built on enrollments are
+    recomputed on their next view.
+    """
+    db = SessionLocal()
+    run = JobRun(job_name=JOB_NAME, started_at=datetime.now(), status="running")
+    
+    try:
+        db.add(run)
+        db.flush()
+        expired = expire_enrollments(db, now)
+        run.rows_affected = len(expired)
+        run.status = "completed"
+        run.finished_at = datetime.now()
+        db.commit()
+    except Exception as e:
+        logger.error(f"Enrollment expiry sweep failed: {str(e)}")
+        db.rollback()
+        db.add(JobRun(job_name=JOB_NAME, started_at=run.started_at, finished_at=datetime.now(),
+                      status="failed", rows_affected=0, error_message=str(e)))
+        db.commit()
+        return 0
+    finally:
+        db.close()
+    
+    if expired:
+        logger.info(f"Expired {len(expired)} enrollments")
+    return len(expired)
+
+class ExpirySweeper:
+    """Runs the expiry sweep every ``interval`` seconds on a daemon timer.
+    
+    Each tick also folds new enrollments into the cohort retention matrix,
+    keeping that write work off the reports page.
+    """
+    
+    def __init__(self, interval: Optional[int] = None):
+        self.interval = interval or Config.EXPIRY_SWEEP_INTERVAL
+        self._lock = threading.Lock()
+        self._timer = None
+    
+    def start(self):
+        """Sweep now, then on every interval"""
+        with self._lock:
+            if self._timer is not None:
+                return
+            self._schedule(0)
+        atexit.register(self.stop)
+    
+    def _schedule(self, delay: float):
+        self._timer = threading.Timer(delay, self._tick)
+        self._timer.daemon = True
+        self._timer.start()
+    
+    def _tick(self):
+        try:
+            run_expiry_sweep()
+            run_cohort_refresh()
+        finally:
+            with self._lock:
+                if self._timer is not None:
+                    self._schedule(self.interval)
+    
+    def stop(self):
+        """Cancel the timer"""
+        with self._lock:
+            timer, self._timer = self._timer, None
+        if timer:
+            timer.cancel()
+
+_sweeper = None
+_sweeper_lock = threading.Lock()
+
+def get_expiry_sweeper() -> ExpirySweeper:
+    """Process-wide sweeper, started on first use"""
+    global _sweeper
+    with _sweeper_lock:
+        if _sweeper is None:
+            _sweeper = ExpirySweeper()
+            _sweeper.start()
+        return _sweeper
\ No newline at end of file
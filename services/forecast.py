@@ -0,0 +1,107 @@
+from datetime import datetime
+from typing import Dict, Optional
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from config import Config
+from models.enrollment import Enrollment
+from models.payment import Payment
+from services.reports import cached_result
+
+# A student's next enrollment starting within this many days of the last one's end counts as a renewal
+RENEWAL_WINDOW_DAYS = 30
+# Used for every package until some enrollment has had the chance to renew
+DEFAULT_RENEWAL_RATE = 0.5
+SNAPSHOT_COLUMNS = ["student_id", "package_type", "status", "start_date", "end_date",
+                    "total_classes", "classes_used", "classes_per_week", "fee_amount"]
+
+def _snapshot(db) -> pd.DataFrame:
+    """Every enrollment's forecasting columns, from one projected query"""
+    rows = db.execute(select(
+        Enrollment.student_id, Enrollment.package_type, Enrollment.status, Enrollment.start_date,
+        Enrollment.end_date, Enrollment.total_classes, Enrollment.classes_used, Enrollment.classes_per_week,
+        Enrollment.fee_amount
+    )).all()
+    frame = pd.DataFrame(rows, columns=SNAPSHOT_COLUMNS)
+    frame["start_date"] = pd.to_datetime(frame["start_date"])
+    frame["end_date"] = pd.to_datetime(frame["end_date"])
+    frame["fee_amount"] = pd.to_numeric(frame["fee_amount"], errors="coerce").astype(float)
+    return frame
+
+def renewal_rates(enrollments: pd.DataFrame, now: datetime) -> pd.Series:
+    """Share of enrollments per package followed by another one from the same student.
+    
+    Only enrollments whose renewal window has fully passed are counted.
+    Packages without such history get the overall rate.
+    """
+    window = pd.Timedelta(days=RENEWAL_WINDOW_DAYS)
+    ordered = enrollments.sort_values(["student_id", "start_date"])
+    next_start = ordered.groupby("student_id")["start_date"].shift(-1)
+    renewed = next_start.notna() & (next_start <= ordered["end_date"] + window)
+    settled = ordered["end_date"] + window < pd.Timestamp(now)
+    
+    by_package = renewed[settled].groupby(ordered.loc[settled, "package_type"]).mean()
+    overall = renewed[settled].mean() if settled.any() else DEFAULT_RENEWAL_RATE
+    return by_package.reindex(list(Config.PACKAGES)).fillna(overall)
+
+def _forecast(enrollments: pd.DataFrame, months: int, now: datetime) -> Dict:
+    now = pd.Timestamp(now)
+    rates = renewal_rates(enrollments, now)
+    fees = enrollments.groupby("package_type")["fee_amount"].mean()
+    fees = fees.reindex(list(Config.PACKAGES)).fillna(enrollments["fee_amount"].mean() if len(enrollments) else 0.0)
+    durations = pd.Series({name: package["duration_months"] for name, package in Config.PACKAGES.items()})
+    
+    active = enrollments[enrollments["status"] == "active"]
+    # An enrollment ends at its end date or when its classes run out, whichever comes first
+    remaining = (active["total_classes"] - active["classes_used"].fillna(0)).clip(lower=0)
+    weeks_left = np.ceil(remaining / active["classes_per_week"].fillna(1).clip(lower=1))
+    burn_end = now + pd.to_timedelta(weeks_left * 7, unit="D")
+    projected_end = active["end_date"].where(active["end_date"] < burn_end, burn_end).clip(lower=now)
+    
+    offset = ((projected_end.dt.year - now.year) * 12 + (projected_end.dt.month - now.month)).to_numpy().astype(int)
+    probability = active["package_type"].map(rates).fillna(DEFAULT_RENEWAL_RATE).to_numpy()
+    fee = active["package_type"].map(fees).fillna(0.0).to_numpy()
+    duration = active["package_type"].map(durations).fillna(1).to_numpy().astype(int)
+    
+    expiring = np.bincount(offset[offset < months], minlength=months)
+    renewals = np.zeros(months)
+    revenue = np.zeros(months)
+    # The k-th renewal of a chain lands k - 1 package lengths after the first, with probability p ** k
+    chance = probability.copy()
+    while len(offset) and offset.min() < months:
+        inside = offset < months
+        renewals += np.bincount(offset[inside], weights=chance[inside], minlength=months)
+        revenue += np.bincount(offset[inside], weights=(chance * fee)[inside], minlength=months)
+        offset, chance, fee, duration, probability = (
+            (offset + duration)[inside], (chance * probability)[inside], fee[inside], duration[inside], probability[inside]
+        )
+    
+    month_starts = pd.date_range(now.replace(day=1).normalize(), periods=months, freq="MS")
+    return {
+        "months": [
+            {
+                "month": month_start.strftime("%Y-%m"),
+                "expiring": int(expiring[i]),
+                "expected_renewals": round(float(renewals[i]), 1),
+                "expected_revenue": round(float(revenue[i]), 2)
+            }
+            for i, month_start in enumerate(month_starts)
+        ],
+        "renewal_rates": {package: round(float(rate), 3) for package, rate in rates.items()},
+        "total_revenue": round(float(revenue.sum()), 2)
+    }
+
+def revenue_forecast(db, months: int = 6, now: Optional[datetime] = None, use_cache: bool = True) -> Dict:
+    """Expected renewals and revenue for this month and the next ``months - 1``.
+    
+    Active enrollments are projected to end at their end date or when
+    ``classes_per_week`` uses up their remaining classes, and renew with
+    their package's historical renewal rate at its average fee (renewals
+    of renewals included). The whole calculation is one pandas/NumPy pass
+    over a single enrollments snapshot, cached in report_cache until
+    enrollments or payments change.
+    """
+    now = now or datetime.now()
+    params = {"months": months, "day": now.strftime("%Y-%m-%d")}
+    return cached_result(db, "revenue_forecast", params, [Enrollment, Payment],
+                         lambda: _forecast(_snapshot(db), months, now), use_cache)
\ No newline at end of file
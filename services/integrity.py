@@ -0,0 +1,157 @@
+import logging
+from typing import Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import bindparam, func, select, update
+from config import Config
+from models import Base  # Imports every model so all foreign keys are registered
+from models.attendance import Attendance
+from models.enrollment import Enrollment
+from services.attendance import COUNTED_STATUSES
+
+logger = logging.getLogger(__name__)
+
+# How many drifted/orphaned rows to keep as examples in a report
+SAMPLE_LIMIT = 20
+# Rounds of re-reading counters that changed while a fix was being written
+FIX_ATTEMPTS = 3
+
+def _enrollment_chunks(db, chunk_size: int) -> Iterator[List[Tuple[int, int]]]:
+    """(id, classes_used) for every enrollment, in keyset-ordered chunks"""
+    last_id = 0
+    while True:
+        chunk = db.execute(
+            select(Enrollment.id, func.coalesce(Enrollment.classes_used, 0))
+            .where(Enrollment.id > last_id)
+            .order_by(Enrollment.id)
+            .limit(chunk_size)
+        ).all()
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1][0]
+
+def _true_counts(db, condition) -> Dict[int, int]:
+    """Present/makeup attendance per enrollment for the enrollments matching ``condition``"""
+    return dict(db.execute(
+        select(Attendance.enrollment_id, func.count(Attendance.id))
+        .where(condition, Attendance.status.in_(COUNTED_STATUSES))
+        .group_by(Attendance.enrollment_id)
+    ).all())
+
+def _fix_counters(db, corrections: List[Dict]) -> List[Dict]:
+    """Write corrected counters, returning the ones that could not be written.
+    
+    Each UPDATE only applies while classes_used still holds the value it
+    was read with, so a roll call committed in between is never
+    overwritten. The corrected enrollments are then read again and any
+    that are still off (including the skipped ones) are returned with
+    fresh values for another attempt.
+    """
+    enrollments = Enrollment.__table__
+    db.execute(
+        update(enrollments)
+        .where(enrollments.c.id == bindparam("b_id"),
+               func.coalesce(enrollments.c.classes_used, 0) == bindparam("b_recorded"))
+        .values(classes_used=bindparam("b_classes_used"), updated_at=func.now()),
+        corrections
+    )
+    db.commit()
+    
+    ids = [correction["b_id"] for correction in corrections]
+    actual = _true_counts(db, Attendance.enrollment_id.in_(ids))
+    return [
+        {"b_id": enrollment_id, "b_recorded": recorded, "b_classes_used": actual.get(enrollment_id, 0)}
+        for enrollment_id, recorded in db.execute(
+            select(Enrollment.id, func.coalesce(Enrollment.classes_used, 0)).where(Enrollment.id.in_(ids))
+        )
+        if recorded != actual.get(enrollment_id, 0)
+    ]
+
+def reconcile_class_counters(db, fix: bool = False, chunk_size: Optional[int] = None) -> Dict:
+    """Compare Enrollment.classes_used with the attendance it is derived from.
+    
+    Enrollments are read in keyset-ordered chunks; for each chunk the true
+    count of present/makeup attendance is computed with one grouped query
+    over that id range, so memory stays bounded by the chunk size. With
+    ``fix`` the drifted counters of each chunk are corrected with one
+    conditional executemany UPDATE and committed before the next chunk is
+    read; counters that changed meanwhile are re-checked and retried.
+    """
+    chunk_size = chunk_size or Config.RECONCILE_CHUNK_SIZE
+    checked = drifted = fixed = 0
+    samples = []
+    
+    for chunk in _enrollment_chunks(db, chunk_size):
+        first_id, last_id = chunk[0][0], chunk[-1][0]
+        actual = _true_counts(db, Attendance.enrollment_id.between(first_id, last_id))
+        
+        corrections = []
+        for enrollment_id, recorded in chunk:
+            true_count = actual.get(enrollment_id, 0)
+            if recorded != true_count:
+                corrections.append({"b_id": enrollment_id, "b_recorded": recorded, "b_classes_used": true_count})
+                if len(samples) < SAMPLE_LIMIT:
+                    samples.append({"enrollment_id": enrollment_id, "recorded": recorded, "actual": true_count})
+        checked += len(chunk)
+        drifted += len(corrections)
+        
+        if fix and corrections:
+            try:
+                pending = corrections
+                for _ in range(FIX_ATTEMPTS):
+                    pending = _fix_counters(db, pending)
+                    if not pending:
+                        break
+                fixed += len(corrections) - len(pending)
+                if pending:
+                    logger.warning(f"Counters of enrollments {[c['b_id'] for c in pending]} kept changing; not fixed")
+            except Exception as e:
+                logger.error(f"Failed to fix counters for enrollments {first_id}-{last_id}: {str(e)}")
+                db.rollback()
+                raise
+    
+    logger.info(f"Checked {checked} enrollments: {drifted} drifted, {fixed} fixed")
+    return {"checked": checked, "drifted": drifted, "fixed": fixed, "samples": samples}
+
+def find_orphans(db, chunk_size: Optional[int] = None) -> List[Dict]:
+    """Rows whose foreign keys point at missing parents, for every FK in the schema.
+    
+    SQLite does not enforce the declared foreign keys (and ``main()`` rebuilds
+    the students table), so each FK column is checked with an anti-join,
+    paged by the child's primary key so no check holds more than one chunk.
+    """
+    chunk_size = chunk_size or Config.RECONCILE_CHUNK_SIZE
+    results = []
+    
+    for table in Base.metadata.sorted_tables:
+        if "id" not in table.c:
+            continue
+        for fk in table.foreign_keys:
+            child_column = fk.parent
+            parent_column = fk.column
+            parent = parent_column.table
+            
+            count = 0
+            samples = []
+            last_id = 0
+            while True:
+                rows = db.execute(
+                    select(table.c.id, child_column)
+                    .select_from(table.outerjoin(parent, child_column == parent_column))
+                    .where(child_column.isnot(None), parent_column.is_(None), table.c.id > last_id)
+                    .order_by(table.c.id)
+                    .limit(chunk_size)
+                ).all()
+                if not rows:
+                    break
+                count += len(rows)
+                samples.extend(row[0] for row in rows[:SAMPLE_LIMIT - len(samples)])
+                last_id = rows[-1][0]
+            
+            if count:
+                results.append({
+                    "table": table.name, "column": child_column.name,
+                    "references": f"{parent.name}.{parent_column.name}",
+                    "count": count, "sample_ids": samples
+                })
+    
+    return results
\ No newline at end of file
@@ -0,0 +1,145 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import exists, func, insert, literal, select, union, union_all
+from models.material import Material
+from models.material_assignment import MaterialAssignment
+from models.student import Student
+from services.storage import StorageService
+
+# Filterable material columns, in the order the library shows them
+MATERIAL_FACETS = {
+    "instructor": Material.instructor,
+    "instrument": Material.instrument,
+    "skill_level": Material.skill_level,
+    "file_type": Material.file_type
+}
+
+def _facet_conditions(filters: Dict[str, str], exclude: Optional[str] = None) -> List:
+    """WHERE conditions for the active catalog filters ("All" means no filter)"""
+    conditions = [Material.is_active == True]
+    for facet, value in filters.items():
+        if facet != exclude and value and value != "All":
+            conditions.append(MATERIAL_FACETS[facet] == value)
+    return conditions
+
+def facet_counts(db, filters: Dict[str, str]) -> Dict[str, Dict[str, int]]:
+    """Counts per value for every facet, computed in one UNION ALL query.
+    
+    Each facet's counts apply all the other filters but not its own, so a
+    selected value still shows how many items its siblings would return.
+    """
+    selects = [
+        select(literal(facet).label("facet"), column.label("value"), func.count(Material.id).label("items"))
+        .where(*_facet_conditions(filters, exclude=facet))
+        .group_by(column)
+        for facet, column in MATERIAL_FACETS.items()
+    ]
+    
+    counts = {facet: {} for facet in MATERIAL_FACETS}
+    for facet, value, items in db.execute(union_all(*selects)):
+        if value is not None:
+            counts[facet][value] = items
+    return counts
+
+def matching_total(counts: Dict[str, Dict[str, int]], filters: Dict[str, str]) -> int:
+    """Number of materials matching all filters, read off the instructor facet"""
+    # instructor is never NULL, so its facet counts partition the result set
+    selected = filters.get("instructor")
+    if selected and selected != "All":
+        return counts["instructor"].get(selected, 0)
+    return sum(counts["instructor"].values())
+
+def search_materials(db, filters: Dict[str, str], page: int = 1, page_size: int = 20) -> List[Material]:
+    """One page of active materials matching the filters, newest first"""
+    return db.query(Material).filter(*_facet_conditions(filters)) \
+        .order_by(Material.created_at.desc(), Material.id.desc()) \
+        .offset((max(page, 1) - 1) * page_size) \
+        .limit(page_size) \
+        .all()
+
+def material_titles(db, instructor: Optional[str] = None) -> Dict[int, str]:
+    """id -> title for active materials, for O(1) select box labels"""
+    query = db.query(Material.id, Material.title).filter(Material.is_active == True)
+    if instructor:
+        query = query.filter(Material.instructor == instructor)
+    return dict(query.order_by(Material.created_at.desc()).all())
+
+def filter_students(db, instructor: Optional[str] = None, instrument: Optional[str] = None,
+                    skill_level: Optional[str] = None):
+    """Active students matching the share form filters ("All" means no filter)"""
+    query = db.query(Student).filter(Student.is_active == True)
+    
+    if instructor and instructor != "All":
+        query = query.filter(Student.instructor == instructor)
+    if instrument and instrument != "All":
+        query = query.filter(Student.preferred_instrument == instrument)
+    if skill_level and skill_level != "All":
+        query = query.filter(Student.skill_level == skill_level)
+    
+    return query
+
+def assign_material(db, material_id: int, student_query, assigned_by: Optional[str] = None) -> int:
+    """Assign a material to every student in ``student_query`` with one statement.
+    
+    Runs a single INSERT ... SELECT over the filtered students, skipping
+    students who already have the material. Returns the number of new
+    assignments; the caller commits.
+    """
+    already_assigned = exists().where(
+        MaterialAssignment.student_id == Student.id,
+        MaterialAssignment.material_id == material_id
+    )
+    students = student_query.filter(~already_assigned).with_entities(
+        literal(material_id),
+        Student.id,
+        literal(assigned_by),
+        literal(datetime.now())
+    )
+    
+    result = db.execute(
+        insert(MaterialAssignment).from_select(
+            ["material_id", "student_id", "assigned_by", "assigned_at"],
+            students.statement
+        )
+    )
+    return result.rowcount
+
+def student_materials(db, student_id: int) -> List[Material]:
+    """Active materials visible to a student, newest first.
+    
+    A material is visible when it is assigned to the student, addressed to
+    them, or public from their instructor. Each case is its own select on
+    an index (material_assignments (student_id, material_id), materials
+    student_id and materials (instructor, is_public)) and the ids are
+    combined with UNION, where one OR across the three would scan materials.
+    """
+    instructor = select(Student.instructor).where(Student.id == student_id).scalar_subquery()
+    visible = union(
+        select(MaterialAssignment.material_id.label("material_id")).where(MaterialAssignment.student_id == student_id),
+        select(Material.id).where(Material.student_id == student_id),
+        select(Material.id).where(Material.instructor == instructor, Material.is_public == True)
+    ).subquery()
+    
+    return db.query(Material).join(visible, Material.id == visible.c.material_id) \
+        .filter(Material.is_active == True) \
+        .order_by(Material.created_at.desc(), Material.id.desc()).all()
+
+def remove_material(db, material_id: int) -> bool:
+    """Take a material out of the library and release its stored file.
+    
+    The row stays (inactive, with its access history and assignments) but
+    loses its file path, so an uploaded file is deleted, or a shared blob
+    loses this reference for collect_garbage to reclaim, exactly once.
+    Returns False when the material is unknown or already removed.
+    """
+    material = db.get(Material, material_id)
+    if not material or not material.is_active:
+        return False
+    file_path = material.file_path
+    material.is_active = False
+    material.file_path = None
+    db.commit()
+    
+    if file_path and not file_path.startswith(("http://", "https://")):
+        StorageService().delete_file(file_path)
+    return True
\ No newline at end of file
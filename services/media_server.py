@@ -0,0 +1,245 @@
+"""
+Companion file server for uploaded lesson media.
+
+Serves Config.UPLOAD_DIR under /uploads with HTTP Range support so players
+can seek, streams bodies with sendfile() instead of reading them into
+memory, answers conditional requests from ETag/Last-Modified and only
+accepts URLs signed by StorageService.get_file_url.
+
+/open/<material id> links (StorageService.get_open_url) count an access
+to the material and redirect to its file, so opening a material from the
+app takes a single click.
+
+Run alongside Streamlit:  python -m services.media_server
+"""
+
+import logging
+import mimetypes
+import re
+from email.utils import formatdate, parsedate_to_datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional, Tuple
+from urllib.parse import urlsplit, parse_qs, unquote
+from config import Config
+from models.base import SessionLocal
+from models.material import Material
+from services.access_tracker import get_access_tracker
+from services.storage import StorageService
+from utils.auth import verify_url_signature
+
+logger = logging.getLogger(__name__)
+
+URL_PREFIX = "/uploads/"
+OPEN_PREFIX = "/open/"
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single-range ``Range`` header into inclusive (start, end).
+    
+    Returns None when the header is unusable (multiple ranges, bad syntax),
+    in which case the full file is served, and raises ValueError for a
+    syntactically valid range that cannot be satisfied.
+    """
+    match = RANGE_PATTERN.match(header.strip())
+    if not match:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    
+    if not start:
+        # Suffix range: the last N bytes
+        length = int(end)
+        if length == 0:
+            raise ValueError("Empty suffix range")
+        return max(size - length, 0), size - 1
+    
+    start = int(start)
+    end = int(end) if end else size - 1
+    if start >= size or end < start:
+        raise ValueError("Range not satisfiable")
+    return start, min(end, size - 1)
+
+class MediaRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "ChordsMedia/1.0"
+    
+    def do_GET(self):
+        if self.path.startswith(OPEN_PREFIX):
+            self._open(record=True)
+            return
+        self._serve(send_body=True)
+    
+    def do_HEAD(self):
+        if self.path.startswith(OPEN_PREFIX):
+            self._open(record=False)
+            return
+        self._serve(send_body=False)
+    
+    def _open(self, record: bool):
+        """Count an open of a material and redirect to its file"""
+        parts = urlsplit(self.path)
+        query = parse_qs(parts.query)
+        if not verify_url_signature(parts.path, query.get("expires", [""])[0], query.get("signature", [""])[0]):
+            self._send_error(HTTPStatus.FORBIDDEN)
+            return
+        try:
+            material_id = int(parts.path[len(OPEN_PREFIX):])
+        except ValueError:
+            self._send_error(HTTPStatus.NOT_FOUND)
+            return
+        
+        db = SessionLocal()
+        try:
+            file_path = db.query(Material.file_path).filter(
+                Material.id == material_id, Material.is_active == True
+            ).scalar()
+        finally:
+            db.close()
+        if not file_path:
+            self._send_error(HTTPStatus.NOT_FOUND)
+            return
+        
+        if file_path.startswith(("http://", "https://")):
+            target = file_path
+        else:
+            target = StorageService().get_file_url(file_path, expires_in=3600)
+        if record:
+            get_access_tracker().record(material_id)
+        
+        self.send_response(HTTPStatus.FOUND)
+        self.send_header("Location", target)
+        # Every open must reach the server to be counted
+        self.send_header("Cache-Control", "no-store")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+    
+    def _resolve(self) -> Optional[Path]:
+        """Map the signed request path onto a file inside the upload dir"""
+        parts = urlsplit(self.path)
+        if not parts.path.startswith(URL_PREFIX):
+            self._send_error(HTTPStatus.NOT_FOUND)
+            return None
+        
+        query = parse_qs(parts.query)
+        if not verify_url_signature(parts.path, query.get("expires", [""])[0], query.get("signature", [""])[0]):
+            self._send_error(HTTPStatus.FORBIDDEN)
+            return None
+        
+        root = self.server.upload_root
+        file_path = (root / unquote(parts.path[len(URL_PREFIX):])).resolve()
+        if not file_path.is_relative_to(root) or not file_path.is_file() \
+                or any(part.startswith(".") for part in file_path.relative_to(root).parts):
+            self._send_error(HTTPStatus.NOT_FOUND)
+            return None
+        return file_path
+    
+    def _serve(self, send_body: bool):
+        file_path = self._resolve()
+        if file_path is None:
+            return
+        
+        stat = file_path.stat()
+        size = stat.st_size
+        etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+        last_modified = formatdate(stat.st_mtime, usegmt=True)
+        
+        if self._not_modified(etag, stat.st_mtime):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self._send_cache_headers(etag, last_modified)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        
+        start, end = 0, size - 1
+        status = HTTPStatus.OK
+        range_header = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        if range_header and size and (not if_range or if_range in (etag, last_modified)):
+            try:
+                byte_range = parse_range(range_header, size)
+            except ValueError:
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if byte_range:
+                start, end = byte_range
+                status = HTTPStatus.PARTIAL_CONTENT
+        
+        length = end - start + 1 if size else 0
+        content_type = mimetypes.guess_type(file_path.name)[0] or "application/octet-stream"
+        
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(length))
+        self.send_header("Accept-Ranges", "bytes")
+        if status == HTTPStatus.PARTIAL_CONTENT:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self._send_cache_headers(etag, last_modified)
+        self.end_headers()
+        
+        if send_body and length:
+            with open(file_path, 'rb') as f:
+                # socket.sendfile uses os.sendfile (zero-copy) where available
+                self.connection.sendfile(f, offset=start, count=length)
+    
+    def _not_modified(self, etag: str, mtime: float) -> bool:
+        """Evaluate If-None-Match / If-Modified-Since"""
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match:
+            return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+        
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+    
+    def _send_cache_headers(self, etag: str, last_modified: str):
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        # Signed URLs are per-user, so only the browser may cache them
+        self.send_header("Cache-Control", "private, max-age=3600")
+    
+    def _send_error(self, status: HTTPStatus):
+        body = status.phrase.encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        logger.info("%s - %s", self.address_string(), format % args)
+
+def create_server(host: str = None, port: int = None, upload_dir: str = None) -> ThreadingHTTPServer:
+    """Build a threaded media server bound to host/port"""
+    server = ThreadingHTTPServer((host or Config.MEDIA_SERVER_HOST,
+                                  Config.MEDIA_SERVER_PORT if port is None else port),
+                                 MediaRequestHandler)
+    server.daemon_threads = True
+    server.upload_root = Path(upload_dir or Config.UPLOAD_DIR).resolve()
+    return server
+
+def serve():
+    """Serve uploads until interrupted"""
+    server = create_server()
+    host, port = server.server_address[:2]
+    logger.info(f"Serving {server.upload_root} on http://{host}:{port}{URL_PREFIX}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    serve()
\ No newline at end of file
@@ -1,7 +1,8 @@
 import requests
 import logging
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import insert
 from config import Config
 from models.notification_log import NotificationLog
 from models.base import SessionLocal
@@ -21,10 +22,15 @@ class Fast2SMSService:
         # Format variables for API (Var1|Var2|Var3...)
         variables_string = "|".join(variables.values())
         
-        url = f"{self.base_url}?authorization={self.api_key}&message_id={template_id}&numbers={phone_number}&variables_values={variables_string}"
+        params = {
+            "authorization": self.api_key,
+            "message_id": template_id,
+            "numbers": phone_number,
+            "variables_values": variables_string
+        }
         
         try:
-            response = requests.get(url, timeout=30)
+            response = requests.get(self.base_url, params=params, timeout=30)
             response.raise_for_status()
             return {
                 "success": True,
@@ -65,6 +71,85 @@ class Fast2SMSService:
         finally:
             db.close()
     
+    def _log_notifications_bulk(self, rows: List[Dict]):
+        """Log many notification attempts with a single executemany insert"""
+        if not rows:
+            return
+        db = SessionLocal()
+        try:
+            db.execute(insert(NotificationLog), rows)
+            db.commit()
+        except Exception as e:
+            logger.error(f"Failed to log notifications: {str(e)}")
+            db.rollback()
+        finally:
+            db.close()
+    
+    def broadcast_template(self, recipients: List[Tuple[int, str]], template_id: int,
+                           template_name: str, variables: Dict[str, str],
+                           chunk_size: Optional[int] = None) -> Dict:
+        """Send one identical template payload to many recipients.
+        
+        Recipients are (student_id, phone_number) pairs. Numbers are sent
+        comma-separated, ``chunk_size`` per API request, and one
+        NotificationLog row per recipient is written in one bulk insert.
+        """
+        chunk_size = chunk_size or Config.BROADCAST_CHUNK_SIZE
+        
+        # A phone shared by siblings should only receive the message once
+        unique_recipients = []
+        seen_numbers = set()
+        for student_id, phone_number in recipients:
+            if phone_number and phone_number not in seen_numbers:
+                seen_numbers.add(phone_number)
+                unique_recipients.append((student_id, phone_number))
+        
+        summary = {"recipients": len(unique_recipients), "sent": 0, "failed": 0, "requests": 0}
+        log_rows = []
+        
+        for start in range(0, len(unique_recipients), chunk_size):
+            chunk = unique_recipients[start:start + chunk_size]
+            result = self._send_template_message(
+                phone_number=",".join(phone for _, phone in chunk),
+                template_id=template_id,
+                variables=variables
+            )
+            summary["requests"] += 1
+            
+            status = "sent" if result["success"] else "failed"
+            summary[status] += len(chunk)
+            sent_at = datetime.now() if result["success"] else None
+            for student_id, phone_number in chunk:
+                log_rows.append({
+                    "student_id": student_id,
+                    "template_id": template_id,
+                    "template_name": template_name,
+                    "phone_number": phone_number,
+                    "variables": variables,
+                    "status": status,
+                    "response_data": result.get("response"),
+                    "error_message": result.get("error"),
+                    "sent_at": sent_at
+                })
+        
+        self._log_notifications_bulk(log_rows)
+        return summary
+    
+    def send_material_share(self, material, students: List, link: str) -> Dict:
+        """Broadcast a shared material link to a set of students"""
+        variables = {
+            "Var1": material.title,
+            "Var2": material.instructor,
+            "Var3": link
+        }
+        
+        return self.broadcast_template(
+            recipients=[(student.id, student.whatsapp_number) for student in students],
+            template_id=Config.TEMPLATE_MATERIAL_SHARE,
+            template_name="chords_material_share",
+            variables=variables
+        )
+    
     def send_fee_reminder(self, student_name: str, student_id: int, phone_number: str, 
                          package_name: str, expiry_date: str) -> bool:
         """Send fee reminder WhatsApp message"""
@@ -0,0 +1,121 @@
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from functools import lru_cache
+from typing import Iterable, List, Optional
+import bcrypt
+from config import Config
+from models.user import User
+from utils.auth import hash_password, verify_password
+
+logger = logging.getLogger(__name__)
+
+# bcrypt accepts 4-31; calibration never goes below the old fixed default of 12
+MIN_ROUNDS = 12
+MAX_ROUNDS = 16
+_ROUNDS_PATTERN = re.compile(r"^\$2[aby]?\$(\d{2})\$")
+
+@lru_cache(maxsize=1)
+def calibrate_rounds(target_ms: Optional[int] = None) -> int:
+    """Highest bcrypt cost whose hash takes at most ``target_ms`` on this host.
+    
+    One hash is timed at MIN_ROUNDS; each extra round doubles the work, so
+    the other costs are extrapolated from it. Cached for the process.
+    """
+    target_ms = target_ms or Config.BCRYPT_TARGET_MS
+    started = time.perf_counter()
+    bcrypt.hashpw(b"calibration", bcrypt.gensalt(rounds=MIN_ROUNDS))
+    base_ms = (time.perf_counter() - started) * 1000
+    
+    rounds = MIN_ROUNDS
+    while rounds < MAX_ROUNDS and base_ms * 2 ** (rounds + 1 - MIN_ROUNDS) <= target_ms:
+        rounds += 1
+    logger.info(f"bcrypt cost {rounds} (~{base_ms * 2 ** (rounds - MIN_ROUNDS):.0f} ms) for a {target_ms} ms target")
+    return rounds
+
+def current_rounds() -> int:
+    """Work factor new hashes use: BCRYPT_ROUNDS, or calibrated when it is 0"""
+    return Config.BCRYPT_ROUNDS or calibrate_rounds()
+
+def hash_rounds(hashed_password: str) -> Optional[int]:
+    """Cost recorded in a bcrypt hash, None when it is not a bcrypt hash"""
+    match = _ROUNDS_PATTERN.match(hashed_password or "")
+    return int(match.group(1)) if match else None
+
+def needs_rehash(hashed_password: str) -> bool:
+    """Whether a stored hash is weaker than the current policy.
+    
+    Hashes at a higher cost are kept, so a process that calibrates lower
+    than another never downgrades accounts.
+    """
+    rounds = hash_rounds(hashed_password)
+    return rounds is None or rounds < current_rounds()
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def _bcrypt_executor() -> ThreadPoolExecutor:
+    """Process-wide pool of PASSWORD_HASH_WORKERS threads that runs all bcrypt work.
+    
+    bcrypt releases the GIL, so the pool uses several cores while capping
+    how many a burst of logins can occupy.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=Config.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+        return _executor
+
+def _run_bcrypt(fn, *args):
+    """``fn(*args)`` on the bcrypt pool, waiting at most PASSWORD_CHECK_TIMEOUT seconds.
+    
+    Raises TimeoutError when the pool is too busy; work still queued is
+    cancelled so it does not run for a caller that gave up.
+    """
+    future = _bcrypt_executor().submit(fn, *args)
+    try:
+        return future.result(timeout=Config.PASSWORD_CHECK_TIMEOUT)
+    except FutureTimeoutError:
+        future.cancel()
+        raise TimeoutError("Password check timed out; the server is busy")
+
+def hash_passwords(passwords: Iterable[str]) -> List[str]:
+    """Hash several passwords at the current cost, in parallel on the bcrypt pool"""
+    rounds = current_rounds()
+    return list(_bcrypt_executor().map(lambda password: hash_password(password, rounds), passwords))
+
+# Verified for unknown usernames so they take as long as wrong passwords
+_dummy_hash = None
+
+def _absent_user_hash() -> str:
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = _run_bcrypt(hash_password, "not-a-real-password", current_rounds())
+    return _dummy_hash
+
+def authenticate(db, username: str, password: str) -> Optional[User]:
+    """The active user with these credentials, or None.
+    
+    The bcrypt check runs on the bounded bcrypt pool, not the Streamlit
+    script thread, and raises TimeoutError when it cannot finish within
+    PASSWORD_CHECK_TIMEOUT. A successful login whose stored hash is weaker
+    than the current cost is rehashed and saved, so raising the policy
+    upgrades accounts as people sign in.
+    """
+    user = db.query(User).filter(User.username == username, User.is_active == True).first()
+    stored = user.hashed_password if user else _absent_user_hash()
+    
+    if not _run_bcrypt(verify_password, password, stored) or not user:
+        return None
+    
+    if needs_rehash(stored):
+        try:
+            user.hashed_password = _run_bcrypt(hash_password, password, current_rounds())
+            db.commit()
+            logger.info(f"Rehashed password for user {user.id} at cost {current_rounds()}")
+        except Exception as e:
+            logger.error(f"Failed to rehash password for user {user.id}: {str(e)}")
+            db.rollback()
+    return user
\ No newline at end of file
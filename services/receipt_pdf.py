@@ -0,0 +1,154 @@
+import io
+import logging
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional
+from reportlab.graphics import renderPDF
+from reportlab.graphics.shapes import Drawing, Line, Rect, String
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A5
+from reportlab.pdfgen import canvas
+from config import Config
+from models.enrollment import Enrollment
+from models.payment import Payment
+from models.student import Student
+from services.storage import StorageService
+from utils.helpers import format_currency
+
+logger = logging.getLogger(__name__)
+
+PAGE_WIDTH, PAGE_HEIGHT = A5
+MARGIN = 36
+# Receipt fields: (label, key, y position)
+FIELDS = [
+    ("Receipt No.", "receipt_number", 430),
+    ("Date", "payment_date", 408),
+    ("Student", "student_name", 370),
+    ("Package", "package_name", 348),
+    ("Payment Method", "payment_method", 326),
+    ("Transaction ID", "transaction_id", 304),
+    ("Amount Paid", "amount", 250)
+]
+# Below this many receipts a process pool costs more than it saves
+PARALLEL_THRESHOLD = 8
+
+@lru_cache(maxsize=1)
+def _template() -> Drawing:
+    """Letterhead, labels and rules shared by every receipt.
+    
+    Built once per process (so once per pool worker) and replayed onto each
+    page, leaving only the per-payment values to draw.
+    """
+    drawing = Drawing(PAGE_WIDTH, PAGE_HEIGHT)
+    primary = colors.HexColor("#1f4e79")
+    
+    drawing.add(Rect(0, PAGE_HEIGHT - 90, PAGE_WIDTH, 90, fillColor=primary, strokeColor=None))
+    drawing.add(String(MARGIN, PAGE_HEIGHT - 45, Config.ACADEMY_NAME,
+                       fontName="Helvetica-Bold", fontSize=20, fillColor=colors.white))
+    drawing.add(String(MARGIN, PAGE_HEIGHT - 68, f"UPI: {Config.UPI_ID}  |  Support: {Config.SUPPORT_PHONE}",
+                       fontName="Helvetica", fontSize=9, fillColor=colors.white))
+    drawing.add(String(PAGE_WIDTH / 2, 462, "PAYMENT RECEIPT", textAnchor="middle",
+                       fontName="Helvetica-Bold", fontSize=14, fillColor=primary))
+    
+    for label, _, y in FIELDS:
+        drawing.add(String(MARGIN, y, label, fontName="Helvetica", fontSize=10, fillColor=colors.grey))
+    drawing.add(Line(MARGIN, 282, PAGE_WIDTH - MARGIN, 282, strokeColor=colors.lightgrey))
+    drawing.add(Line(MARGIN, 100, PAGE_WIDTH - MARGIN, 100, strokeColor=colors.lightgrey))
+    drawing.add(String(PAGE_WIDTH / 2, 80, "This is a computer generated receipt and needs no signature.",
+                       textAnchor="middle", fontName="Helvetica-Oblique", fontSize=8, fillColor=colors.grey))
+    return drawing
+
+def render_receipt(receipt: Dict) -> bytes:
+    """PDF bytes for one receipt dict (see receipt_rows)"""
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A5, pageCompression=1)
+    pdf.setTitle(f"Receipt {receipt['receipt_number']}")
+    renderPDF.draw(_template(), pdf, 0, 0)
+    
+    values = dict(receipt)
+    values["payment_date"] = receipt["payment_date"].strftime("%d %b %Y")
+    values["amount"] = format_currency(float(receipt["amount"]))
+    for _, key, y in FIELDS:
+        pdf.setFont("Helvetica-Bold", 14 if key == "amount" else 10)
+        pdf.drawString(MARGIN + 120, y, str(values.get(key) or "-"))
+    
+    pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+def receipt_rows(db, payment_ids: Optional[Iterable[int]] = None,
+                 year: Optional[int] = None, month: Optional[int] = None) -> List[Dict]:
+    """Plain, picklable receipt dicts for the given payments or month, in one query"""
+    query = db.query(
+        Payment.id, Payment.receipt_number, Payment.amount, Payment.payment_date,
+        Payment.payment_method, Payment.transaction_id, Student.name, Enrollment.package_type
+    ).join(Student, Payment.student_id == Student.id) \
+        .outerjoin(Enrollment, Payment.enrollment_id == Enrollment.id) \
+        .filter(Payment.status == "completed")
+    
+    if payment_ids is not None:
+        query = query.filter(Payment.id.in_(list(payment_ids)))
+    if year and month:
+        start = datetime(year, month, 1)
+        end = datetime(year + month // 12, month % 12 + 1, 1)
+        query = query.filter(Payment.payment_date >= start, Payment.payment_date < end)
+    
+    return [
+        {
+            "payment_id": row.id,
+            "receipt_number": row.receipt_number,
+            "amount": row.amount,
+            "payment_date": row.payment_date,
+            "payment_method": row.payment_method,
+            "transaction_id": row.transaction_id,
+            "student_name": row.name,
+            "package_name": Config.PACKAGES.get(row.package_type, {}).get("name", row.package_type)
+        }
+        for row in query.order_by(Payment.payment_date, Payment.id).all()
+    ]
+
+def _render_all(receipts: List[Dict], max_workers: Optional[int] = None) -> Iterator[bytes]:
+    """PDFs in input order, rendered in a process pool for large batches"""
+    if len(receipts) < PARALLEL_THRESHOLD:
+        for receipt in receipts:
+            yield render_receipt(receipt)
+        return
+    
+    workers = max_workers or Config.RECEIPT_WORKERS or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunksize = max(1, len(receipts) // (workers * 4))
+        yield from executor.map(render_receipt, receipts, chunksize=chunksize)
+
+def generate_receipts(db, payment_ids: Optional[Iterable[int]] = None, year: Optional[int] = None,
+                      month: Optional[int] = None, max_workers: Optional[int] = None) -> List[Dict]:
+    """Render receipt PDFs and save them under receipts/YYYY-MM via StorageService"""
+    storage = StorageService()
+    receipts = receipt_rows(db, payment_ids, year, month)
+    saved = []
+    
+    for receipt, pdf in zip(receipts, _render_all(receipts, max_workers)):
+        subfolder = f"receipts/{receipt['payment_date']:%Y-%m}"
+        result = storage.save_stream(io.BytesIO(pdf), f"{receipt['receipt_number']}.pdf", subfolder)
+        saved.append({"payment_id": receipt["payment_id"], "receipt_number": receipt["receipt_number"], **result})
+    
+    logger.info(f"Generated {len(saved)} receipt PDFs")
+    return saved
+
+def month_receipts_zip(db, year: int, month: int, max_workers: Optional[int] = None) -> Dict:
+    """Build a ZIP of every receipt in a month directly in storage.
+    
+    PDFs are written in order as the pool produces them into a
+    StorageService stream under receipts/exports, so the archive is never
+    assembled in memory or copied from a scratch file.
+    """
+    receipts = receipt_rows(db, year=year, month=month)
+    
+    with StorageService().open_stream(f"receipts-{year}-{month:02d}.zip", "receipts/exports") as stream:
+        with zipfile.ZipFile(stream, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for receipt, pdf in zip(receipts, _render_all(receipts, max_workers)):
+                archive.writestr(f"{receipt['receipt_number']}.pdf", pdf)
+    
+    return {"receipts": len(receipts), **stream.result}
\ No newline at end of file
@@ -0,0 +1,105 @@
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from config import Config
+from models.base import SessionLocal
+from models.receipt_sequence import ReceiptSequence
+from utils.db import dialect_insert, supports_upsert
+
+logger = logging.getLogger(__name__)
+
+RECEIPT_PREFIX = "CMA"
+
+def format_receipt_number(sequence_date: str, value: int) -> str:
+    """CMA + YYYYMMDD + at least four digits, e.g. CMA202603020042"""
+    return f"{RECEIPT_PREFIX}{sequence_date}{value:04d}"
+
+class ReceiptAllocator:
+    """Hands out receipt numbers from per-day blocks reserved in the database.
+    
+    Each reservation is a single atomic upsert that bumps the day's counter
+    in receipt_sequences by ``block_size`` (the hi part); numbers inside the
+    block (the lo part) are then handed out from memory without touching the
+    database. Concurrent sessions and processes get disjoint blocks, so
+    numbers never collide; blocks abandoned by a restart only leave gaps.
+    """
+    
+    def __init__(self, block_size: Optional[int] = None):
+        self.block_size = block_size or Config.RECEIPT_BLOCK_SIZE
+        self._lock = threading.Lock()
+        self._blocks: Dict[str, Tuple[int, int]] = {}  # day -> (next, end)
+    
+    def next_number(self, when: Optional[datetime] = None) -> str:
+        """One receipt number for the given day (today by default)"""
+        return self.reserve(1, when)[0]
+    
+    def reserve(self, count: int, when: Optional[datetime] = None) -> List[str]:
+        """``count`` receipt numbers for one day, e.g. for a bulk payment import"""
+        sequence_date = (when or datetime.now()).strftime("%Y%m%d")
+        numbers = []
+        with self._lock:
+            while len(numbers) < count:
+                next_value, end = self._blocks.get(sequence_date, (0, 0))
+                if next_value >= end:
+                    # Large requests take one block big enough for the remainder
+                    next_value, end = self._reserve_block(sequence_date, max(self.block_size, count - len(numbers)))
+                take = min(end - next_value, count - len(numbers))
+                numbers.extend(format_receipt_number(sequence_date, value) for value in range(next_value, next_value + take))
+                self._blocks[sequence_date] = (next_value + take, end)
+            
+            # Only today's block can still be used
+            for stale in [day for day in self._blocks if day < sequence_date]:
+                del self._blocks[stale]
+        return numbers
+    
+    def _reserve_block(self, sequence_date: str, size: int) -> Tuple[int, int]:
+        """Atomically claim [start, end) from the day's counter"""
+        db = SessionLocal()
+        try:
+            sequences = ReceiptSequence.__table__
+            if supports_upsert(db):
+                stmt = dialect_insert(db, sequences).values(sequence_date=sequence_date, next_value=1 + size)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[sequences.c.sequence_date],
+                    set_={"next_value": sequences.c.next_value + size}
+                ).returning(sequences.c.next_value)
+                end = db.execute(stmt).scalar_one()
+            else:
+                end = self._reserve_block_portable(db, sequence_date, size)
+            db.commit()
+        except Exception as e:
+            logger.error(f"Failed to reserve receipt numbers for {sequence_date}: {str(e)}")
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        return end - size, end
+    
+    def _reserve_block_portable(self, db, sequence_date: str, size: int) -> int:
+        """UPDATE-then-INSERT fallback for databases without ON CONFLICT"""
+        sequences = ReceiptSequence.__table__
+        bump = update(sequences).where(sequences.c.sequence_date == sequence_date) \
+            .values(next_value=sequences.c.next_value + size)
+        if db.execute(bump).rowcount == 0:
+            try:
+                with db.begin_nested():
+                    db.execute(sequences.insert().values(sequence_date=sequence_date, next_value=1 + size))
+                return 1 + size
+            except IntegrityError:
+                # Another session created the day's row first
+                db.execute(bump)
+        return db.query(ReceiptSequence.next_value).filter(ReceiptSequence.sequence_date == sequence_date).scalar()
+
+_allocator = None
+_allocator_lock = threading.Lock()
+
+def get_receipt_allocator() -> ReceiptAllocator:
+    """Process-wide allocator so blocks are shared across Streamlit sessions"""
+    global _allocator
+    with _allocator_lock:
+        if _allocator is None:
+            _allocator = ReceiptAllocator()
+        return _allocator
\ No newline at end of file
@@ -0,0 +1,260 @@
+import csv
+import io
+import logging
+import re
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, Iterator, Optional, TextIO
+from sqlalchemy import bindparam, insert, or_, update
+from config import Config
+from models.payment import Payment
+from models.student import Student
+from services.receipts import ReceiptAllocator, get_receipt_allocator
+
+logger = logging.getLogger(__name__)
+
+# Header names used by the bank and UPI exports we receive, lower-cased
+COLUMN_ALIASES = {
+    "date": ("date", "txn date", "transaction date", "value date", "posting date"),
+    "amount": ("amount", "credit", "deposit", "credit amount", "amount (inr)"),
+    "debit": ("debit", "withdrawal", "debit amount"),
+    "reference": ("utr", "utr no", "transaction id", "reference", "ref no", "ref no./cheque no.", "rrn"),
+    "narration": ("narration", "description", "remarks", "details", "particulars"),
+    "phone": ("phone", "mobile", "payer mobile", "payer phone")
+}
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d %b %Y", "%d-%b-%Y", "%d/%m/%y", "%Y-%m-%d %H:%M:%S")
+PHONE_PATTERN = re.compile(r"(?<!\d)(?:\+?\d{1,3}[\s-]?)?(\d{10})(?!\d)")
+# How many unmatched statement lines a report keeps for display
+SAMPLE_LIMIT = 50
+# Rows fetched per round trip when scanning stored references
+LOOKUP_CHUNK_SIZE = 500
+
+def _normalize_reference(value: Optional[str]) -> str:
+    return re.sub(r"[^0-9A-Za-z]", "", value or "").upper()
+
+def _normalize_phone(value: Optional[str]) -> Optional[str]:
+    """Last ten digits, which identify Indian and North American numbers alike"""
+    digits = re.sub(r"\D", "", value or "")
+    return digits[-10:] if len(digits) >= 10 else None
+
+def _parse_date(value: str) -> Optional[datetime]:
+    value = (value or "").strip()
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format)
+        except ValueError:
+            continue
+    return None
+
+def _parse_amount(value: str) -> Optional[Decimal]:
+    cleaned = re.sub(r"[^0-9.\-]", "", value or "")
+    if not cleaned:
+        return None
+    try:
+        return Decimal(cleaned).quantize(Decimal("0.01"))
+    except InvalidOperation:
+        return None
+
+def parse_statement(file_obj: TextIO) -> Iterator[Dict]:
+    """Credit lines from a statement CSV, one at a time.
+    
+    Columns are found by header name (see COLUMN_ALIASES); debits, blank
+    amounts and unparseable dates are skipped.
+    """
+    reader = csv.DictReader(file_obj)
+    headers = {name.strip().lower(): name for name in reader.fieldnames or []}
+    columns = {
+        field: next((headers[alias] for alias in aliases if alias in headers), None)
+        for field, aliases in COLUMN_ALIASES.items()
+    }
+    if not columns["date"] or not columns["amount"]:
+        raise ValueError("Statement needs a date and an amount/credit column")
+    
+    for line_number, row in enumerate(reader, start=2):
+        if columns["debit"] and _parse_amount(row.get(columns["debit"])):
+            continue
+        amount = _parse_amount(row.get(columns["amount"]))
+        line_date = _parse_date(row.get(columns["date"]))
+        if not amount or amount <= 0 or not line_date:
+            continue
+        
+        narration = (row.get(columns["narration"]) or "") if columns["narration"] else ""
+        phone = _normalize_phone(row.get(columns["phone"])) if columns["phone"] else None
+        if not phone:
+            match = PHONE_PATTERN.search(narration)
+            phone = match.group(1) if match else None
+        
+        yield {
+            "line": line_number,
+            "date": line_date,
+            "amount": amount,
+            "reference": (row.get(columns["reference"]) or "").strip() if columns["reference"] else "",
+            "narration": narration.strip(),
+            "phone": phone
+        }
+
+def reconcile_statement(db, file_obj, window_days: Optional[int] = None, create_pending: bool = True,
+                        allocator: Optional[ReceiptAllocator] = None) -> Dict:
+    """Match a bank/UPI statement against unreconciled payments.
+    
+    Unreconciled payments are loaded once into hash indexes: one keyed on
+    the normalized transaction id and one keyed on amount. Statement lines
+    are streamed and matched by reference; only the leftovers are kept,
+    checked against references already on file, then matched on the same
+    amount within ``window_days`` of the line's date from the same phone
+    (or the only such payment when the line has no phone). Matches are
+    marked reconciled with one executemany UPDATE. Credits from a known
+    student's phone that match nothing become pending payments in one bulk
+    INSERT, numbered from the receipt allocator.
+    """
+    window = timedelta(days=window_days if window_days is not None else Config.STATEMENT_MATCH_WINDOW_DAYS)
+    if isinstance(file_obj, (bytes, bytearray)):
+        file_obj = io.StringIO(file_obj.decode("utf-8-sig"))
+    elif not isinstance(file_obj, io.TextIOBase):
+        file_obj = io.TextIOWrapper(file_obj, encoding="utf-8-sig", newline="")
+    
+    by_reference = {}
+    by_amount = defaultdict(list)
+    pending_rows = db.query(
+        Payment.id, Payment.transaction_id, Payment.amount, Payment.payment_date, Student.phone
+    ).join(Student, Payment.student_id == Student.id).filter(
+        Payment.reconciled_at.is_(None), Payment.status.in_(("completed", "pending"))
+    )
+    for payment in pending_rows:
+        candidate = {"id": payment.id, "date": payment.payment_date, "phone": _normalize_phone(payment.phone)}
+        if payment.transaction_id:
+            by_reference[_normalize_reference(payment.transaction_id)] = candidate
+        by_amount[Decimal(payment.amount).quantize(Decimal("0.01"))].append(candidate)
+    
+    matched = {}
+    unmatched_lines = []
+    stats = {"lines": 0, "by_reference": 0, "by_fallback": 0, "already_recorded": 0}
+    
+    for line in parse_statement(file_obj):
+        stats["lines"] += 1
+        candidate = by_reference.get(_normalize_reference(line["reference"])) if line["reference"] else None
+        if candidate and candidate["id"] not in matched:
+            matched[candidate["id"]] = line
+            stats["by_reference"] += 1
+        else:
+            unmatched_lines.append(line)
+    
+    # Lines already reconciled by an earlier import must not grab another payment
+    recorded = _recorded_references(db, [line["reference"] for line in unmatched_lines if line["reference"]])
+    unknown = []
+    for line in unmatched_lines:
+        reference = _normalize_reference(line["reference"])
+        if reference and reference in recorded:
+            stats["already_recorded"] += 1
+            continue
+        candidate = _fallback_match(by_amount.get(line["amount"], []), line, window, matched)
+        if candidate:
+            matched[candidate["id"]] = line
+            stats["by_fallback"] += 1
+        else:
+            if reference:
+                recorded.add(reference)  # A repeated line must not create two payments
+            unknown.append(line)
+    
+    now = datetime.now()
+    try:
+        if matched:
+            payments = Payment.__table__
+            db.execute(
+                update(payments)
+                .where(payments.c.id == bindparam("b_id"))
+                .values(reconciled_at=now, statement_reference=bindparam("b_reference"), status="completed",
+                        updated_at=now),
+                [{"b_id": payment_id, "b_reference": line["reference"] or None}
+                 for payment_id, line in matched.items()]
+            )
+        
+        created, unmatched = [], unknown
+        if create_pending and unknown:
+            created, unmatched = _pending_payments(db, unknown, now, allocator or get_receipt_allocator())
+            if created:
+                db.execute(insert(Payment), created)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    
+    logger.info(f"Reconciled {len(matched)} of {stats['lines']} statement lines, {len(created)} pending payments created")
+    return {
+        **stats,
+        "reconciled": len(matched),
+        "created_pending": len(created),
+        "unmatched": len(unmatched),
+        "unmatched_lines": unmatched[:SAMPLE_LIMIT]
+    }
+
+def _fallback_match(candidates, line: Dict, window: timedelta, matched: Dict) -> Optional[Dict]:
+    """Same-amount payment near the line's date, confirmed by phone where known"""
+    nearby = [c for c in candidates if c["id"] not in matched and abs(c["date"] - line["date"]) <= window]
+    if line["phone"]:
+        nearby = [c for c in nearby if c["phone"] == line["phone"]]
+    elif len(nearby) > 1:
+        # Without a phone an ambiguous amount is left for staff
+        return None
+    if not nearby:
+        return None
+    return min(nearby, key=lambda c: abs(c["date"] - line["date"]))
+
+def _recorded_references(db, references) -> set:
+    """Which of these references are already stored on a payment, compared normalized.
+    
+    Stored transaction ids and statement references may differ from the
+    statement in case, spacing or punctuation, so an IN on the raw values
+    would miss them. Every stored reference is streamed instead (two
+    columns, rows without one skipped) and normalized with the same
+    _normalize_reference as the match index; only hits are kept.
+    """
+    wanted = {_normalize_reference(reference) for reference in references} - {""}
+    recorded = set()
+    if not wanted:
+        return recorded
+    rows = db.query(Payment.transaction_id, Payment.statement_reference).filter(
+        or_(Payment.transaction_id.isnot(None), Payment.statement_reference.isnot(None))
+    ).yield_per(LOOKUP_CHUNK_SIZE)
+    for transaction_id, statement_reference in rows:
+        for reference in (transaction_id, statement_reference):
+            normalized = _normalize_reference(reference)
+            if normalized in wanted:
+                recorded.add(normalized)
+    return recorded
+
+def _pending_payments(db, lines: Iterable[Dict], now: datetime, allocator: ReceiptAllocator):
+    """Pending payment rows for credits from known students' phones"""
+    lines = list(lines)
+    
+    students = {}
+    for student_id, phone in db.query(Student.id, Student.phone).filter(Student.is_active == True):
+        normalized = _normalize_phone(phone)
+        if normalized:
+            students.setdefault(normalized, student_id)
+    
+    creatable, unmatched = [], []
+    for line in lines:
+        if line["phone"] in students:
+            creatable.append(line)
+        else:
+            unmatched.append(line)
+    
+    receipt_numbers = allocator.reserve(len(creatable)) if creatable else []
+    rows = [
+        {
+            "student_id": students[line["phone"]],
+            "receipt_number": receipt_number,
+            "amount": line["amount"],
+            "payment_date": line["date"],
+            "payment_method": "UPI",
+            "transaction_id": line["reference"] or None,
+            "status": "pending",
+            "notes": f"From statement: {line['narration']}"[:500],
+            "reconciled_at": now,
+            "statement_reference": line["reference"] or None
+        }
+        for line, receipt_number in zip(creatable, receipt_numbers)
+    ]
+    return rows, unmatched
\ No newline at end of file
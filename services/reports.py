@@ -0,0 +1,236 @@
+import hashlib
+import json
+import logging
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import case, func, select
+from config import Config
+from models.attendance import Attendance
+from models.data_version import DataVersion, VERSIONED_TABLES
+from models.enrollment import Enrollment
+from models.payment import Payment
+from models.report_cache import ReportCache
+from models.student import Student
+from services.attendance import COUNTED_STATUSES
+from utils.db import dialect_insert, supports_upsert
+
+logger = logging.getLogger(__name__)
+
+# Fact tables a report can be built on: the model, its date column, the
+# joins that bring in the dimension columns and rows always excluded
+SOURCES = {
+    "payments": {
+        "model": Payment,
+        "date": Payment.payment_date,
+        "joins": [(Student, Payment.student_id == Student.id, False),
+                  (Enrollment, Payment.enrollment_id == Enrollment.id, True)],
+        "where": [Payment.status == "completed"],
+        "tables": [Payment, Student, Enrollment]
+    },
+    "attendance": {
+        "model": Attendance,
+        "date": Attendance.class_date,
+        "joins": [(Student, Attendance.student_id == Student.id, False),
+                  (Enrollment, Attendance.enrollment_id == Enrollment.id, True)],
+        "where": [],
+        "tables": [Attendance, Student, Enrollment]
+    },
+    "enrollments": {
+        "model": Enrollment,
+        "date": Enrollment.start_date,
+        "joins": [(Student, Enrollment.student_id == Student.id, False)],
+        "where": [],
+        "tables": [Enrollment, Student]
+    }
+}
+
+# Dimensions are functions of the report's source so "month" follows its date column
+DIMENSIONS = {
+    "instructor": lambda source, dialect: Student.instructor,
+    "instrument": lambda source, dialect: Student.preferred_instrument,
+    "package": lambda source, dialect: Enrollment.package_type,
+    "month": lambda source, dialect: _month(source["date"], dialect)
+}
+
+# Measures as (source, SQL aggregate)
+_counted = case((Attendance.status.in_(COUNTED_STATUSES), 1), else_=0)
+_held = case((Attendance.status != "cancelled", 1), else_=0)
+MEASURES = {
+    "revenue": ("payments", func.coalesce(func.sum(Payment.amount), 0)),
+    "payments": ("payments", func.count(Payment.id)),
+    "classes_attended": ("attendance", func.sum(_counted)),
+    "attendance_rate": ("attendance", func.round(100.0 * func.sum(_counted) / func.nullif(func.sum(_held), 0), 1)),
+    "active_students": ("enrollments", func.count(func.distinct(case((Enrollment.status == "active", Enrollment.student_id))))),
+    "new_enrollments": ("enrollments", func.count(Enrollment.id))
+}
+
+REPORTS = {
+    "revenue": {
+        "title": "💰 Revenue",
+        "source": "payments",
+        "dimensions": ["month", "instructor"],
+        "measures": ["revenue", "payments"]
+    },
+    "attendance": {
+        "title": "✅ Attendance",
+        "source": "attendance",
+        "dimensions": ["month", "instructor"],
+        "measures": ["classes_attended", "attendance_rate"]
+    },
+    "enrollments": {
+        "title": "📝 Enrollments",
+        "source": "enrollments",
+        "dimensions": ["package"],
+        "measures": ["active_students", "new_enrollments"]
+    }
+}
+
+def _month(column, dialect: str):
+    """YYYY-MM of a datetime column in the database's own dialect"""
+    if dialect == "postgresql":
+        return func.to_char(column, "YYYY-MM")
+    if dialect == "sqlite":
+        return func.strftime("%Y-%m", column)
+    return func.date_format(column, "%Y-%m")
+
+def build_report_query(db, name: str, dimensions: Optional[List[str]] = None, filters: Optional[Dict] = None):
+    """Compile a report definition into one grouped SELECT.
+    
+    ``filters`` may hold instructor, instrument and package (None/"All"
+    means no filter) and start/end dates applied to the source's date
+    column.
+    """
+    report = REPORTS[name]
+    source = SOURCES[report["source"]]
+    dialect = db.get_bind().dialect.name
+    dimensions = report["dimensions"] if dimensions is None else dimensions
+    filters = filters or {}
+    
+    for dimension in dimensions:
+        if dimension not in DIMENSIONS:
+            raise ValueError(f"Unknown dimension: {dimension}")
+    dimension_columns = [DIMENSIONS[d](source, dialect).label(d) for d in dimensions]
+    measure_columns = [MEASURES[m][1].label(m) for m in report["measures"]]
+    
+    stmt = select(*dimension_columns, *measure_columns).select_from(source["model"])
+    for model, on, outer in source["joins"]:
+        stmt = stmt.join(model, on, isouter=outer)
+    stmt = stmt.where(*source["where"])
+    
+    for key in ("instructor", "instrument", "package"):
+        value = filters.get(key)
+        if value and value != "All":
+            stmt = stmt.where(DIMENSIONS[key](source, dialect) == value)
+    if filters.get("start"):
+        stmt = stmt.where(source["date"] >= filters["start"])
+    if filters.get("end"):
+        stmt = stmt.where(source["date"] < filters["end"])
+    
+    if dimension_columns:
+        stmt = stmt.group_by(*dimension_columns).order_by(*dimension_columns)
+    return stmt
+
+def table_version(db, models) -> str:
+    """Version stamp of some tables, read from their data_versions counters.
+    
+    Every committed transaction that writes a versioned table bumps its
+    counter, so this is one indexed lookup rather than a scan of each
+    table, and it changes even for writes within the same second.
+    """
+    names = sorted(model.__tablename__ for model in models)
+    for name in names:
+        if name not in VERSIONED_TABLES:
+            raise ValueError(f"Table {name} has no data version; add it to VERSIONED_TABLES")
+    versions = dict(db.query(DataVersion.table_name, DataVersion.version).filter(DataVersion.table_name.in_(names)).all())
+    stamp = [[name, versions.get(name, 0)] for name in names]
+    return hashlib.sha256(json.dumps(stamp).encode()).hexdigest()
+
+def data_version(db, name: str) -> str:
+    """Version stamp of a report's source tables"""
+    return table_version(db, SOURCES[REPORTS[name]["source"]]["tables"])
+
+def _jsonable(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+def cached_result(db, name: str, params: Dict, models, compute: Callable[[], Dict], use_cache: bool = True) -> Dict:
+    """``compute()``'s result, served from report_cache while ``models`` are unchanged.
+    
+    A hit costs the version lookup plus one indexed cache lookup; a miss
+    calls ``compute`` (which must return a JSON-serializable dict) and
+    stores the result under (name, hash of params).
+    """
+    params_hash = hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+    version = table_version(db, models)
+    
+    if use_cache:
+        cached = db.query(ReportCache).filter(
+            ReportCache.report_name == name, ReportCache.params_hash == params_hash
+        ).first()
+        fresh_after = datetime.now() - timedelta(seconds=Config.REPORT_CACHE_TTL)
+        if cached and cached.data_version == version and cached.computed_at >= fresh_after:
+            return dict(cached.result, cached=True, computed_at=cached.computed_at)
+    
+    result = compute()
+    computed_at = datetime.now()
+    
+    if use_cache:
+        try:
+            _store(db, name, params_hash, version, result, computed_at)
+            db.commit()
+        except Exception as e:
+            logger.error(f"Failed to cache report {name}: {str(e)}")
+            db.rollback()
+    
+    return dict(result, cached=False, computed_at=computed_at)
+
+def run_report(db, name: str, dimensions: Optional[List[str]] = None, filters: Optional[Dict] = None,
+               use_cache: bool = True) -> Dict:
+    """Report rows, served from report_cache while the source data is unchanged.
+    
+    A miss runs the report's single grouped query.
+    """
+    report = REPORTS[name]
+    dimensions = report["dimensions"] if dimensions is None else list(dimensions)
+    filters = filters or {}
+    params = {"dimensions": dimensions, "filters": {k: v for k, v in filters.items() if v not in (None, "All")}}
+    
+    def compute():
+        rows = db.execute(build_report_query(db, name, dimensions, filters)).all()
+        return {
+            "columns": dimensions + report["measures"],
+            "rows": [[_jsonable(value) for value in row] for row in rows]
+        }
+    
+    return cached_result(db, name, params, SOURCES[report["source"]]["tables"], compute, use_cache)
+
+def _store(db, name: str, params_hash: str, version: str, result: Dict, computed_at: datetime):
+    """Insert or replace the cache row for (report, params)"""
+    row = {"report_name": name, "params_hash": params_hash, "data_version": version,
+           "result": result, "computed_at": computed_at}
+    cache = ReportCache.__table__
+    
+    if supports_upsert(db):
+        stmt = dialect_insert(db, cache).values(**row)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[cache.c.report_name, cache.c.params_hash],
+            set_={"data_version": stmt.excluded.data_version, "result": stmt.excluded.result,
+                  "computed_at": stmt.excluded.computed_at}
+        ))
+        return
+    
+    db.query(ReportCache).filter(ReportCache.report_name == name, ReportCache.params_hash == params_hash).delete()
+    db.execute(cache.insert().values(**row))
+
+def clear_report_cache(db, name: Optional[str] = None) -> int:
+    """Drop cached results for one report or all of them"""
+    query = db.query(ReportCache)
+    if name:
+        query = query.filter(ReportCache.report_name == name)
+    deleted = query.delete(synchronize_session=False)
+    db.commit()
+    return deleted
\ No newline at end of file
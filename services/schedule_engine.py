@@ -0,0 +1,154 @@
+import logging
+import threading
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from dateutil.rrule import rrulestr
+from sqlalchemy import and_, or_
+from models.class_schedule import ClassSchedule
+from models.class_schedule_exception import ClassScheduleException
+
+logger = logging.getLogger(__name__)
+
+class ScheduleEngine:
+    """Expands recurring class schedules on demand for a date window.
+    
+    Nothing is materialized: recurring rows are expanded with dateutil's
+    rrule only between the requested start and end, parsed rules are kept in
+    an LRU cache keyed by (schedule id, rule, start date) so edits invalidate
+    naturally, and per-occurrence exceptions are merged in from
+    class_schedule_exceptions.
+    """
+    
+    def __init__(self, cache_size: int = 2048):
+        self.cache_size = cache_size
+        self._rules = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _rule(self, schedule_id: int, rule_text: str, dtstart: datetime):
+        """Parsed rrule for a schedule, from the cache when possible"""
+        key = (schedule_id, rule_text, dtstart)
+        with self._lock:
+            if key in self._rules:
+                self._rules.move_to_end(key)
+                return self._rules[key]
+        
+        try:
+            rule = rrulestr(rule_text, dtstart=dtstart, cache=True)
+        except (ValueError, TypeError) as e:
+            logger.error(f"Invalid recurrence rule on schedule {schedule_id}: {str(e)}")
+            rule = None
+        
+        with self._lock:
+            self._rules[key] = rule
+            if len(self._rules) > self.cache_size:
+                self._rules.popitem(last=False)
+        return rule
+    
+    def clear_cache(self):
+        """Drop all parsed rules"""
+        with self._lock:
+            self._rules.clear()
+    
+    def occurrences(self, db, start: datetime, end: datetime, instructor: Optional[str] = None,
+                    student_id: Optional[int] = None, include_cancelled: bool = False) -> List[Dict]:
+        """All class occurrences starting in [start, end), sorted by start time.
+        
+        Runs three queries whatever the number of series: rows dated inside
+        the window (an index range on class_date), recurring series that
+        started before it (via the (instructor, is_recurring, class_date)
+        index, so an instructor's one-off history is never read) and the
+        exceptions touching the window.
+        """
+        columns = (
+            ClassSchedule.id, ClassSchedule.student_id, ClassSchedule.enrollment_id,
+            ClassSchedule.instructor, ClassSchedule.class_date, ClassSchedule.duration_minutes,
+            ClassSchedule.is_recurring, ClassSchedule.recurrence_rule, ClassSchedule.status
+        )
+        
+        def scoped(query):
+            if instructor:
+                query = query.filter(ClassSchedule.instructor == instructor)
+            if student_id:
+                query = query.filter(ClassSchedule.student_id == student_id)
+            if not include_cancelled:
+                query = query.filter(or_(ClassSchedule.status.is_(None), ClassSchedule.status != "cancelled"))
+            return query
+        
+        schedules = scoped(db.query(*columns).filter(
+            ClassSchedule.class_date >= start, ClassSchedule.class_date < end
+        )).all()
+        # Series that started before the window may still recur inside it
+        schedules += scoped(db.query(*columns).filter(
+            ClassSchedule.is_recurring == True, ClassSchedule.class_date < start
+        )).all()
+        
+        recurring_ids = [s.id for s in schedules if s.is_recurring and s.recurrence_rule]
+        exceptions = defaultdict(dict)
+        if recurring_ids:
+            rows = db.query(ClassScheduleException).filter(
+                ClassScheduleException.class_schedule_id.in_(recurring_ids),
+                or_(
+                    and_(ClassScheduleException.original_date >= start, ClassScheduleException.original_date < end),
+                    and_(ClassScheduleException.new_date >= start, ClassScheduleException.new_date < end)
+                )
+            ).all()
+            for row in rows:
+                exceptions[row.class_schedule_id][row.original_date] = row
+        
+        results = []
+        for schedule in schedules:
+            duration = schedule.duration_minutes or 60
+            
+            if not (schedule.is_recurring and schedule.recurrence_rule):
+                if start <= schedule.class_date < end:
+                    results.append(self._occurrence(schedule, schedule.class_date, duration, schedule.status))
+                continue
+            
+            rule = self._rule(schedule.id, schedule.recurrence_rule, schedule.class_date)
+            if rule is None:
+                if start <= schedule.class_date < end:
+                    results.append(self._occurrence(schedule, schedule.class_date, duration, schedule.status))
+                continue
+            
+            series_exceptions = exceptions.get(schedule.id, {})
+            for occurrence_start in rule.between(start, end, inc=True):
+                if occurrence_start >= end or occurrence_start in series_exceptions:
+                    continue
+                results.append(self._occurrence(schedule, occurrence_start, duration, schedule.status))
+            
+            # Moved occurrences land wherever their new date is
+            for original_date, exception in series_exceptions.items():
+                if exception.status == "rescheduled" and exception.new_date and start <= exception.new_date < end:
+                    results.append(self._occurrence(
+                        schedule, exception.new_date, exception.new_duration_minutes or duration,
+                        "rescheduled", original_start=original_date
+                    ))
+                elif exception.status == "cancelled" and include_cancelled and start <= original_date < end:
+                    results.append(self._occurrence(schedule, original_date, duration, "cancelled"))
+        
+        results.sort(key=lambda occurrence: (occurrence["start"], occurrence["schedule_id"]))
+        return results
+    
+    def _occurrence(self, schedule, occurrence_start: datetime, duration: int, status: str,
+                    original_start: Optional[datetime] = None) -> Dict:
+        return {
+            "schedule_id": schedule.id,
+            "student_id": schedule.student_id,
+            "enrollment_id": schedule.enrollment_id,
+            "instructor": schedule.instructor,
+            "start": occurrence_start,
+            "end": occurrence_start + timedelta(minutes=duration),
+            "duration_minutes": duration,
+            "status": status,
+            "is_recurring": bool(schedule.is_recurring),
+            "original_start": original_start or occurrence_start
+        }
+    
+    def week(self, db, instructor: str, week_start: datetime) -> List[Dict]:
+        """Occurrences for an instructor in the 7 days from week_start"""
+        week_start = week_start.replace(hour=0, minute=0, second=0, microsecond=0)
+        return self.occurrences(db, week_start, week_start + timedelta(days=7), instructor=instructor)
+
+# Shared engine so the parsed-rule cache survives Streamlit reruns
+schedule_engine = ScheduleEngine()
\ No newline at end of file
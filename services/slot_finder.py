@@ -0,0 +1,94 @@
+import math
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+from config import Config
+from models.student import Student
+from services.schedule_engine import schedule_engine
+from utils.timezones import get_zone
+
+def _busy_mask(occurrences: List[Dict], start: datetime, slot_minutes: int, n_slots: int) -> np.ndarray:
+    """Boolean array marking every slot touched by an occurrence"""
+    if not occurrences:
+        return np.zeros(n_slots, dtype=bool)
+    
+    origin = np.datetime64(start, "m")
+    starts = np.array([o["start"] for o in occurrences], dtype="datetime64[m]")
+    ends = np.array([o["end"] for o in occurrences], dtype="datetime64[m]")
+    first = np.clip(np.floor((starts - origin) / np.timedelta64(slot_minutes, "m")).astype(int), 0, n_slots)
+    last = np.clip(np.ceil((ends - origin) / np.timedelta64(slot_minutes, "m")).astype(int), 0, n_slots)
+    
+    # Difference array: +1 where a class begins, -1 where it ends
+    diff = np.zeros(n_slots + 1, dtype=int)
+    np.add.at(diff, first, 1)
+    np.add.at(diff, last, -1)
+    return np.cumsum(diff)[:n_slots] > 0
+
+def _hours_mask(slots: pd.DatetimeIndex, timezone: str, open_hour: int, close_hour: int,
+                slot_minutes: int) -> np.ndarray:
+    """Slots that fall inside working hours in the given time zone"""
+    local = slots.tz_convert(get_zone(timezone))
+    minute_of_day = np.asarray(local.hour) * 60 + np.asarray(local.minute)
+    return (minute_of_day >= open_hour * 60) & (minute_of_day + slot_minutes <= close_hour * 60)
+
+def find_free_slots(db, instructor: str, student_id: int, start: datetime, end: datetime,
+                    duration_minutes: int = 60, top_k: int = 5, per_day: int = 2,
+                    slot_minutes: Optional[int] = None) -> List[Dict]:
+    """Earliest makeup slots when both the instructor and the student are free.
+    
+    Classes are laid out on a fixed-size slot grid over [start, end) as NumPy
+    boolean bitmaps: the instructor's and the student's bookings, the
+    instructor's working hours in Config.TIMEZONE and sensible hours in the
+    student's own time zone. A cumulative sum finds every start where
+    ``duration_minutes`` of consecutive slots are free; up to ``per_day``
+    non-overlapping picks per day are returned, earliest first. Times are
+    naive academy-local datetimes like ClassSchedule.class_date.
+    """
+    slot_minutes = slot_minutes or Config.SLOT_MINUTES
+    student_timezone = db.query(Student.timezone).filter(Student.id == student_id).scalar() or Config.TIMEZONE
+    
+    slots = pd.date_range(start, end, freq=f"{slot_minutes}min", inclusive="left")
+    n_slots = len(slots)
+    needed = math.ceil(duration_minutes / slot_minutes)
+    if n_slots < needed:
+        return []
+    slots = slots.tz_localize(get_zone(Config.TIMEZONE), ambiguous="NaT", nonexistent="shift_forward")
+    
+    # Classes that start shortly before the range can still run into it
+    lookback = start - timedelta(minutes=Config.MAX_CLASS_DURATION_MINUTES)
+    busy = _busy_mask(schedule_engine.occurrences(db, lookback, end, instructor=instructor), start, slot_minutes, n_slots)
+    busy |= _busy_mask(schedule_engine.occurrences(db, lookback, end, student_id=student_id), start, slot_minutes, n_slots)
+    
+    free = ~busy & ~np.asarray(slots.isna())
+    free &= _hours_mask(slots, Config.TIMEZONE, *Config.INSTRUCTOR_HOURS, slot_minutes)
+    free &= _hours_mask(slots, student_timezone, *Config.STUDENT_HOURS, slot_minutes)
+    
+    # Starts where `needed` consecutive slots are all free
+    run_totals = np.concatenate(([0], np.cumsum(free, dtype=int)))
+    candidates = np.flatnonzero(run_totals[needed:] - run_totals[:-needed] == needed)
+    
+    results = []
+    picks_per_day = {}
+    next_allowed = 0
+    for index in candidates:
+        if index < next_allowed:
+            continue
+        slot_start = slots[index]
+        day = slot_start.date()
+        if picks_per_day.get(day, 0) >= per_day:
+            continue
+        picks_per_day[day] = picks_per_day.get(day, 0) + 1
+        next_allowed = index + needed
+        
+        student_start = slot_start.tz_convert(get_zone(student_timezone))
+        results.append({
+            "start": slot_start.tz_localize(None).to_pydatetime(),
+            "end": (slot_start + timedelta(minutes=duration_minutes)).tz_localize(None).to_pydatetime(),
+            "student_start": student_start.tz_localize(None).to_pydatetime(),
+            "student_timezone": student_timezone
+        })
+        if len(results) >= top_k:
+            break
+    
+    return results
\ No newline at end of file
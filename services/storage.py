@@ -1,31 +1,370 @@
+import io
 import os
 import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import BinaryIO, Dict, Iterator, Optional
+from urllib.parse import quote, urlencode
+from sqlalchemy import update, delete
+from sqlalchemy.exc import IntegrityError
 from config import Config
+from models.file_blob import FileBlob
+from models.base import SessionLocal
+from utils.auth import sign_url_path
+
+logger = logging.getLogger(__name__)
+
+# Running SHA-256 of each resumable upload as (hash, bytes hashed), shared by every StorageService
+_upload_digests: Dict = {}
+_upload_digests_lock = threading.Lock()
+
+class _HashingWriter:
+    """Forward-only file wrapper that hashes and counts what is written.
+    
+    It has no seek(), so zipfile and similar writers stream sequentially
+    instead of going back to patch headers, which keeps the hash valid.
+    """
+    
+    def __init__(self, f: BinaryIO):
+        self._f = f
+        self.digest = hashlib.sha256()
+        self.size = 0
+        self.result = None
+    
+    def write(self, data: bytes) -> int:
+        self.digest.update(data)
+        self.size += len(data)
+        return self._f.write(data)
+    
+    def tell(self) -> int:
+        return self.size
+    
+    def flush(self):
+        self._f.flush()
 
 class StorageService:
-    def __init__(self):
+    def __init__(self, content_addressed: Optional[bool] = None):
         self.upload_dir = Path(Config.UPLOAD_DIR)
         self.upload_dir.mkdir(parents=True, exist_ok=True)
+        self.chunk_size = Config.UPLOAD_CHUNK_SIZE
+        self.partial_dir = self.upload_dir / ".partial"
+        self.blob_dir = self.upload_dir / "blobs"
+        if content_addressed is None:
+            content_addressed = Config.CONTENT_ADDRESSED_STORAGE
+        self.content_addressed = content_addressed
     
-    def save_file(self, file_content: bytes, filename: str, subfolder: str = "") -> str:
-        """Save file to local storage and return file path"""
+    def _target_dir(self, subfolder: str = "") -> Path:
+        """Resolve (and create) the directory a file is saved into"""
         if subfolder:
             save_dir = self.upload_dir / subfolder
             save_dir.mkdir(parents=True, exist_ok=True)
         else:
             save_dir = self.upload_dir
+        return save_dir
+    
+    def save_file(self, file_content: bytes, filename: str, subfolder: str = "") -> str:
+        """Save file to local storage and return file path"""
+        return self.save_stream(io.BytesIO(file_content), filename, subfolder)["file_path"]
+    
+    def save_stream(self, file_obj: BinaryIO, filename: str, subfolder: str = "",
+                    expected_sha256: Optional[str] = None) -> Dict:
+        """Stream a file-like object to storage in fixed-size chunks.
+        
+        The data is copied into a temp file next to the destination while its
+        SHA-256 and size are computed, then atomically renamed into place, so
+        readers never see a half-written file. Returns file_path, file_size
+        and sha256.
+        
+        In content-addressed mode the file is stored once per hash under
+        blobs/ab/cd/ and ``subfolder`` is ignored.
+        """
+        digest = hashlib.sha256()
+        size = 0
+        
+        fd, temp_path = tempfile.mkstemp(dir=self._temp_dir(subfolder), prefix=".upload-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                while True:
+                    chunk = file_obj.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+            
+            return self._place_file(temp_path, digest.hexdigest(), size, filename, subfolder, expected_sha256)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+    
+    @contextmanager
+    def open_stream(self, filename: str, subfolder: str = "") -> Iterator[_HashingWriter]:
+        """Write a new file into storage through a forward-only stream.
         
-        file_path = save_dir / filename
+        For producers that write incrementally, such as zipfile: bytes go
+        straight into a temp file next to the destination while they are
+        hashed, and on a clean exit the file is renamed into place as in
+        save_stream. ``stream.result`` then holds file_path, file_size and
+        sha256.
+        """
+        fd, temp_path = tempfile.mkstemp(dir=self._temp_dir(subfolder), prefix=".upload-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                stream = _HashingWriter(f)
+                yield stream
+                f.flush()
+                os.fsync(f.fileno())
+            stream.result = self._place_file(temp_path, stream.digest.hexdigest(), stream.size, filename, subfolder)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+    
+    def _temp_dir(self, subfolder: str = "") -> Path:
+        """Directory for a file being written, on the same volume as its destination"""
+        if self.content_addressed:
+            temp_dir = self.blob_dir / ".tmp"
+            temp_dir.mkdir(parents=True, exist_ok=True)
+            return temp_dir
+        return self._target_dir(subfolder)
+    
+    def _place_file(self, temp_path: str, sha256: str, size: int, filename: str, subfolder: str = "",
+                    expected_sha256: Optional[str] = None) -> Dict:
+        """Rename a fully written, hashed temp file into storage.
         
-        with open(file_path, 'wb') as f:
-            f.write(file_content)
+        The temp file must be on the upload volume. It is left where it is
+        when the checksum does not match or its content is already stored;
+        the caller removes it.
+        """
+        if expected_sha256 and sha256 != expected_sha256.lower():
+            raise ValueError("Uploaded file checksum mismatch")
+        if self.content_addressed:
+            return self._save_blob(temp_path, sha256, size, filename)
         
-        return str(file_path)
+        file_path = self._target_dir(subfolder) / filename
+        os.replace(temp_path, file_path)
+        return {"file_path": str(file_path), "file_size": size, "sha256": sha256}
+    
+    def _blob_path(self, sha256: str, filename: str) -> Path:
+        """Two-level sharded location of a blob, e.g. blobs/3f/a2/3fa2...pdf"""
+        extension = Path(filename).suffix.lower()
+        return self.blob_dir / sha256[:2] / sha256[2:4] / f"{sha256}{extension}"
+    
+    def _save_blob(self, temp_path: str, sha256: str, size: int, filename: str) -> Dict:
+        """Store a hashed temp file once per content hash and take a reference on it"""
+        db = SessionLocal()
+        try:
+            existing_path = self._add_blob_ref(db, sha256)
+            if existing_path:
+                return {"file_path": existing_path, "file_size": size, "sha256": sha256, "deduplicated": True}
+            
+            blob_path = self._blob_path(sha256, filename)
+            blob_path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(temp_path, blob_path)
+            try:
+                db.add(FileBlob(sha256=sha256, file_path=str(blob_path), file_size=size, ref_count=1))
+                db.commit()
+            except IntegrityError:
+                # Another upload of the same content won the insert
+                db.rollback()
+                existing_path = self._add_blob_ref(db, sha256)
+                return {"file_path": existing_path, "file_size": size, "sha256": sha256, "deduplicated": True}
+            
+            return {"file_path": str(blob_path), "file_size": size, "sha256": sha256, "deduplicated": False}
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    
+    def _add_blob_ref(self, db, sha256: str) -> Optional[str]:
+        """Increment a blob's reference count; returns its path if it exists"""
+        result = db.execute(
+            update(FileBlob)
+            .where(FileBlob.sha256 == sha256)
+            .values(ref_count=FileBlob.ref_count + 1)
+        )
+        if result.rowcount == 0:
+            return None
+        db.commit()
+        return db.query(FileBlob.file_path).filter(FileBlob.sha256 == sha256).scalar()
+    
+    def _is_blob_path(self, file_path: str) -> bool:
+        """Whether a path points into the content-addressed blob tree"""
+        return Path(file_path).is_relative_to(self.blob_dir)
+    
+    def collect_garbage(self, grace_seconds: int = 3600) -> Dict:
+        """Remove blobs nobody references any more.
+        
+        Rows with ref_count <= 0 are deleted one at a time with the count
+        re-checked, so a blob re-referenced by a concurrent upload survives.
+        Files in the blob tree without a row (e.g. after a crash between
+        rename and insert) and abandoned resumable uploads are removed once
+        older than ``grace_seconds``. Run it with ``python collect_blobs.py``.
+        """
+        summary = {"blobs_removed": 0, "orphans_removed": 0, "uploads_removed": 0, "bytes_freed": 0}
+        db = SessionLocal()
+        try:
+            candidates = db.query(FileBlob.id, FileBlob.file_path, FileBlob.file_size).filter(FileBlob.ref_count <= 0).all()
+            for blob_id, file_path, file_size in candidates:
+                result = db.execute(delete(FileBlob).where(FileBlob.id == blob_id, FileBlob.ref_count <= 0))
+                db.commit()
+                if not result.rowcount:
+                    continue
+                # Same content may have been uploaded again since the delete
+                if db.query(FileBlob.id).filter(FileBlob.file_path == file_path).first():
+                    continue
+                if self._remove_path(file_path):
+                    summary["blobs_removed"] += 1
+                    summary["bytes_freed"] += file_size or 0
+            
+            if self.blob_dir.exists():
+                known_paths = {path for (path,) in db.query(FileBlob.file_path)}
+                cutoff = time.time() - grace_seconds
+                for path in self.blob_dir.glob("??/??/*"):
+                    if str(path) not in known_paths and path.stat().st_mtime < cutoff:
+                        summary["bytes_freed"] += path.stat().st_size
+                        path.unlink()
+                        summary["orphans_removed"] += 1
+            
+            if self.partial_dir.exists():
+                cutoff = time.time() - grace_seconds
+                for path in self.partial_dir.glob("*.part"):
+                    if path.stat().st_mtime < cutoff:
+                        summary["bytes_freed"] += path.stat().st_size
+                        with _upload_digests_lock:
+                            _upload_digests.pop(path.stem, None)
+                        path.unlink()
+                        summary["uploads_removed"] += 1
+        except Exception as e:
+            logger.error(f"Blob garbage collection failed: {str(e)}")
+            db.rollback()
+        finally:
+            db.close()
+        
+        return summary
+    
+    def _partial_path(self, upload_id: str) -> Path:
+        """Path of the partial file backing a resumable upload"""
+        # Upload ids are generated by start_upload; refuse anything path-like
+        if not upload_id or os.sep in upload_id or upload_id.startswith("."):
+            raise ValueError(f"Invalid upload id: {upload_id}")
+        return self.partial_dir / f"{upload_id}.part"
+    
+    def start_upload(self) -> str:
+        """Begin a resumable chunked upload and return its upload id"""
+        self.partial_dir.mkdir(parents=True, exist_ok=True)
+        upload_id = uuid.uuid4().hex
+        self._partial_path(upload_id).touch()
+        with _upload_digests_lock:
+            _upload_digests[upload_id] = (hashlib.sha256(), 0)
+        return upload_id
+    
+    def upload_offset(self, upload_id: str) -> int:
+        """Bytes received so far for an upload; clients resume from here"""
+        partial_path = self._partial_path(upload_id)
+        if not partial_path.exists():
+            raise FileNotFoundError(f"Unknown upload: {upload_id}")
+        return partial_path.stat().st_size
+    
+    def append_chunk(self, upload_id: str, chunk: bytes, offset: int) -> int:
+        """Append a chunk at ``offset`` and return the new offset.
+        
+        A chunk that was already received (e.g. resent after a dropped
+        connection) is ignored; a gap raises ValueError. The new bytes are
+        hashed as they are written so completing the upload need not read
+        the file again.
+        """
+        current = self.upload_offset(upload_id)
+        if offset + len(chunk) <= current:
+            return current
+        if offset > current:
+            raise ValueError(f"Chunk at offset {offset} leaves a gap, expected {current}")
+        
+        data = chunk[current - offset:]
+        with open(self._partial_path(upload_id), 'ab') as f:
+            f.write(data)
+        with _upload_digests_lock:
+            digest, hashed = _upload_digests.get(upload_id, (None, 0))
+            if digest is not None and hashed == current:
+                digest.update(data)
+                _upload_digests[upload_id] = (digest, hashed + len(data))
+            else:
+                # Started or resumed in another process; complete_upload rehashes the file once
+                _upload_digests.pop(upload_id, None)
+        return offset + len(chunk)
+    
+    def _upload_sha256(self, upload_id: str, partial_path: Path) -> str:
+        """SHA-256 of a partial file, from the running hash when it covers every byte"""
+        with _upload_digests_lock:
+            digest, hashed = _upload_digests.pop(upload_id, (None, 0))
+        if digest is not None and hashed == partial_path.stat().st_size:
+            return digest.hexdigest()
+        
+        digest = hashlib.sha256()
+        with open(partial_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(self.chunk_size), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    def complete_upload(self, upload_id: str, filename: str, subfolder: str = "",
+                        expected_sha256: Optional[str] = None) -> Dict:
+        """Finish a resumable upload by renaming its partial file into place.
+        
+        Stored like save_stream, but the bytes are neither copied nor read
+        again: the hash comes from append_chunk and the partial file itself
+        becomes the stored file.
+        """
+        partial_path = self._partial_path(upload_id)
+        try:
+            with open(partial_path, 'rb') as f:
+                os.fsync(f.fileno())
+            sha256 = self._upload_sha256(upload_id, partial_path)
+            return self._place_file(str(partial_path), sha256, partial_path.stat().st_size,
+                                    filename, subfolder, expected_sha256)
+        finally:
+            if partial_path.exists():
+                os.remove(partial_path)
+    
+    def abort_upload(self, upload_id: str) -> bool:
+        """Discard a resumable upload"""
+        with _upload_digests_lock:
+            _upload_digests.pop(upload_id, None)
+        return self.delete_file(str(self._partial_path(upload_id)))
     
     def delete_file(self, file_path: str) -> bool:
-        """Delete file from storage"""
+        """Delete file from storage; a blob only loses one reference, whatever the current mode"""
+        if self._is_blob_path(file_path):
+            return self._release_blob_ref(file_path)
+        return self._remove_path(file_path)
+    
+    def _release_blob_ref(self, file_path: str) -> bool:
+        """Drop one reference to a blob; collect_garbage removes the file"""
+        db = SessionLocal()
+        try:
+            result = db.execute(
+                update(FileBlob)
+                .where(FileBlob.file_path == file_path, FileBlob.ref_count > 0)
+                .values(ref_count=FileBlob.ref_count - 1)
+            )
+            db.commit()
+            return result.rowcount > 0
+        except Exception as e:
+            logger.error(f"Failed to release blob reference: {str(e)}")
+            db.rollback()
+            return False
+        finally:
+            db.close()
+    
+    def _remove_path(self, file_path: str) -> bool:
+        """Remove a file from disk regardless of storage mode"""
         try:
             if os.path.exists(file_path):
                 os.remove(file_path)
@@ -34,10 +373,30 @@ class StorageService:
         except Exception:
             return False
     
-    def get_file_url(self, file_path: str) -> str:
-        """Get URL for file access (for local files, return relative path)"""
-        return file_path.replace(str(self.upload_dir), "/uploads")
+    def get_file_url(self, file_path: str, expires_in: Optional[int] = None) -> str:
+        """Get a signed, expiring media server URL for a stored file"""
+        url_path = file_path.replace(str(self.upload_dir), "/uploads")
+        url_path = quote(url_path.replace(os.sep, "/"))
+        expires = int(time.time()) + (expires_in or Config.MEDIA_URL_TTL)
+        query = urlencode({"expires": expires, "signature": sign_url_path(url_path, expires)})
+        return f"{Config.MEDIA_BASE_URL}{url_path}?{query}"
+    
+    def get_open_url(self, material_id: int, expires_in: Optional[int] = None) -> str:
+        """Get a signed media server URL that counts an open of a material and redirects to it"""
+        url_path = f"/open/{material_id}"
+        expires = int(time.time()) + (expires_in or Config.MEDIA_URL_TTL)
+        query = urlencode({"expires": expires, "signature": sign_url_path(url_path, expires)})
+        return f"{Config.MEDIA_BASE_URL}{url_path}?{query}"
     
     def file_exists(self, file_path: str) -> bool:
         """Check if file exists"""
+        if self.content_addressed and self._is_blob_path(file_path):
+            # Indexed lookup on file_blobs.file_path instead of a stat() call
+            db = SessionLocal()
+            try:
+                return db.query(FileBlob.id).filter(
+                    FileBlob.file_path == file_path, FileBlob.ref_count > 0
+                ).first() is not None
+            finally:
+                db.close()
         return os.path.exists(file_path)
\ No newline at end of file
@@ -0,0 +1,97 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from models.base import Base
+from models.material import Material
+from models.material_access import MaterialAccessDaily
+from services.access_tracker import MaterialAccessTracker, popular_materials
+
+class TestMaterialAccessTracker(unittest.TestCase):
+
+    def setUp(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        event.listen(engine, "connect", lambda connection, _: connection.execute("PRAGMA foreign_keys=ON"))
+        Base.metadata.create_all(bind=engine)
+        self.Session = sessionmaker(bind=engine)
+        session_patcher = patch('services.access_tracker.SessionLocal', self.Session)
+        session_patcher.start()
+        self.addCleanup(session_patcher.stop)
+        
+        db = self.Session()
+        db.add_all([
+            Material(id=1, title="C Major Scale", instructor="Aditya"),
+            Material(id=2, title="Raga Mohanam", instructor="Brahmani", access_count=5)
+        ])
+        db.commit()
+        db.close()
+        
+        self.tracker = MaterialAccessTracker(flush_interval=3600, flush_threshold=1000)
+    
+    def test_flush_batches_counts_and_rollups(self):
+        yesterday = datetime.now() - timedelta(days=1)
+        for _ in range(3):
+            self.tracker.record(1)
+        self.tracker.record(1, when=yesterday)
+        self.tracker.record(2)
+        self.assertEqual(self.tracker.pending(), 5)
+        
+        self.assertEqual(self.tracker.flush(), 5)
+        self.assertEqual(self.tracker.pending(), 0)
+        
+        # A second flush adds to the existing rollup rows
+        self.tracker.record(1)
+        self.tracker.flush()
+        
+        db = self.Session()
+        self.assertEqual(db.get(Material, 1).access_count, 5)
+        self.assertEqual(db.get(Material, 2).access_count, 6)
+        daily = {(row.material_id, row.access_date): row.access_count for row in db.query(MaterialAccessDaily)}
+        self.assertEqual(daily[(1, datetime.now().date())], 4)
+        self.assertEqual(daily[(1, yesterday.date())], 1)
+        
+        popular = popular_materials(db, days=7)
+        self.assertEqual([row["material_id"] for row in popular], [1, 2])
+        self.assertEqual(popular[0]["accesses"], 5)
+        db.close()
+    
+    def test_threshold_triggers_flush(self):
+        tracker = MaterialAccessTracker(flush_interval=3600, flush_threshold=2)
+        tracker.record(1)
+        tracker.record(1)
+        
+        self.assertEqual(tracker.pending(), 0)
+        db = self.Session()
+        self.assertEqual(db.get(Material, 1).access_count, 2)
+        db.close()
+    
+    def test_deleted_material_does_not_block_flushes(self):
+        self.tracker.record(1)
+        self.tracker.record(99)
+        
+        self.assertEqual(self.tracker.flush(), 1)
+        self.assertEqual(self.tracker.pending(), 0)
+        db = self.Session()
+        self.assertEqual(db.get(Material, 1).access_count, 1)
+        self.assertEqual([row.material_id for row in db.query(MaterialAccessDaily)], [1])
+        db.close()
+    
+    def test_failing_counts_are_retried_once(self):
+        self.tracker.record(1)
+        with patch.object(self.tracker, "_write", side_effect=RuntimeError("database down")):
+            self.assertEqual(self.tracker.flush(), 0)
+            self.assertEqual(self.tracker.pending(), 1)
+            self.tracker.record(2)
+            self.assertEqual(self.tracker.flush(), 0)
+        
+        # The access to 1 failed twice and is gone; the newer one to 2 gets another chance
+        self.assertEqual(self.tracker.pending(), 1)
+        self.assertEqual(self.tracker.flush(), 1)
+        db = self.Session()
+        self.assertEqual(db.get(Material, 2).access_count, 6)
+        db.close()
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,89 @@
+import unittest
+from datetime import date, datetime
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from models.base import Base
+from models.attendance import Attendance
+from models.class_schedule import ClassSchedule
+from models.enrollment import Enrollment
+from models.student import Student
+from services.attendance import roll_call_sheet, record_roll_call
+
+class TestRollCall(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        self.addCleanup(self.db.close)
+        
+        self.db.add_all([
+            Student(id=1, name="Asha", phone="1", instructor="Aditya"),
+            Student(id=2, name="Ben", phone="2", instructor="Aditya"),
+            Enrollment(id=1, student_id=1, package_type="1_month_8", total_classes=8, classes_used=2,
+                       fee_amount=4000, start_date=datetime(2026, 3, 1), end_date=datetime(2026, 4, 1)),
+            Enrollment(id=2, student_id=2, package_type="1_month_8", total_classes=8, classes_used=0,
+                       fee_amount=4000, start_date=datetime(2026, 3, 1), end_date=datetime(2026, 4, 1)),
+            ClassSchedule(id=1, student_id=1, enrollment_id=1, instructor="Aditya",
+                          class_date=datetime(2026, 3, 2, 17, 0), duration_minutes=60),
+            ClassSchedule(id=2, student_id=2, enrollment_id=2, instructor="Aditya",
+                          class_date=datetime(2026, 3, 2, 18, 0), duration_minutes=60)
+        ])
+        self.db.commit()
+    
+    def _marks(self, first_status="present", second_status="absent"):
+        return [
+            {"student_id": 1, "enrollment_id": 1, "class_schedule_id": 1,
+             "class_date": datetime(2026, 3, 2, 17, 0), "status": first_status},
+            {"student_id": 2, "enrollment_id": 2, "class_schedule_id": 2,
+             "class_date": datetime(2026, 3, 2, 18, 0), "status": second_status}
+        ]
+    
+    def test_records_and_increments_counted_statuses(self):
+        statements = []
+        event.listen(self.engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        
+        result = record_roll_call(self.db, "Aditya", date(2026, 3, 2), self._marks())
+        
+        self.assertEqual(result, {"recorded": 2, "skipped": 0, "enrollments_updated": 1})
+        writes = [s for s in statements if s.lstrip().upper().startswith(("INSERT", "UPDATE")) and "data_versions" not in s]
+        self.assertEqual(len(writes), 2)
+        self.assertEqual(self.db.get(Enrollment, 1).classes_used, 3)
+        self.assertEqual(self.db.get(Enrollment, 2).classes_used, 0)
+        self.assertEqual(self.db.query(Attendance).count(), 2)
+    
+    def test_second_roll_call_does_not_double_count(self):
+        record_roll_call(self.db, "Aditya", date(2026, 3, 2), self._marks())
+        result = record_roll_call(self.db, "Aditya", date(2026, 3, 2), self._marks("makeup", "present"))
+        
+        self.assertEqual(result["recorded"], 0)
+        self.assertEqual(result["skipped"], 2)
+        self.assertEqual(self.db.get(Enrollment, 1).classes_used, 3)
+    
+    def test_rows_saved_by_another_roll_call_are_not_counted(self):
+        # Another device saved Asha's class after this sheet was loaded
+        self.db.add(Attendance(student_id=1, enrollment_id=1, instructor="Aditya",
+                               class_date=datetime(2026, 3, 2, 17, 0), status="present"))
+        self.db.commit()
+        
+        result = record_roll_call(self.db, "Aditya", date(2026, 3, 2), self._marks("present", "present"))
+        
+        self.assertEqual(result, {"recorded": 1, "skipped": 1, "enrollments_updated": 1})
+        self.assertEqual(self.db.get(Enrollment, 1).classes_used, 2)
+        self.assertEqual(self.db.get(Enrollment, 2).classes_used, 1)
+        self.assertEqual(self.db.query(Attendance).count(), 2)
+    
+    def test_invalid_status_rejected(self):
+        with self.assertRaises(ValueError):
+            record_roll_call(self.db, "Aditya", date(2026, 3, 2), self._marks("late"))
+        self.assertEqual(self.db.query(Attendance).count(), 0)
+    
+    def test_sheet_shows_marked_status(self):
+        record_roll_call(self.db, "Aditya", date(2026, 3, 2), self._marks()[:1])
+        sheet = roll_call_sheet(self.db, "Aditya", date(2026, 3, 2))
+        
+        self.assertEqual([row["student_name"] for row in sheet], ["Asha", "Ben"])
+        self.assertEqual([row["marked_status"] for row in sheet], ["present", None])
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,80 @@
+import time
+import unittest
+from datetime import datetime, timedelta
+import numpy as np
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from models.base import Base
+from models.attendance import Attendance
+from models.class_schedule import ClassSchedule
+from models.enrollment import Enrollment
+from models.student import Student
+from services.attendance_analytics import attendance_heatmap, instructor_utilization
+
+class TestAttendanceAnalytics(unittest.TestCase):
+
+    def setUp(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        self.db = sessionmaker(bind=engine)()
+        self.addCleanup(self.db.close)
+        
+        self.db.add_all([
+            Student(id=1, name="Asha", phone="1", instructor="Aditya"),
+            Enrollment(id=1, student_id=1, package_type="1_month_8", total_classes=8, fee_amount=4000,
+                       start_date=datetime(2026, 3, 1), end_date=datetime(2026, 4, 1)),
+            # Weekly 45-minute class on Mondays at 17:00
+            ClassSchedule(id=1, student_id=1, enrollment_id=1, instructor="Aditya", class_date=datetime(2026, 3, 2, 17, 0),
+                          duration_minutes=45, is_recurring=True, recurrence_rule="FREQ=WEEKLY;COUNT=4")
+        ])
+        marks = [(datetime(2026, 3, 2, 17, 0), "present"), (datetime(2026, 3, 9, 17, 0), "absent"),
+                 (datetime(2026, 3, 16, 17, 0), "makeup"), (datetime(2026, 3, 23, 17, 0), "cancelled"),
+                 (datetime(2026, 3, 7, 10, 30), "present")]  # A Saturday
+        for class_date, status in marks:
+            self.db.add(Attendance(student_id=1, enrollment_id=1, class_schedule_id=1, instructor="Aditya",
+                                   class_date=class_date, status=status))
+        self.db.commit()
+    
+    def test_heatmap_bins_by_weekday_and_hour(self):
+        heatmap = attendance_heatmap(self.db, datetime(2026, 3, 1), datetime(2026, 4, 1), instructor="Aditya")
+        
+        self.assertEqual(heatmap["classes"].shape, (7, 24))
+        self.assertEqual(heatmap["classes"][0, 17], 3)
+        self.assertEqual(heatmap["attended"][0, 17], 2)
+        self.assertEqual(heatmap["no_shows"][0, 17], 1)
+        self.assertAlmostEqual(heatmap["no_show_rate"][0, 17], 100 / 3)
+        self.assertEqual(heatmap["classes"][5, 10], 1)
+        self.assertEqual(heatmap["classes"].sum(), 4)
+        self.assertTrue(np.isnan(heatmap["no_show_rate"][2, 9]))
+        
+        empty = attendance_heatmap(self.db, datetime(2026, 3, 1), datetime(2026, 4, 1), student_id=99)
+        self.assertEqual(empty["classes"].sum(), 0)
+    
+    def test_instructor_utilization(self):
+        rows = instructor_utilization(self.db, datetime(2026, 3, 1), datetime(2026, 3, 31), ["Aditya", "Brahmani"])
+        
+        aditya, brahmani = rows
+        self.assertEqual(aditya["booked_minutes"], 4 * 45)
+        self.assertEqual(aditya["delivered_minutes"], 4 * 45)
+        self.assertEqual(aditya["available_minutes"], 30 * 12 * 60)
+        self.assertEqual(aditya["utilization"], round(100 * 180 / 21600, 1))
+        self.assertEqual(aditya["no_show_rate"], 25.0)
+        self.assertEqual(brahmani["booked_minutes"], 0)
+    
+    def test_years_of_history_in_under_a_second(self):
+        start = datetime(2022, 1, 1, 9, 0)
+        # Another student, so the history never lands on Asha's marked classes
+        self.db.add(Student(id=2, name="Ben", phone="2", instructor="Aditya"))
+        self.db.execute(insert(Attendance), [
+            {"student_id": 2, "enrollment_id": 1, "instructor": "Aditya", "status": ("present", "absent")[i % 2],
+             "class_date": start + timedelta(hours=2 * i)}
+            for i in range(20000)
+        ])
+        
+        began = time.perf_counter()
+        heatmap = attendance_heatmap(self.db, start, datetime(2026, 12, 1))
+        self.assertLess(time.perf_counter() - began, 1.0)
+        self.assertEqual(heatmap["classes"].sum(), 20004)
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,90 @@
+import json
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from config import Config
+from models.base import Base
+from models.revoked_token import RevokedToken
+from utils.auth import (
+    _b64encode, _token_signature, create_access_token, decode_access_token, require_secret_key, revoke_token,
+    session_claims
+)
+
+class TestSessionTokens(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch.object(Config, "SECRET_KEY", "test-secret-0123456789")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = {"sub": 7}
+    
+    def test_round_trip(self):
+        claims = decode_access_token(create_access_token(self.user))
+        
+        self.assertEqual({key: claims[key] for key in self.user}, self.user)
+        self.assertAlmostEqual(claims["exp"], time.time() + Config.SESSION_TOKEN_TTL, delta=5)
+        self.assertNotEqual(create_access_token(self.user), create_access_token(self.user))
+    
+    def test_rejects_tampered_expired_and_foreign_tokens(self):
+        token = create_access_token(self.user)
+        payload, signature = token.split(".")
+        forged = create_access_token({"sub": 1}).split(".")[0]
+        
+        self.assertIsNone(decode_access_token(f"{forged}.{signature}"))
+        self.assertIsNone(decode_access_token(f"{payload}.{signature[:-2]}"))
+        self.assertIsNone(decode_access_token(create_access_token(self.user, timedelta(seconds=-1))))
+        for junk in (None, "", "abc", "a.b.c", "é.é"):
+            self.assertIsNone(decode_access_token(junk))
+        
+        with patch.object(Config, "SECRET_KEY", "another-secret"):
+            self.assertIsNone(decode_access_token(token))
+    
+    def test_refuses_placeholder_secret(self):
+        token = create_access_token(self.user)
+        
+        for placeholder in ("dev-secret-key", "", None):
+            with patch.object(Config, "SECRET_KEY", placeholder):
+                with self.assertRaises(RuntimeError):
+                    require_secret_key()
+                with self.assertRaises(RuntimeError):
+                    create_access_token(self.user)
+                self.assertIsNone(decode_access_token(token))
+        
+        # A token forged with the old default key is never accepted
+        with patch.object(Config, "SECRET_KEY", "dev-secret-key"):
+            payload = _b64encode(json.dumps({"sub": 1, "exp": int(time.time()) + 60, "jti": "x"}).encode())
+            forged = f"{payload}.{_token_signature(payload)}"
+            self.assertIsNone(decode_access_token(forged))
+    
+    def test_revocation_is_stored(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        self.addCleanup(db.close)
+        token = create_access_token(self.user)
+        other = create_access_token(self.user)
+        db.add(RevokedToken(jti="old", expires_at=datetime.now() - timedelta(hours=1)))
+        db.commit()
+        
+        self.assertTrue(revoke_token(db, token))
+        self.assertFalse(revoke_token(db, token))
+        self.assertIsNotNone(session_claims(db, other))
+        
+        # Another process (a fresh session on the same database) still rejects it
+        other_db = sessionmaker(bind=engine)()
+        self.addCleanup(other_db.close)
+        self.assertIsNone(session_claims(other_db, token))
+        self.assertEqual([row.jti for row in other_db.query(RevokedToken)], [decode_access_token(token)["jti"]])
+    
+    def test_validation_is_fast(self):
+        token = create_access_token(self.user)
+        started = time.perf_counter()
+        for _ in range(1000):
+            decode_access_token(token)
+        self.assertLess((time.perf_counter() - started) / 1000, 0.001)
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,70 @@
+import unittest
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from models.base import Base
+from models.class_schedule import ClassSchedule
+from models.enrollment import Enrollment
+from models.student import Student
+from services.calendar import week_calendar
+
+class TestWeekCalendar(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        self.addCleanup(self.db.close)
+        
+        self.db.add_all([
+            Student(id=1, name="Asha", phone="1", instructor="Aditya", timezone="Asia/Kolkata"),
+            Student(id=2, name="Ben", phone="2", instructor="Aditya", timezone="America/New_York"),
+            Enrollment(id=1, student_id=1, package_type="1_month_8", total_classes=8, classes_used=3,
+                       fee_amount=4000, start_date=datetime(2026, 3, 1), end_date=datetime(2026, 4, 1)),
+            Enrollment(id=2, student_id=2, package_type="3_months_24", total_classes=24, classes_used=0,
+                       fee_amount=11000, start_date=datetime(2026, 3, 1), end_date=datetime(2026, 6, 1)),
+            ClassSchedule(id=1, student_id=1, enrollment_id=1, instructor="Aditya",
+                          class_date=datetime(2026, 3, 3, 17, 0), duration_minutes=60),
+            ClassSchedule(id=2, student_id=2, enrollment_id=2, instructor="Aditya",
+                          class_date=datetime(2026, 3, 2, 18, 0), duration_minutes=60,
+                          is_recurring=True, recurrence_rule="FREQ=WEEKLY;BYDAY=MO,TH")
+        ])
+        self.db.commit()
+    
+    def _count_queries(self, week_start):
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(self.engine, "before_cursor_execute", listener)
+        try:
+            calendar = week_calendar(self.db, "Aditya", week_start)
+        finally:
+            event.remove(self.engine, "before_cursor_execute", listener)
+        return calendar, len(statements)
+    
+    def test_days_and_cards(self):
+        calendar, _ = self._count_queries(datetime(2026, 3, 2))
+        
+        self.assertEqual(calendar["total"], 3)
+        self.assertEqual(len(calendar["days"]), 7)
+        monday = calendar["days"][0]["classes"]
+        self.assertEqual(monday[0]["student_name"], "Ben")
+        self.assertEqual(monday[0]["package"], "3 Months - 24 Classes")
+        self.assertEqual(monday[0]["student_time"], datetime(2026, 3, 2, 7, 30))
+        tuesday = calendar["days"][1]["classes"]
+        self.assertEqual(tuesday[0]["classes_remaining"], 5)
+        self.assertEqual(len(calendar["days"][3]["classes"]), 1)
+    
+    def test_query_count_is_constant(self):
+        _, few = self._count_queries(datetime(2026, 3, 2))
+        
+        for offset in range(30):
+            self.db.add(ClassSchedule(student_id=1, enrollment_id=1, instructor="Aditya",
+                                      class_date=datetime(2026, 3, 4, 6, 0) + timedelta(hours=offset)))
+        self.db.commit()
+        calendar, many = self._count_queries(datetime(2026, 3, 2))
+        
+        self.assertEqual(calendar["total"], 33)
+        self.assertEqual(few, many)
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,106 @@
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from models.base import Base
+from models.cohort_retention import CohortRetention
+from models.enrollment import Enrollment
+from models.job_run import JobRun
+from models.student import Student
+from models.student_cohort import StudentCohort
+from services.cohorts import _fold_batch, refresh_cohorts, rebuild_cohorts, retention_matrix, run_cohort_refresh
+
+class TestCohorts(unittest.TestCase):
+
+    def setUp(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        self.Session = sessionmaker(bind=engine)
+        self.db = self.Session()
+        self.addCleanup(self.db.close)
+        
+        self.db.add_all([Student(id=i, name=f"Student {i}", phone=str(i), instructor="Aditya") for i in range(1, 4)])
+        self.db.commit()
+    
+    def enroll(self, student_id, year, month, enrollment_id=None):
+        self.db.add(Enrollment(id=enrollment_id, student_id=student_id, package_type="1_month_8", total_classes=8, fee_amount=4000,
+                               start_date=datetime(year, month, 5), end_date=datetime(year, month, 28)))
+        self.db.commit()
+    
+    def cells(self):
+        return {(row.cohort_month, row.period): row.students for row in self.db.query(CohortRetention) if row.students}
+    
+    def test_incremental_refresh_matches_rebuild(self):
+        self.enroll(1, 2026, 1)
+        self.enroll(2, 2026, 1)
+        self.assertEqual(refresh_cohorts(self.db)["processed"], 2)
+        self.assertEqual(self.cells(), {("2026-01", 0): 2})
+        
+        self.enroll(1, 2026, 2)
+        self.enroll(1, 2026, 2)  # Second enrollment in the same month counts once
+        self.enroll(2, 2026, 4)
+        self.enroll(3, 2026, 2)
+        self.assertEqual(refresh_cohorts(self.db)["processed"], 4)
+        self.assertEqual(refresh_cohorts(self.db)["processed"], 0)
+        expected = {("2026-01", 0): 2, ("2026-01", 1): 1, ("2026-01", 3): 1, ("2026-02", 0): 1}
+        self.assertEqual(self.cells(), expected)
+        
+        # A backdated enrollment moves the student to an earlier cohort
+        self.enroll(3, 2025, 12)
+        refresh_cohorts(self.db, batch_size=1)
+        expected = {("2026-01", 0): 2, ("2026-01", 1): 1, ("2026-01", 3): 1, ("2025-12", 0): 1, ("2025-12", 2): 1}
+        self.assertEqual(self.cells(), expected)
+        self.assertEqual(self.db.query(StudentCohort.cohort_month).filter(StudentCohort.student_id == 3).scalar(),
+                         "2025-12")
+        
+        self.assertEqual(rebuild_cohorts(self.db), {"students": 3, "cells": 5})
+        self.assertEqual(self.cells(), expected)
+    
+    def test_refresh_counts_late_commits_and_claims_once(self):
+        # Enrollment 5 commits before enrollment 4 (ids are handed out before commit)
+        self.enroll(1, 2026, 1, enrollment_id=5)
+        self.assertEqual(refresh_cohorts(self.db)["processed"], 1)
+        self.enroll(2, 2026, 1, enrollment_id=4)
+        self.assertEqual(refresh_cohorts(self.db)["processed"], 1)
+        self.assertEqual(self.cells(), {("2026-01", 0): 2})
+        
+        # Another refresh folds enrollment 6 between our read and our claim
+        self.enroll(1, 2026, 2, enrollment_id=6)
+        self.enroll(3, 2026, 2, enrollment_id=7)
+        stale_batch = self.db.execute(
+            select(Enrollment.id, Enrollment.student_id, Enrollment.start_date).where(Enrollment.id >= 6)
+        ).all()
+        self.db.query(Enrollment).filter(Enrollment.id == 6).update({"cohort_folded_at": datetime.now()})
+        self.db.commit()
+        self.assertFalse(_fold_batch(self.db, stale_batch))
+        self.db.rollback()
+        
+        self.assertEqual(refresh_cohorts(self.db)["processed"], 1)
+        self.assertEqual(self.cells(), {("2026-01", 0): 2, ("2026-02", 0): 1})
+    
+    def test_background_refresh_records_job_run(self):
+        self.enroll(1, 2026, 1)
+        self.enroll(2, 2026, 2)
+        with patch("services.cohorts.SessionLocal", self.Session):
+            self.assertEqual(run_cohort_refresh(), 2)
+            self.assertEqual(run_cohort_refresh(), 0)
+        
+        self.assertEqual(self.cells(), {("2026-01", 0): 1, ("2026-02", 0): 1})
+        runs = self.db.query(JobRun).order_by(JobRun.id).all()
+        self.assertEqual([(run.job_name, run.status, run.rows_affected) for run in runs],
+                         [("cohort_refresh", "completed", 2), ("cohort_refresh", "completed", 0)])
+    
+    def test_retention_matrix(self):
+        self.enroll(1, 2026, 1)
+        self.enroll(2, 2026, 1)
+        self.enroll(1, 2026, 2)
+        refresh_cohorts(self.db)
+        
+        matrix = retention_matrix(self.db, max_periods=2)
+        self.assertEqual(matrix, [{"cohort": "2026-01", "size": 2, "students": [2, 1, 0],
+                                   "retention": [100.0, 50.0, 0.0]}])
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,94 @@
+import unittest
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from models.base import Base
+from models.class_schedule import ClassSchedule
+from services.conflicts import find_conflicts, find_series_conflicts, validate_timetable
+
+class TestConflicts(unittest.TestCase):
+
+    def setUp(self):
+        engine = self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        self.db = sessionmaker(bind=engine)()
+        self.addCleanup(self.db.close)
+        
+        self.db.add_all([
+            ClassSchedule(id=1, student_id=1, enrollment_id=1, instructor="Aditya",
+                          class_date=datetime(2026, 3, 2, 17, 0), duration_minutes=60),
+            # Weekly Tuesday 19:00 series for Brahmani's student
+            ClassSchedule(id=2, student_id=2, enrollment_id=2, instructor="Brahmani",
+                          class_date=datetime(2026, 1, 6, 19, 0), duration_minutes=45,
+                          is_recurring=True, recurrence_rule="FREQ=WEEKLY;BYDAY=TU")
+        ])
+        self.db.commit()
+    
+    def test_find_conflicts_for_instructor_and_student(self):
+        conflicts = find_conflicts(self.db, datetime(2026, 3, 2, 17, 30), 60, instructor="Aditya", student_id=9)
+        self.assertEqual([c["schedule_id"] for c in conflicts], [1])
+        self.assertEqual(conflicts[0]["conflict_on"], ["instructor"])
+        
+        # Back-to-back is fine
+        self.assertEqual(find_conflicts(self.db, datetime(2026, 3, 2, 18, 0), 60, instructor="Aditya"), [])
+        
+        # Student 2 is busy with the recurring series on Tuesday 3 March
+        conflicts = find_conflicts(self.db, datetime(2026, 3, 3, 19, 30), 30, instructor="Aditya", student_id=2)
+        self.assertEqual(conflicts[0]["conflict_on"], ["student_id"])
+        self.assertEqual(conflicts[0]["start"], datetime(2026, 3, 3, 19, 0))
+    
+    def test_find_conflicts_reads_only_the_window(self):
+        # A year of Aditya's past one-off classes
+        self.db.add_all([
+            ClassSchedule(student_id=5, enrollment_id=5, instructor="Aditya",
+                          class_date=datetime(2025, 1, 1, 9, 0) + timedelta(days=day))
+            for day in range(365)
+        ])
+        self.db.commit()
+        statements = []
+        
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if "FROM class_schedules" in statement:
+                statements.append((statement, parameters))
+        event.listen(self.engine, "before_cursor_execute", capture)
+        conflicts = find_conflicts(self.db, datetime(2026, 3, 2, 17, 30), 60, instructor="Aditya")
+        event.remove(self.engine, "before_cursor_execute", capture)
+        
+        self.assertEqual([c["schedule_id"] for c in conflicts], [1])
+        rows_read = sum(len(self.db.connection().exec_driver_sql(statement, parameters).all())
+                        for statement, parameters in statements)
+        self.assertEqual(rows_read, 1)
+    
+    def test_weekly_series_checks_every_occurrence(self):
+        # Free on the first Monday, but Brahmani's Tuesday series collides from the second week
+        self.db.add(ClassSchedule(id=3, student_id=3, enrollment_id=3, instructor="Aditya",
+                                  class_date=datetime(2026, 3, 16, 17, 0), duration_minutes=60))
+        self.db.commit()
+        start = datetime(2026, 3, 9, 17, 30)
+        self.assertEqual(find_conflicts(self.db, start, 60, instructor="Aditya"), [])
+        
+        conflicts = find_series_conflicts(self.db, start, 60, "FREQ=WEEKLY", instructor="Aditya", weeks=4)
+        self.assertEqual([(c["schedule_id"], c["booking_start"]) for c in conflicts],
+                         [(3, datetime(2026, 3, 16, 17, 30))])
+        
+        conflicts = find_series_conflicts(self.db, datetime(2026, 3, 10, 19, 30), 30, "FREQ=WEEKLY", student_id=2, weeks=3)
+        self.assertEqual([c["start"] for c in conflicts],
+                         [datetime(2026, 3, 10, 19, 0), datetime(2026, 3, 17, 19, 0), datetime(2026, 3, 24, 19, 0)])
+        self.assertEqual(find_series_conflicts(self.db, start, 60, "FREQ=WEEKLY", instructor="Aditya", weeks=1), [])
+    
+    def test_validate_timetable(self):
+        entries = [
+            {"instructor": "Aditya", "student_id": 3, "start": datetime(2026, 3, 4, 10, 0), "duration_minutes": 60},
+            {"instructor": "Aditya", "student_id": 4, "start": datetime(2026, 3, 4, 10, 30), "duration_minutes": 60},
+            {"instructor": "Aditya", "student_id": 5, "start": datetime(2026, 3, 4, 11, 30), "duration_minutes": 60},
+            {"instructor": "Aditya", "student_id": 2, "start": datetime(2026, 3, 3, 19, 15), "duration_minutes": 30}
+        ]
+        
+        conflicts = validate_timetable(self.db, entries)
+        
+        pairs = {(c["conflict_on"], c["first"].get("index", c["first"].get("schedule_id")), c["second"].get("index")) for c in conflicts}
+        # Entries 1 and 2 are back-to-back; entry 3 clashes with existing schedule 2
+        self.assertEqual(pairs, {("instructor", 0, 1), ("student_id", 2, 3)})
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
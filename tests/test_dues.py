@@ -0,0 +1,79 @@
+import unittest
+from datetime import datetime
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from models.base import Base
+from models.enrollment import Enrollment
+from models.payment import Payment
+from models.student import Student
+from services.dues import outstanding_dues, dues_breakdown
+
+class TestDues(unittest.TestCase):
+
+    def setUp(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        self.db = sessionmaker(bind=engine)()
+        self.addCleanup(self.db.close)
+        
+        self.db.add_all([
+            Student(id=1, name="Asha", phone="1", instructor="Aditya"),
+            Student(id=2, name="Ben", phone="2", instructor="Brahmani"),
+            Student(id=3, name="Chitra", phone="3", instructor="Aditya")
+        ])
+        enrollments = [(1, 1, "1_month_8", 4000), (2, 2, "3_months_24", 11000), (3, 3, "1_month_8", 4000)]
+        for enrollment_id, student_id, package_type, fee in enrollments:
+            self.db.add(Enrollment(id=enrollment_id, student_id=student_id, package_type=package_type,
+                                   total_classes=8, fee_amount=fee, start_date=datetime(2026, 3, 1),
+                                   end_date=datetime(2026, 3, enrollment_id + 20)))
+        payments = [(1, 1, 1500, "completed"), (1, 1, 1000, "completed"), (2, 2, 5000, "failed"),
+                    (3, 3, 4000, "completed")]
+        for number, (student_id, enrollment_id, amount, status) in enumerate(payments):
+            self.db.add(Payment(student_id=student_id, enrollment_id=enrollment_id, receipt_number=f"R{number}",
+                                amount=amount, payment_date=datetime(2026, 3, 2), status=status))
+        self.db.commit()
+    
+    def test_outstanding_balances(self):
+        result = outstanding_dues(self.db)
+        
+        self.assertEqual(result["total"], 2)
+        self.assertEqual(result["total_due"], 12500)
+        self.assertEqual([(r["student_name"], r["paid"], r["balance"]) for r in result["rows"]],
+                         [("Ben", 0, 11000), ("Asha", 2500, 1500)])
+    
+    def test_filters_sort_and_pagination(self):
+        result = outstanding_dues(self.db, instructor="Aditya", outstanding_only=False, sort="student")
+        self.assertEqual([r["student_name"] for r in result["rows"]], ["Asha", "Chitra"])
+        self.assertEqual(result["rows"][1]["balance"], 0)
+        
+        page_two = outstanding_dues(self.db, outstanding_only=False, sort="end_date", page=2, page_size=2)
+        self.assertEqual(page_two["total"], 3)
+        self.assertEqual([r["enrollment_id"] for r in page_two["rows"]], [3])
+    
+    def test_breakdown_by_package(self):
+        breakdown = {row["package_type"]: row for row in dues_breakdown(self.db, by="package_type")}
+        self.assertEqual(breakdown["1 Month - 8 Classes"]["enrollments"], 2)
+        self.assertEqual(breakdown["1 Month - 8 Classes"]["balance"], 1500)
+        self.assertEqual(breakdown["3 Months - 24 Classes"]["paid"], 0)
+    
+    def test_large_payment_volume(self):
+        self.db.execute(insert(Student), [{"id": i, "name": f"S{i}", "phone": str(i), "instructor": "Aditya"}
+                                          for i in range(10, 2010)])
+        self.db.execute(insert(Enrollment), [
+            {"id": i, "student_id": i, "package_type": "1_month_8", "total_classes": 8, "fee_amount": 4000,
+             "start_date": datetime(2026, 3, 1), "end_date": datetime(2026, 4, 1), "status": "active"}
+            for i in range(10, 2010)
+        ])
+        self.db.execute(insert(Payment), [
+            {"student_id": 10 + n % 2000, "enrollment_id": 10 + n % 2000, "receipt_number": f"B{n}",
+             "amount": 100, "payment_date": datetime(2026, 3, 2), "status": "completed"}
+            for n in range(30000)
+        ])
+        self.db.commit()
+        
+        result = outstanding_dues(self.db)
+        self.assertEqual(result["total"], 2002)
+        self.assertEqual(result["rows"][0]["balance"], 11000)
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
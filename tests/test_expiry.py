@@ -0,0 +1,68 @@
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from models.base import Base
+from models.enrollment import Enrollment
+from models.job_run import JobRun
+from models.student import Student
+from services.expiry import expire_enrollments, run_expiry_sweep
+from services.reports import table_version
+
+class TestEnrollmentExpiry(unittest.TestCase):
+
+    def setUp(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        self.Session = sessionmaker(bind=engine)
+        session_patcher = patch('services.expiry.SessionLocal', self.Session)
+        session_patcher.start()
+        self.addCleanup(session_patcher.stop)
+        
+        db = self.Session()
+        db.add(Student(id=1, name="Asha", phone="1", instructor="Aditya"))
+        rows = [
+            (1, "active", datetime(2026, 2, 1), 3),   # past end date
+            (2, "active", datetime(2026, 4, 1), 8),   # every class used
+            (3, "active", datetime(2026, 4, 1), 2),   # still running
+            (4, "cancelled", datetime(2026, 2, 1), 0)
+        ]
+        for enrollment_id, status, end_date, classes_used in rows:
+            db.add(Enrollment(id=enrollment_id, student_id=1, package_type="1_month_8", total_classes=8,
+                              classes_used=classes_used, fee_amount=4000, status=status,
+                              start_date=datetime(2026, 1, 1), end_date=end_date))
+        db.commit()
+        db.close()
+    
+    def test_expires_finished_enrollments(self):
+        db = self.Session()
+        expired = expire_enrollments(db, now=datetime(2026, 3, 1))
+        db.commit()
+        
+        self.assertEqual(sorted(expired), [1, 2])
+        statuses = dict(db.query(Enrollment.id, Enrollment.status).all())
+        self.assertEqual(statuses, {1: "expired", 2: "expired", 3: "active", 4: "cancelled"})
+        db.close()
+    
+    def test_sweep_records_run_and_invalidates_reports(self):
+        db = self.Session()
+        before = table_version(db, [Enrollment])
+        db.close()
+        
+        self.assertEqual(run_expiry_sweep(now=datetime(2026, 3, 1)), 2)
+        db = self.Session()
+        after = table_version(db, [Enrollment])
+        db.close()
+        self.assertEqual(run_expiry_sweep(now=datetime(2026, 3, 1)), 0)
+        
+        db = self.Session()
+        self.assertNotEqual(before, after)
+        self.assertEqual(table_version(db, [Enrollment]), after)
+        runs = db.query(JobRun).order_by(JobRun.id).all()
+        self.assertEqual([(run.status, run.rows_affected) for run in runs], [("completed", 2), ("completed", 0)])
+        db.close()
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
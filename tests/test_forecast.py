@@ -0,0 +1,69 @@
+import unittest
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from models.base import Base
+from models.enrollment import Enrollment
+from models.student import Student
+from services.forecast import revenue_forecast
+
+class TestForecast(unittest.TestCase):
+
+    def setUp(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        self.db = sessionmaker(bind=engine)()
+        self.addCleanup(self.db.close)
+        self.now = datetime(2026, 3, 10)
+        
+        self.db.add_all([Student(id=i, name=f"Student {i}", phone=str(i), instructor="Aditya") for i in range(1, 5)])
+        # History: students 1 and 2 renewed their monthly package, student 3 did not
+        for student_id, month in [(1, 1), (1, 2), (2, 1), (2, 2), (3, 1)]:
+            self.enroll(student_id, "1_month_8", datetime(2026, month, 1), datetime(2026, month + 1, 1),
+                        status="expired", fee=4000)
+        self.db.commit()
+    
+    def enroll(self, student_id, package_type, start, end, status="active", fee=4000, used=0, per_week=2):
+        self.db.add(Enrollment(student_id=student_id, package_type=package_type, total_classes=8,
+                               classes_used=used, classes_per_week=per_week, fee_amount=fee,
+                               start_date=start, end_date=end, status=status))
+    
+    def test_projects_renewals_from_end_dates_and_burn_rate(self):
+        # Ends on its end date in April
+        self.enroll(1, "1_month_8", datetime(2026, 3, 5), datetime(2026, 4, 5), fee=5000)
+        # Six classes left at two a week runs out in March, before its May end date
+        self.enroll(4, "1_month_8", datetime(2026, 3, 1), datetime(2026, 5, 20), used=2, fee=5000)
+        self.db.commit()
+        
+        forecast = revenue_forecast(self.db, months=3, now=self.now)
+        
+        # Only January's enrollments are past their renewal window: 2 of 3 renewed
+        rate = 2 / 3
+        self.assertEqual(forecast["renewal_rates"]["1_month_8"], 0.667)
+        self.assertEqual(forecast["renewal_rates"]["1_year_96"], 0.667)
+        average_fee = (5 * 4000 + 2 * 5000) / 7
+        march, april, may = forecast["months"]
+        self.assertEqual(march["month"], "2026-03")
+        self.assertEqual(march["expiring"], 1)
+        self.assertEqual(march["expected_renewals"], round(rate, 1))
+        # April: the first enrollment's renewal plus the March renewal's own renewal
+        self.assertEqual(april["expiring"], 1)
+        self.assertEqual(april["expected_renewals"], round(rate + rate ** 2, 1))
+        self.assertAlmostEqual(april["expected_revenue"], (rate + rate ** 2) * average_fee, places=1)
+        self.assertEqual(may["expected_renewals"], round(rate ** 2 + rate ** 3, 1))
+    
+    def test_cached_until_enrollments_change(self):
+        first = revenue_forecast(self.db, now=self.now)
+        second = revenue_forecast(self.db, now=self.now)
+        self.assertFalse(first["cached"])
+        self.assertTrue(second["cached"])
+        self.assertEqual(second["total_revenue"], 0)
+        
+        self.enroll(4, "1_month_8", datetime(2026, 3, 1), datetime(2026, 4, 1))
+        self.db.commit()
+        third = revenue_forecast(self.db, now=self.now)
+        self.assertFalse(third["cached"])
+        self.assertGreater(third["total_revenue"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
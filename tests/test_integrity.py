@@ -0,0 +1,84 @@
+import unittest
+from datetime import datetime
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from models.base import Base
+from models.attendance import Attendance
+from models.enrollment import Enrollment
+from models.payment import Payment
+from models.student import Student
+from services.integrity import reconcile_class_counters, find_orphans
+
+class TestIntegrity(unittest.TestCase):
+
+    def setUp(self):
+        engine = self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        self.db = sessionmaker(bind=engine)()
+        self.addCleanup(self.db.close)
+        
+        self.db.add(Student(id=1, name="Asha", phone="1", instructor="Aditya"))
+        for enrollment_id, classes_used in ((1, 2), (2, 5), (3, None), (4, 0)):
+            self.db.add(Enrollment(id=enrollment_id, student_id=1, package_type="1_month_8", total_classes=8,
+                                   classes_used=classes_used, fee_amount=4000,
+                                   start_date=datetime(2026, 3, 1), end_date=datetime(2026, 4, 1)))
+        for day, (enrollment_id, status) in enumerate([(1, "present"), (1, "makeup"), (1, "absent"),
+                                                       (2, "present"), (3, "present")], start=1):
+            self.db.add(Attendance(student_id=1, enrollment_id=enrollment_id, instructor="Aditya",
+                                   class_date=datetime(2026, 3, day, 17, 0), status=status))
+        self.db.commit()
+    
+    def test_reports_drift_across_chunks(self):
+        result = reconcile_class_counters(self.db, chunk_size=2)
+        
+        self.assertEqual(result["checked"], 4)
+        self.assertEqual(result["drifted"], 2)
+        self.assertEqual(result["fixed"], 0)
+        self.assertEqual(result["samples"], [
+            {"enrollment_id": 2, "recorded": 5, "actual": 1},
+            {"enrollment_id": 3, "recorded": 0, "actual": 1}
+        ])
+        self.assertEqual(self.db.get(Enrollment, 2).classes_used, 5)
+    
+    def test_fix_rewrites_counters(self):
+        result = reconcile_class_counters(self.db, fix=True, chunk_size=3)
+        self.assertEqual(result["fixed"], 2)
+        
+        self.db.expire_all()
+        self.assertEqual([e.classes_used for e in self.db.query(Enrollment).order_by(Enrollment.id)], [2, 1, 1, 0])
+        self.assertEqual(reconcile_class_counters(self.db)["drifted"], 0)
+    
+    def test_fix_keeps_concurrent_roll_call(self):
+        # A roll call for enrollment 2 commits between the read and the fix
+        def roll_call(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith("UPDATE enrollments") and not self.marked:
+                self.marked = True
+                conn.exec_driver_sql("INSERT INTO attendance (student_id, enrollment_id, instructor, class_date, status) "
+                                     "VALUES (1, 2, 'Aditya', '2026-03-10 17:00:00', 'present')")
+                conn.exec_driver_sql("UPDATE enrollments SET classes_used = classes_used + 1 WHERE id = 2")
+        self.marked = False
+        event.listen(self.engine, "before_cursor_execute", roll_call)
+        result = reconcile_class_counters(self.db, fix=True)
+        event.remove(self.engine, "before_cursor_execute", roll_call)
+        
+        self.assertEqual(result["fixed"], 2)
+        self.db.expire_all()
+        self.assertEqual(self.db.get(Enrollment, 2).classes_used, 2)
+        self.assertEqual(reconcile_class_counters(self.db)["drifted"], 0)
+    
+    def test_finds_orphans(self):
+        self.db.add_all([
+            Payment(student_id=99, receipt_number="R1", amount=100, payment_date=datetime(2026, 3, 1)),
+            Payment(student_id=1, enrollment_id=42, receipt_number="R2", amount=100, payment_date=datetime(2026, 3, 1)),
+            Payment(student_id=1, receipt_number="R3", amount=100, payment_date=datetime(2026, 3, 1))
+        ])
+        self.db.commit()
+        
+        orphans = {(o["table"], o["column"]): o for o in find_orphans(self.db, chunk_size=1)}
+        
+        self.assertEqual(set(orphans), {("payments", "student_id"), ("payments", "enrollment_id")})
+        self.assertEqual(orphans[("payments", "student_id")]["count"], 1)
+        self.assertEqual(orphans[("payments", "enrollment_id")]["references"], "enrollments.id")
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,91 @@
+import unittest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from models.base import Base
+from models.material import Material
+from models.material_assignment import MaterialAssignment
+from models.student import Student
+from services.materials import filter_students, assign_material, student_materials, facet_counts, matching_total, search_materials
+
+class TestMaterialAssignments(unittest.TestCase):
+
+    def setUp(self):
+        engine = self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        self.db = sessionmaker(bind=engine)()
+        self.addCleanup(self.db.close)
+        
+        self.db.add_all([
+            Student(id=1, name="Asha", phone="1", instructor="Aditya", preferred_instrument="Piano"),
+            Student(id=2, name="Ben", phone="2", instructor="Aditya", preferred_instrument="Guitar"),
+            Student(id=3, name="Chitra", phone="3", instructor="Aditya", preferred_instrument="Piano"),
+            Student(id=4, name="Dev", phone="4", instructor="Brahmani", preferred_instrument="Piano"),
+            Material(id=10, title="Piano scales", instructor="Aditya"),
+            Material(id=11, title="Aditya public notes", instructor="Aditya", is_public=True),
+            Material(id=12, title="Brahmani public notes", instructor="Brahmani", is_public=True)
+        ])
+        self.db.commit()
+    
+    def test_assign_material_fans_out_once(self):
+        query = filter_students(self.db, instructor="Aditya", instrument="Piano", skill_level="All")
+        
+        self.assertEqual(assign_material(self.db, 10, query, assigned_by="Aditya"), 2)
+        # Re-sharing to a wider set only adds the missing students
+        self.assertEqual(assign_material(self.db, 10, filter_students(self.db, instructor="Aditya")), 1)
+        self.db.commit()
+        
+        assigned = {row.student_id for row in self.db.query(MaterialAssignment).filter_by(material_id=10)}
+        self.assertEqual(assigned, {1, 2, 3})
+    
+    def test_student_materials(self):
+        assign_material(self.db, 10, filter_students(self.db, instrument="Piano", instructor="Aditya"))
+        self.db.commit()
+        
+        self.assertEqual({m.id for m in student_materials(self.db, 1)}, {10, 11})
+        self.assertEqual({m.id for m in student_materials(self.db, 2)}, {11})
+        self.assertEqual({m.id for m in student_materials(self.db, 4)}, {12})
+        
+        # Addressed to a student directly; retired materials drop out
+        self.db.add(Material(id=13, title="Asha's homework", instructor="Aditya", student_id=1))
+        self.db.query(Material).filter(Material.id == 11).update({"is_active": False})
+        self.db.commit()
+        self.assertEqual({m.id for m in student_materials(self.db, 1)}, {10, 13})
+    
+    def test_student_materials_use_indexes(self):
+        statements = []
+        
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters))
+        event.listen(self.engine, "before_cursor_execute", capture)
+        student_materials(self.db, 1)
+        event.remove(self.engine, "before_cursor_execute", capture)
+        
+        statement, parameters = statements[-1]
+        plan = " ".join(row[-1] for row in self.db.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters))
+        self.assertNotIn("SCAN materials", plan)
+        self.assertIn("ix_materials_instructor_is_public", plan)
+    
+    def test_facet_counts_and_pagination(self):
+        self.db.add_all([
+            Material(title="Guitar chords", instructor="Aditya", instrument="Guitar", file_type="PDF"),
+            Material(title="Piano video", instructor="Aditya", instrument="Piano", file_type="Video"),
+            Material(title="Old piano sheet", instructor="Aditya", instrument="Piano", file_type="PDF", is_active=False)
+        ])
+        self.db.commit()
+        filters = {"instructor": "Aditya", "instrument": "Piano", "skill_level": "All", "file_type": "All"}
+        
+        counts = facet_counts(self.db, filters)
+        
+        # Instrument counts ignore the instrument filter but apply the instructor one
+        self.assertEqual(counts["instrument"], {"Guitar": 1, "Piano": 1})
+        self.assertEqual(counts["instructor"], {"Aditya": 1})
+        self.assertEqual(counts["file_type"], {"Video": 1})
+        self.assertEqual(matching_total(counts, filters), 1)
+        
+        all_filters = dict.fromkeys(filters, "All")
+        self.assertEqual(matching_total(facet_counts(self.db, all_filters), all_filters), 5)
+        page = search_materials(self.db, all_filters, page=2, page_size=3)
+        self.assertEqual(len(page), 2)
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
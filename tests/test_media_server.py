@@ -0,0 +1,110 @@
+import http.client
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+from urllib.parse import urlsplit
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from models.base import Base
+from models.material import Material
+from services.media_server import create_server, parse_range
+from services.storage import StorageService
+from config import Config
+
+class TestParseRange(unittest.TestCase):
+
+    def test_parse_range(self):
+        self.assertEqual(parse_range("bytes=0-99", 1000), (0, 99))
+        self.assertEqual(parse_range("bytes=900-", 1000), (900, 999))
+        self.assertEqual(parse_range("bytes=-100", 1000), (900, 999))
+        self.assertEqual(parse_range("bytes=990-2000", 1000), (990, 999))
+        self.assertIsNone(parse_range("bytes=0-1,5-6", 1000))
+        with self.assertRaises(ValueError):
+            parse_range("bytes=1000-", 1000)
+
+class TestMediaServer(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        patcher = patch.multiple(Config, UPLOAD_DIR=self.temp_dir.name, MEDIA_BASE_URL="")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.temp_dir.cleanup)
+        
+        self.content = bytes(range(256)) * 40
+        storage = StorageService(content_addressed=False)
+        self.file_path = storage.save_file(self.content, "practice.mp4", subfolder="materials")
+        self.url = storage.get_file_url(self.file_path)
+        
+        self.server = create_server(host="127.0.0.1", port=0)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+    
+    def _get(self, url, headers=None):
+        conn = http.client.HTTPConnection(*self.server.server_address[:2])
+        conn.request("GET", url, headers=headers or {})
+        response = conn.getresponse()
+        body = response.read()
+        conn.close()
+        return response, body
+    
+    def test_range_request(self):
+        response, body = self._get(self.url, {"Range": "bytes=100-199"})
+        
+        self.assertEqual(response.status, 206)
+        self.assertEqual(body, self.content[100:200])
+        self.assertEqual(response.getheader("Content-Range"), f"bytes 100-199/{len(self.content)}")
+        self.assertEqual(response.getheader("Content-Type"), "video/mp4")
+    
+    def test_conditional_request(self):
+        response, body = self._get(self.url)
+        self.assertEqual(response.status, 200)
+        self.assertEqual(body, self.content)
+        
+        response, body = self._get(self.url, {"If-None-Match": response.getheader("ETag")})
+        self.assertEqual(response.status, 304)
+        self.assertEqual(body, b"")
+    
+    def test_rejects_unsigned_and_expired_urls(self):
+        response, _ = self._get(urlsplit(self.url).path)
+        self.assertEqual(response.status, 403)
+        
+        expired_url = StorageService(content_addressed=False).get_file_url(self.file_path, expires_in=-10)
+        response, _ = self._get(expired_url)
+        self.assertEqual(response.status, 403)
+    
+    def test_open_counts_and_redirects(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        db.add_all([Material(id=1, title="Scales", instructor="Aditya", file_path=self.file_path),
+                    Material(id=2, title="Video", instructor="Aditya", file_path="https://example.com/v"),
+                    Material(id=3, title="Old", instructor="Aditya", file_path=self.file_path, is_active=False)])
+        db.commit()
+        db.close()
+        tracker = MagicMock()
+        patch("services.media_server.SessionLocal", sessionmaker(bind=engine)).start()
+        patch("services.media_server.get_access_tracker", return_value=tracker).start()
+        self.addCleanup(patch.stopall)
+        storage = StorageService(content_addressed=False)
+        
+        response, _ = self._get(storage.get_open_url(1))
+        self.assertEqual(response.status, 302)
+        self.assertEqual(response.getheader("Cache-Control"), "no-store")
+        response, body = self._get(response.getheader("Location"))
+        self.assertEqual(body, self.content)
+        
+        response, _ = self._get(storage.get_open_url(2))
+        self.assertEqual(response.getheader("Location"), "https://example.com/v")
+        self.assertEqual([c.args for c in tracker.record.call_args_list], [(1,), (2,)])
+        
+        for url in (storage.get_open_url(3), storage.get_open_url(1, expires_in=-10), "/open/1"):
+            response, _ = self._get(url)
+            self.assertIn(response.status, (403, 404))
+        self.assertEqual(tracker.record.call_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
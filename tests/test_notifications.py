@@ -89,6 +89,43 @@ class TestFast2SMSService(unittest.TestCase):
         self.assertFalse(result)
         mock_db.add.assert_called_once()  # Should still log the attempt
         mock_db.commit.assert_called_once()
+    
+    @patch('services.notifications.requests.get')
+    @patch('services.notifications.SessionLocal')
+    def test_broadcast_template_chunks_recipients(self, mock_session, mock_requests):
+        # Mock successful API response
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {"status": "success"}
+        mock_response.raise_for_status.return_value = None
+        mock_requests.return_value = mock_response
+        
+        # Mock database session
+        mock_db = MagicMock()
+        mock_session.return_value = mock_db
+        
+        # Five students, one duplicate phone, two numbers per request
+        recipients = [(1, "+911111111111"), (2, "+912222222222"), (3, "+913333333333"),
+                      (4, "+914444444444"), (5, "+911111111111")]
+        result = self.service.broadcast_template(
+            recipients=recipients,
+            template_id=Config.TEMPLATE_MATERIAL_SHARE,
+            template_name="chords_material_share",
+            variables={"Var1": "Scales", "Var2": "Aditya", "Var3": "https://example.com"},
+            chunk_size=2
+        )
+        
+        self.assertEqual(result["recipients"], 4)
+        self.assertEqual(result["sent"], 4)
+        self.assertEqual(result["requests"], 2)
+        self.assertEqual(mock_requests.call_count, 2)
+        first_params = mock_requests.call_args_list[0].kwargs["params"]
+        self.assertEqual(first_params["numbers"], "+911111111111,+912222222222")
+        
+        # One bulk insert for all recipients
+        mock_db.execute.assert_called_once()
+        self.assertEqual(len(mock_db.execute.call_args.args[1]), 4)
+        mock_db.commit.assert_called_once()
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,100 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from config import Config
+from models.base import Base
+from models.user import User
+from services.password_policy import (
+    authenticate, calibrate_rounds, hash_passwords, hash_rounds, needs_rehash, MIN_ROUNDS, MAX_ROUNDS
+)
+from utils.auth import hash_password, verify_password
+
+class TestPasswordPolicy(unittest.TestCase):
+
+    def setUp(self):
+        # The lowest cost bcrypt allows keeps the tests fast
+        patcher = patch.object(Config, "BCRYPT_ROUNDS", 4)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        self.db = sessionmaker(bind=engine)()
+        self.addCleanup(self.db.close)
+    
+    def add_user(self, username, password, rounds=4, is_active=True):
+        self.db.add(User(username=username, email=f"{username}@example.com", full_name=username,
+                         hashed_password=hash_password(password, rounds), is_active=is_active))
+        self.db.commit()
+    
+    def test_hashes_use_policy_cost(self):
+        hashed = hash_password("secret")
+        self.assertEqual(hash_rounds(hashed), 4)
+        self.assertFalse(needs_rehash(hashed))
+        self.assertFalse(needs_rehash(hash_password("secret", 5)))
+        with patch.object(Config, "BCRYPT_ROUNDS", 5):
+            self.assertTrue(needs_rehash(hashed))
+        self.assertTrue(needs_rehash("plain-text"))
+        self.assertIsNone(hash_rounds("plain-text"))
+        
+        hashes = hash_passwords(["one", "two", "three"])
+        self.assertTrue(verify_password("two", hashes[1]))
+        self.assertEqual({hash_rounds(hashed) for hashed in hashes}, {4})
+    
+    def test_authenticate_and_rehash_on_policy_change(self):
+        self.add_user("asha", "secret")
+        self.add_user("old", "secret", is_active=False)
+        
+        self.assertIsNone(authenticate(self.db, "asha", "wrong"))
+        self.assertIsNone(authenticate(self.db, "nobody", "secret"))
+        self.assertIsNone(authenticate(self.db, "old", "secret"))
+        self.assertEqual(hash_rounds(self.db.query(User.hashed_password).filter(User.username == "asha").scalar()), 4)
+        
+        with patch.object(Config, "BCRYPT_ROUNDS", 5):
+            user = authenticate(self.db, "asha", "secret")
+        self.assertEqual(user.username, "asha")
+        stored = self.db.query(User.hashed_password).filter(User.username == "asha").scalar()
+        self.assertEqual(hash_rounds(stored), 5)
+        self.assertTrue(verify_password("secret", stored))
+        
+        # A lower policy cost never downgrades a stronger hash
+        self.assertEqual(authenticate(self.db, "asha", "secret").username, "asha")
+        self.assertEqual(self.db.query(User.hashed_password).filter(User.username == "asha").scalar(), stored)
+    
+    def test_checks_run_on_the_bounded_pool(self):
+        self.add_user("asha", "secret")
+        threads = []
+        
+        def recording_verify(password, hashed_password):
+            threads.append(threading.current_thread().name)
+            return verify_password(password, hashed_password)
+        
+        with patch("services.password_policy.verify_password", recording_verify):
+            self.assertEqual(authenticate(self.db, "asha", "secret").username, "asha")
+        self.assertTrue(threads[0].startswith("bcrypt"))
+        
+        # A saturated pool makes the login give up instead of hanging the page
+        release = threading.Event()
+        busy = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(busy.shutdown)
+        self.addCleanup(release.set)
+        busy.submit(release.wait)
+        with patch("services.password_policy._executor", busy), patch.object(Config, "PASSWORD_CHECK_TIMEOUT", 0.05):
+            with self.assertRaises(TimeoutError):
+                authenticate(self.db, "asha", "secret")
+            release.set()
+            self.assertEqual(authenticate(self.db, "asha", "secret").username, "asha")
+    
+    def test_calibration_stays_in_range(self):
+        calibrate_rounds.cache_clear()
+        self.addCleanup(calibrate_rounds.cache_clear)
+        
+        self.assertEqual(calibrate_rounds(1), MIN_ROUNDS)
+        calibrate_rounds.cache_clear()
+        self.assertEqual(calibrate_rounds(10 ** 9), MAX_ROUNDS)
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,75 @@
+import hashlib
+import os
+import tempfile
+import unittest
+import zipfile
+from datetime import datetime
+from unittest.mock import patch
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from models.base import Base
+from models.enrollment import Enrollment
+from models.payment import Payment
+from models.student import Student
+from services.receipt_pdf import generate_receipts, month_receipts_zip, receipt_rows, render_receipt
+from config import Config
+
+class TestReceiptPdf(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        patcher = patch.multiple(Config, UPLOAD_DIR=self.temp_dir.name, CONTENT_ADDRESSED_STORAGE=False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.temp_dir.cleanup)
+        
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        self.db = sessionmaker(bind=engine)()
+        self.addCleanup(self.db.close)
+        
+        self.db.add_all([
+            Student(id=1, name="Asha", phone="1", instructor="Aditya"),
+            Enrollment(id=1, student_id=1, package_type="1_month_8", total_classes=8, fee_amount=4000,
+                       start_date=datetime(2026, 3, 1), end_date=datetime(2026, 4, 1))
+        ])
+        for day in range(1, 11):
+            self.db.add(Payment(student_id=1, enrollment_id=1, receipt_number=f"CMA202603{day:02d}0001",
+                                amount=400, payment_date=datetime(2026, 3, day), payment_method="UPI"))
+        self.db.add(Payment(student_id=1, enrollment_id=1, receipt_number="CMA202604010001",
+                            amount=400, payment_date=datetime(2026, 4, 1)))
+        self.db.add(Payment(student_id=1, enrollment_id=1, receipt_number="CMA202603150002",
+                            amount=400, payment_date=datetime(2026, 3, 15), status="failed"))
+        self.db.commit()
+    
+    def test_render_receipt(self):
+        receipt = receipt_rows(self.db, year=2026, month=3)[0]
+        self.assertEqual(receipt["package_name"], "1 Month - 8 Classes")
+        
+        pdf = render_receipt(receipt)
+        self.assertTrue(pdf.startswith(b"%PDF"))
+    
+    def test_generate_receipts_saves_through_storage(self):
+        payment_ids = [p.id for p in self.db.query(Payment).filter(Payment.payment_date < datetime(2026, 3, 3))]
+        saved = generate_receipts(self.db, payment_ids=payment_ids)
+        
+        self.assertEqual(len(saved), 2)
+        self.assertTrue(saved[0]["file_path"].endswith(os.path.join("receipts", "2026-03", "CMA202603010001.pdf")))
+        self.assertTrue(os.path.exists(saved[1]["file_path"]))
+    
+    def test_month_zip_uses_process_pool(self):
+        result = month_receipts_zip(self.db, 2026, 3, max_workers=2)
+        
+        self.assertEqual(result["receipts"], 10)
+        with zipfile.ZipFile(result["file_path"]) as archive:
+            names = archive.namelist()
+            self.assertEqual(len(names), 10)
+            self.assertEqual(names[0], "CMA202603010001.pdf")
+            self.assertTrue(archive.read(names[-1]).startswith(b"%PDF"))
+        # Written straight into storage: hashed as it streamed, with no scratch file left over
+        with open(result["file_path"], "rb") as f:
+            self.assertEqual(result["sha256"], hashlib.sha256(f.read()).hexdigest())
+        self.assertEqual(os.listdir(os.path.dirname(result["file_path"])), ["receipts-2026-03.zip"])
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
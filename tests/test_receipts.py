@@ -0,0 +1,79 @@
+import os
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from models.base import Base
+from models.receipt_sequence import ReceiptSequence
+from services.receipts import ReceiptAllocator
+
+class TestReceiptAllocator(unittest.TestCase):
+
+    def setUp(self):
+        handle, path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        engine = create_engine(f"sqlite:///{path}", connect_args={"timeout": 30})
+        self.addCleanup(engine.dispose)
+        Base.metadata.create_all(bind=engine)
+        self.Session = sessionmaker(bind=engine)
+        session_patcher = patch('services.receipts.SessionLocal', self.Session)
+        session_patcher.start()
+        self.addCleanup(session_patcher.stop)
+    
+    def _counter(self, sequence_date):
+        db = self.Session()
+        try:
+            return db.query(ReceiptSequence.next_value).filter(ReceiptSequence.sequence_date == sequence_date).scalar()
+        finally:
+            db.close()
+    
+    def test_numbers_come_from_reserved_blocks(self):
+        allocator = ReceiptAllocator(block_size=5)
+        day = datetime(2026, 3, 2)
+        
+        numbers = [allocator.next_number(day) for _ in range(7)]
+        
+        self.assertEqual(numbers[0], "CMA202603020001")
+        self.assertEqual(numbers[-1], "CMA202603020007")
+        self.assertEqual(self._counter("20260302"), 11)  # Two blocks reserved
+    
+    def test_separate_allocators_get_disjoint_blocks(self):
+        day = datetime(2026, 3, 2)
+        first, second = ReceiptAllocator(block_size=10), ReceiptAllocator(block_size=10)
+        
+        numbers = first.reserve(3, day) + second.reserve(3, day) + first.reserve(1, day)
+        
+        self.assertEqual(len(set(numbers)), 7)
+        self.assertEqual(second.reserve(1, day)[0], "CMA202603020014")
+    
+    def test_bulk_reserve_and_new_day(self):
+        allocator = ReceiptAllocator(block_size=5)
+        
+        bulk = allocator.reserve(12, datetime(2026, 3, 2))
+        self.assertEqual(bulk, [f"CMA2026030200{n:02d}" for n in range(1, 13)])
+        self.assertEqual(allocator.next_number(datetime(2026, 3, 3)), "CMA202603030001")
+    
+    def test_concurrent_threads_never_collide(self):
+        day = datetime(2026, 3, 2)
+        allocators = [ReceiptAllocator(block_size=3) for _ in range(4)]
+        results = []
+        
+        def worker(allocator):
+            for _ in range(10):
+                results.append(allocator.next_number(day))
+        
+        threads = [threading.Thread(target=worker, args=(allocator,)) for allocator in allocators]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(len(results), 40)
+        self.assertEqual(len(set(results)), 40)
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
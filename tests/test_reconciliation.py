@@ -0,0 +1,92 @@
+import io
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from models.base import Base
+from models.payment import Payment
+from models.student import Student
+from services.reconciliation import parse_statement, reconcile_statement
+
+STATEMENT = """Txn Date,Narration,UTR No,Debit,Credit
+02/03/2026,UPI/Asha/9390241364,UTR001,,"4,000.00"
+03/03/2026,UPI/Ben payment 2016168147,UTR777,,2500
+04/03/2026,ATM withdrawal,,500,
+05/03/2026,UPI/Chitra/9876543210,UTR900,,1200
+06/03/2026,UPI/unknown/9000000000,UTR901,,999
+"""
+
+class TestStatementReconciliation(unittest.TestCase):
+
+    def setUp(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        self.db = sessionmaker(bind=engine)()
+        self.addCleanup(self.db.close)
+        
+        self.db.add_all([
+            Student(id=1, name="Asha", phone="9390241364", instructor="Aditya"),
+            Student(id=2, name="Ben", phone="2016168147", country_code="+1", instructor="Brahmani"),
+            Student(id=3, name="Chitra", phone="9876543210", instructor="Aditya"),
+            Payment(id=1, student_id=1, receipt_number="R1", amount=4000, payment_date=datetime(2026, 3, 2),
+                    transaction_id="utr-001", status="pending"),
+            Payment(id=2, student_id=2, receipt_number="R2", amount=2500, payment_date=datetime(2026, 3, 1)),
+            Payment(id=3, student_id=1, receipt_number="R3", amount=2500, payment_date=datetime(2026, 3, 3))
+        ])
+        self.db.commit()
+        
+        self.allocator = MagicMock()
+        self.allocator.reserve.side_effect = lambda count: [f"CMA-NEW-{n}" for n in range(count)]
+    
+    def test_parse_statement_skips_debits(self):
+        lines = list(parse_statement(io.StringIO(STATEMENT)))
+        
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(lines[0]["amount"], 4000)
+        self.assertEqual(lines[0]["phone"], "9390241364")
+        self.assertEqual(lines[1]["date"], datetime(2026, 3, 3))
+    
+    def test_reconcile_matches_and_creates_pending(self):
+        result = reconcile_statement(self.db, STATEMENT.encode(), allocator=self.allocator)
+        
+        self.assertEqual(result["by_reference"], 1)
+        self.assertEqual(result["by_fallback"], 1)
+        self.assertEqual(result["created_pending"], 1)
+        self.assertEqual(result["unmatched"], 1)
+        self.assertEqual(result["unmatched_lines"][0]["reference"], "UTR901")
+        
+        first, second, third = (self.db.get(Payment, i) for i in (1, 2, 3))
+        self.assertEqual(first.status, "completed")
+        self.assertIsNotNone(first.reconciled_at)
+        # Same amount, but only Ben's payment matches the statement phone
+        self.assertEqual(second.statement_reference, "UTR777")
+        self.assertIsNone(third.reconciled_at)
+        
+        created = self.db.query(Payment).filter(Payment.receipt_number == "CMA-NEW-0").one()
+        self.assertEqual((created.student_id, created.status, created.transaction_id), (3, "pending", "UTR900"))
+    
+    def test_reimport_is_idempotent(self):
+        reconcile_statement(self.db, STATEMENT.encode(), allocator=self.allocator)
+        result = reconcile_statement(self.db, STATEMENT.encode(), allocator=self.allocator)
+        
+        self.assertEqual(result["reconciled"], 0)
+        self.assertEqual(result["created_pending"], 0)
+        self.assertEqual(result["already_recorded"], 3)
+        self.assertIsNone(self.db.get(Payment, 3).reconciled_at)
+        self.assertEqual(self.db.query(Payment).count(), 4)
+    
+    def test_recorded_references_match_despite_formatting(self):
+        # Reconciled elsewhere with the reference typed differently from the statement
+        self.db.add(Payment(id=4, student_id=3, receipt_number="R4", amount=1200, payment_date=datetime(2026, 3, 5),
+                            transaction_id=" utr 900 ", reconciled_at=datetime(2026, 3, 6)))
+        self.db.commit()
+        
+        result = reconcile_statement(self.db, STATEMENT.encode(), allocator=self.allocator)
+        
+        self.assertEqual(result["already_recorded"], 1)
+        self.assertEqual(result["created_pending"], 0)
+        self.assertEqual(self.db.query(Payment).count(), 4)
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,105 @@
+import unittest
+from datetime import datetime
+from sqlalchemy import create_engine, event, update
+from sqlalchemy.orm import sessionmaker
+from models.base import Base
+from models.attendance import Attendance
+from models.enrollment import Enrollment
+from models.payment import Payment
+from models.student import Student
+from services.reports import run_report, clear_report_cache
+
+class TestReports(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        self.addCleanup(self.db.close)
+        
+        self.db.add_all([
+            Student(id=1, name="Asha", phone="1", instructor="Aditya", preferred_instrument="Piano"),
+            Student(id=2, name="Ben", phone="2", instructor="Brahmani", preferred_instrument="Guitar"),
+            Enrollment(id=1, student_id=1, package_type="1_month_8", total_classes=8, fee_amount=4000,
+                       start_date=datetime(2026, 2, 1), end_date=datetime(2026, 3, 1), status="expired"),
+            Enrollment(id=2, student_id=1, package_type="1_month_8", total_classes=8, fee_amount=4000,
+                       start_date=datetime(2026, 3, 1), end_date=datetime(2026, 4, 1)),
+            Enrollment(id=3, student_id=2, package_type="3_months_24", total_classes=24, fee_amount=11000,
+                       start_date=datetime(2026, 3, 1), end_date=datetime(2026, 6, 1))
+        ])
+        payments = [(1, 1, 4000, datetime(2026, 2, 2), "completed"), (1, 2, 4000, datetime(2026, 3, 2), "completed"),
+                    (2, 3, 5000, datetime(2026, 3, 3), "completed"), (2, 3, 6000, datetime(2026, 3, 4), "failed")]
+        for number, (student_id, enrollment_id, amount, paid_on, status) in enumerate(payments):
+            self.db.add(Payment(student_id=student_id, enrollment_id=enrollment_id, receipt_number=f"R{number}",
+                                amount=amount, payment_date=paid_on, status=status))
+        for day, status in enumerate(["present", "absent", "makeup", "cancelled"], start=2):
+            self.db.add(Attendance(student_id=1, enrollment_id=2, instructor="Aditya",
+                                   class_date=datetime(2026, 3, day, 17, 0), status=status))
+        self.db.commit()
+    
+    def test_revenue_by_month_and_instructor(self):
+        result = run_report(self.db, "revenue")
+        
+        self.assertEqual(result["columns"], ["month", "instructor", "revenue", "payments"])
+        self.assertEqual(result["rows"], [["2026-02", "Aditya", 4000, 1], ["2026-03", "Aditya", 4000, 1],
+                                          ["2026-03", "Brahmani", 5000, 1]])
+    
+    def test_filters_and_other_measures(self):
+        revenue = run_report(self.db, "revenue", dimensions=["instrument"],
+                             filters={"start": datetime(2026, 3, 1), "instructor": "Aditya"})
+        self.assertEqual(revenue["rows"], [["Piano", 4000, 1]])
+        
+        attendance = run_report(self.db, "attendance", dimensions=["instructor"])
+        self.assertEqual(attendance["rows"], [["Aditya", 2, 66.7]])
+        
+        enrollments = run_report(self.db, "enrollments")
+        self.assertEqual(enrollments["rows"], [["1_month_8", 1, 2], ["3_months_24", 1, 1]])
+    
+    def test_cache_hit_until_data_changes(self):
+        first = run_report(self.db, "revenue")
+        
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(self.engine, "before_cursor_execute", listener)
+        second = run_report(self.db, "revenue")
+        event.remove(self.engine, "before_cursor_execute", listener)
+        
+        self.assertFalse(first["cached"])
+        self.assertTrue(second["cached"])
+        self.assertEqual(second["rows"], first["rows"])
+        self.assertEqual(len(statements), 2)  # Data version + cache lookup
+        
+        self.db.add(Payment(student_id=2, enrollment_id=3, receipt_number="R9", amount=1000,
+                            payment_date=datetime(2026, 3, 5)))
+        self.db.commit()
+        third = run_report(self.db, "revenue")
+        self.assertFalse(third["cached"])
+        self.assertEqual(third["rows"][-1], ["2026-03", "Brahmani", 6000, 2])
+        
+        self.assertEqual(clear_report_cache(self.db, "revenue"), 1)
+    
+    def test_cache_sees_writes_within_the_same_second(self):
+        run_report(self.db, "revenue")
+        
+        # Same row count, same max id and no clock tick: only the version counter moves
+        self.db.execute(update(Payment).where(Payment.receipt_number == "R2").values(amount=5500))
+        self.db.commit()
+        self.assertEqual(run_report(self.db, "revenue")["rows"][-1], ["2026-03", "Brahmani", 5500, 1])
+        
+        self.db.get(Payment, 1).status = "failed"
+        self.db.commit()
+        result = run_report(self.db, "revenue")
+        self.assertFalse(result["cached"])
+        self.assertEqual(result["rows"][0], ["2026-03", "Aditya", 4000, 1])
+        
+        # A rolled back write leaves the cache valid
+        self.db.execute(update(Payment).values(amount=1))
+        self.db.rollback()
+        self.assertTrue(run_report(self.db, "revenue")["cached"])
+    
+    def test_unknown_dimension(self):
+        with self.assertRaises(ValueError):
+            run_report(self.db, "revenue", dimensions=["colour"])
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,81 @@
+import unittest
+from datetime import datetime
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from models.base import Base
+from models.class_schedule import ClassSchedule
+from models.class_schedule_exception import ClassScheduleException
+from services.schedule_engine import ScheduleEngine
+
+class TestScheduleEngine(unittest.TestCase):
+
+    def setUp(self):
+        engine = self.sql_engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        self.db = sessionmaker(bind=engine)()
+        self.addCleanup(self.db.close)
+        
+        self.db.add_all([
+            # Every Monday and Thursday at 18:00 since January
+            ClassSchedule(id=1, student_id=1, enrollment_id=1, instructor="Aditya",
+                          class_date=datetime(2026, 1, 5, 18, 0), duration_minutes=45,
+                          is_recurring=True, recurrence_rule="FREQ=WEEKLY;BYDAY=MO,TH"),
+            ClassSchedule(id=2, student_id=2, enrollment_id=2, instructor="Aditya",
+                          class_date=datetime(2026, 3, 3, 10, 0)),
+            ClassSchedule(id=3, student_id=3, enrollment_id=3, instructor="Brahmani",
+                          class_date=datetime(2026, 3, 3, 11, 0), is_recurring=True,
+                          recurrence_rule="RRULE:FREQ=DAILY"),
+            ClassScheduleException(class_schedule_id=1, original_date=datetime(2026, 3, 2, 18, 0), status="cancelled"),
+            ClassScheduleException(class_schedule_id=1, original_date=datetime(2026, 3, 5, 18, 0), status="rescheduled",
+                                   new_date=datetime(2026, 3, 7, 9, 0), new_duration_minutes=60)
+        ])
+        self.db.commit()
+        self.engine = ScheduleEngine()
+    
+    def test_week_expands_series_and_applies_exceptions(self):
+        occurrences = self.engine.week(self.db, "Aditya", datetime(2026, 3, 2))
+        
+        self.assertEqual(
+            [(o["schedule_id"], o["start"], o["status"]) for o in occurrences],
+            [(2, datetime(2026, 3, 3, 10, 0), "scheduled"),
+             (1, datetime(2026, 3, 7, 9, 0), "rescheduled")]
+        )
+        self.assertEqual(occurrences[1]["original_start"], datetime(2026, 3, 5, 18, 0))
+        self.assertEqual(occurrences[1]["end"], datetime(2026, 3, 7, 10, 0))
+    
+    def test_unmodified_week_and_rule_cache(self):
+        occurrences = self.engine.week(self.db, "Aditya", datetime(2026, 3, 9))
+        
+        self.assertEqual([o["start"] for o in occurrences],
+                         [datetime(2026, 3, 9, 18, 0), datetime(2026, 3, 12, 18, 0)])
+        self.assertEqual(occurrences[0]["duration_minutes"], 45)
+        
+        cached_rule = self.engine._rule(1, "FREQ=WEEKLY;BYDAY=MO,TH", datetime(2026, 1, 5, 18, 0))
+        self.engine.week(self.db, "Aditya", datetime(2026, 3, 16))
+        self.assertIs(self.engine._rule(1, "FREQ=WEEKLY;BYDAY=MO,TH", datetime(2026, 1, 5, 18, 0)), cached_rule)
+    
+    def test_window_filters_by_student(self):
+        occurrences = self.engine.occurrences(self.db, datetime(2026, 3, 1), datetime(2026, 3, 6), student_id=3)
+        
+        self.assertEqual(len(occurrences), 3)
+        self.assertTrue(all(o["instructor"] == "Brahmani" for o in occurrences))
+    
+    def test_window_queries_use_indexes(self):
+        statements = []
+        
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if "FROM class_schedules" in statement:
+                statements.append((statement, parameters))
+        event.listen(self.sql_engine, "before_cursor_execute", capture)
+        self.engine.week(self.db, "Aditya", datetime(2026, 3, 9))
+        event.remove(self.sql_engine, "before_cursor_execute", capture)
+        
+        self.assertEqual(len(statements), 2)
+        for statement, parameters in statements:
+            plan = " ".join(row[-1] for row in self.db.connection().exec_driver_sql(
+                "EXPLAIN QUERY PLAN " + statement, parameters))
+            self.assertNotIn("SCAN class_schedules", plan)
+        self.assertIn("ix_class_schedules_instructor_recurring_class_date", plan)
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
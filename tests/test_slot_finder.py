@@ -0,0 +1,46 @@
+import unittest
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from models.base import Base
+from models.class_schedule import ClassSchedule
+from models.student import Student
+from services.slot_finder import find_free_slots
+
+class TestSlotFinder(unittest.TestCase):
+
+    def setUp(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        self.db = sessionmaker(bind=engine)()
+        self.addCleanup(self.db.close)
+        
+        self.db.add_all([
+            Student(id=1, name="Asha", phone="1", instructor="Aditya", timezone="Asia/Kolkata"),
+            Student(id=2, name="Ben", phone="2", instructor="Aditya", timezone="America/New_York"),
+            ClassSchedule(id=1, student_id=3, enrollment_id=3, instructor="Aditya",
+                          class_date=datetime(2026, 3, 2, 9, 0), duration_minutes=60),
+            ClassSchedule(id=2, student_id=1, enrollment_id=1, instructor="Brahmani",
+                          class_date=datetime(2026, 3, 2, 10, 30), duration_minutes=60)
+        ])
+        self.db.commit()
+    
+    def test_skips_instructor_and_student_bookings(self):
+        slots = find_free_slots(self.db, "Aditya", 1, datetime(2026, 3, 2), datetime(2026, 3, 3),
+                                duration_minutes=60, top_k=3, per_day=3)
+        
+        # 9:00 Aditya busy, 10:30-11:30 student busy, so 10:00 cannot fit an hour
+        self.assertEqual([s["start"] for s in slots],
+                         [datetime(2026, 3, 2, 11, 30), datetime(2026, 3, 2, 12, 30), datetime(2026, 3, 2, 13, 30)])
+    
+    def test_respects_student_timezone(self):
+        slots = find_free_slots(self.db, "Aditya", 2, datetime(2026, 3, 2), datetime(2026, 3, 4),
+                                duration_minutes=60, top_k=1)
+        
+        # 07:00 in New York (EST) is 17:30 in Kolkata
+        self.assertEqual(slots[0]["start"], datetime(2026, 3, 2, 17, 30))
+        self.assertEqual(slots[0]["student_start"], datetime(2026, 3, 2, 7, 0))
+        self.assertEqual(slots[0]["student_timezone"], "America/New_York")
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
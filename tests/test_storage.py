@@ -0,0 +1,186 @@
+import hashlib
+import io
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from models.base import Base
+from models.file_blob import FileBlob
+from models.material import Material
+from services.materials import remove_material
+from services.storage import StorageService, _upload_digests
+from config import Config
+
+class TestStorageService(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        patcher = patch.multiple(Config, UPLOAD_DIR=self.temp_dir.name, UPLOAD_CHUNK_SIZE=4)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.temp_dir.cleanup)
+        self.service = StorageService()
+    
+    def test_save_stream_hashes_and_sizes(self):
+        content = b"C major scale, two octaves"
+        
+        result = self.service.save_stream(io.BytesIO(content), "scales.pdf", subfolder="materials")
+        
+        self.assertEqual(result["file_size"], len(content))
+        self.assertEqual(result["sha256"], hashlib.sha256(content).hexdigest())
+        with open(result["file_path"], 'rb') as f:
+            self.assertEqual(f.read(), content)
+        # No temp files left behind
+        self.assertEqual(os.listdir(os.path.dirname(result["file_path"])), ["scales.pdf"])
+    
+    def test_save_stream_checksum_mismatch(self):
+        with self.assertRaises(ValueError):
+            self.service.save_stream(io.BytesIO(b"data"), "bad.mp3", expected_sha256="0" * 64)
+        
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir.name, "bad.mp3")))
+    
+    def test_resumable_upload(self):
+        content = b"0123456789abcdef"
+        upload_id = self.service.start_upload()
+        
+        offset = self.service.append_chunk(upload_id, content[:6], 0)
+        # Resent chunk after a dropped connection is ignored
+        self.assertEqual(self.service.append_chunk(upload_id, content[:6], 0), offset)
+        # Overlapping chunk only appends the new tail
+        offset = self.service.append_chunk(upload_id, content[4:12], 4)
+        self.assertEqual(self.service.upload_offset(upload_id), 12)
+        with self.assertRaises(ValueError):
+            self.service.append_chunk(upload_id, content[14:], 14)
+        self.service.append_chunk(upload_id, content[12:], offset)
+        
+        # The running hash is used; the partial file is not read again
+        expected = hashlib.sha256(content).hexdigest()
+        with patch("services.storage.hashlib.sha256", side_effect=AssertionError("partial file re-hashed")):
+            result = self.service.complete_upload(upload_id, "lesson.mp4", expected_sha256=expected)
+        
+        self.assertEqual(result["file_size"], len(content))
+        with open(result["file_path"], 'rb') as f:
+            self.assertEqual(f.read(), content)
+        with self.assertRaises(FileNotFoundError):
+            self.service.upload_offset(upload_id)
+    
+    def test_upload_resumed_by_another_process(self):
+        content = b"Raga Mohanam arohanam"
+        upload_id = self.service.start_upload()
+        self.service.append_chunk(upload_id, content[:8], 0)
+        # A restarted server has no running hash for the upload
+        _upload_digests.clear()
+        self.service.append_chunk(upload_id, content[8:], 8)
+        
+        result = self.service.complete_upload(upload_id, "raga.mp3", subfolder="materials")
+        
+        self.assertEqual(result["sha256"], hashlib.sha256(content).hexdigest())
+        self.assertEqual(os.listdir(os.path.join(self.temp_dir.name, ".partial")), [])
+
+class TestContentAddressedStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        patcher = patch.multiple(Config, UPLOAD_DIR=self.temp_dir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.temp_dir.cleanup)
+        
+        # In-memory database shared by every session the service opens
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        self.Session = sessionmaker(bind=engine)
+        session_patcher = patch('services.storage.SessionLocal', self.Session)
+        session_patcher.start()
+        self.addCleanup(session_patcher.stop)
+        
+        self.service = StorageService(content_addressed=True)
+    
+    def test_duplicate_uploads_share_one_sharded_blob(self):
+        content = b"Backing track in G"
+        sha256 = hashlib.sha256(content).hexdigest()
+        
+        first = self.service.save_stream(io.BytesIO(content), "track.mp3")
+        second = self.service.save_stream(io.BytesIO(content), "track-copy.mp3")
+        
+        self.assertEqual(first["file_path"], second["file_path"])
+        self.assertFalse(first["deduplicated"])
+        self.assertTrue(second["deduplicated"])
+        self.assertTrue(first["file_path"].endswith(os.path.join("blobs", sha256[:2], sha256[2:4], f"{sha256}.mp3")))
+        
+        db = self.Session()
+        self.assertEqual(db.query(FileBlob).one().ref_count, 2)
+        db.close()
+    
+    def test_resumable_upload_becomes_a_blob(self):
+        content = b"Metronome at 80 bpm"
+        self.service.save_stream(io.BytesIO(content), "click.mp3")
+        upload_id = self.service.start_upload()
+        self.service.append_chunk(upload_id, content, 0)
+        
+        result = self.service.complete_upload(upload_id, "click-again.mp3")
+        
+        self.assertTrue(result["deduplicated"])
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir.name, ".partial", f"{upload_id}.part")))
+        db = self.Session()
+        self.assertEqual(db.query(FileBlob).one().ref_count, 2)
+        db.close()
+    
+    def test_release_and_garbage_collect(self):
+        result = self.service.save_stream(io.BytesIO(b"Scale sheet"), "scales.pdf")
+        file_path = result["file_path"]
+        
+        self.assertTrue(self.service.file_exists(file_path))
+        self.assertTrue(self.service.delete_file(file_path))
+        # Unreferenced but still on disk until collected
+        self.assertFalse(self.service.file_exists(file_path))
+        self.assertTrue(os.path.exists(file_path))
+        
+        summary = self.service.collect_garbage()
+        
+        self.assertEqual(summary["blobs_removed"], 1)
+        self.assertFalse(os.path.exists(file_path))
+        db = self.Session()
+        self.assertEqual(db.query(FileBlob).count(), 0)
+        db.close()
+    
+    def test_removing_materials_releases_their_blob(self):
+        file_path = self.service.save_stream(io.BytesIO(b"Backing track"), "track.mp3")["file_path"]
+        self.service.save_stream(io.BytesIO(b"Backing track"), "track.mp3")
+        db = self.Session()
+        db.add_all([Material(id=1, title="Track", instructor="Aditya", file_path=file_path),
+                    Material(id=2, title="Track copy", instructor="Aditya", file_path=file_path)])
+        db.commit()
+        
+        # Deleting goes through the blob's reference count even with content addressing switched off
+        with patch.object(Config, "CONTENT_ADDRESSED_STORAGE", False):
+            self.assertTrue(remove_material(db, 1))
+            self.assertFalse(remove_material(db, 1))
+            self.assertEqual(self.service.collect_garbage()["blobs_removed"], 0)
+            self.assertTrue(os.path.exists(file_path))
+            
+            self.assertTrue(remove_material(db, 2))
+        self.assertEqual(self.service.collect_garbage()["blobs_removed"], 1)
+        self.assertFalse(os.path.exists(file_path))
+        self.assertEqual([(m.is_active, m.file_path) for m in db.query(Material)], [(False, None), (False, None)])
+        db.close()
+    
+    def test_garbage_collect_removes_abandoned_uploads(self):
+        stale = self.service.start_upload()
+        self.service.append_chunk(stale, b"half a file", 0)
+        fresh = self.service.start_upload()
+        stale_path = os.path.join(self.temp_dir.name, ".partial", f"{stale}.part")
+        os.utime(stale_path, (0, 0))
+        
+        summary = self.service.collect_garbage(grace_seconds=3600)
+        
+        self.assertEqual(summary["uploads_removed"], 1)
+        self.assertFalse(os.path.exists(stale_path))
+        self.assertNotIn(stale, _upload_digests)
+        self.assertEqual(self.service.upload_offset(fresh), 0)
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
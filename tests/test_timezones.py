@@ -0,0 +1,37 @@
+import unittest
+from datetime import datetime
+import pandas as pd
+from utils.timezones import get_zone, convert_times, add_local_times
+
+class TestTimezones(unittest.TestCase):
+
+    def test_zone_lookup_is_cached_and_falls_back(self):
+        self.assertIs(get_zone("America/New_York"), get_zone("America/New_York"))
+        self.assertEqual(get_zone("Not/AZone").zone, "Asia/Kolkata")
+    
+    def test_convert_times(self):
+        converted = convert_times([datetime(2026, 3, 2, 18, 0)], "Pacific/Auckland")
+        self.assertEqual(converted.iloc[0], pd.Timestamp(2026, 3, 3, 1, 30))
+    
+    def test_add_local_times_per_student_zone(self):
+        df = pd.DataFrame({
+            "class_date": [datetime(2026, 3, 2, 18, 0), datetime(2026, 3, 2, 19, 0), datetime(2026, 3, 2, 20, 0)],
+            "student_timezone": ["America/New_York", None, "America/New_York"]
+        })
+        result = add_local_times(df, "UTC")
+        
+        self.assertEqual(list(result["my_time"]), [pd.Timestamp(2026, 3, 2, 12, 30),
+                                                   pd.Timestamp(2026, 3, 2, 13, 30),
+                                                   pd.Timestamp(2026, 3, 2, 14, 30)])
+        self.assertEqual(list(result["student_time"]), [pd.Timestamp(2026, 3, 2, 7, 30),
+                                                        pd.Timestamp(2026, 3, 2, 19, 0),
+                                                        pd.Timestamp(2026, 3, 2, 9, 30)])
+    
+    def test_empty_frame(self):
+        df = pd.DataFrame({"class_date": pd.Series(dtype="datetime64[ns]"), "student_timezone": pd.Series(dtype=object)})
+        result = add_local_times(df, "UTC")
+        self.assertTrue(result.empty)
+        self.assertIn("student_time", result.columns)
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
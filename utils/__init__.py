@@ -1,7 +1,13 @@
-from .auth import hash_password, verify_password, create_access_token
+from .auth import (
+    hash_password, verify_password, create_access_token, decode_access_token, revoke_token,
+    sign_url_path, verify_url_signature
+)
 from .helpers import generate_receipt_number, format_currency, calculate_expiry_date
+from .timezones import get_zone, convert_times, convert_column_by_zone, add_local_times
 
 __all__ = [
-    'hash_password', 'verify_password', 'create_access_token',
-    'generate_receipt_number', 'format_currency', 'calculate_expiry_date'
+    'hash_password', 'verify_password', 'create_access_token', 'decode_access_token', 'revoke_token',
+    'sign_url_path', 'verify_url_signature',
+    'generate_receipt_number', 'format_currency', 'calculate_expiry_date',
+    'get_zone', 'convert_times', 'convert_column_by_zone', 'add_local_times'
 ]
\ No newline at end of file
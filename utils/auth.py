@@ -1,10 +1,22 @@
+import base64
 import bcrypt
+import hashlib
+import hmac
+import json
 import secrets
+import time
 from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy.exc import IntegrityError
+from config import Config
+from models.revoked_token import RevokedToken
 
-def hash_password(password: str) -> str:
-    """Hash password using bcrypt"""
-    salt = bcrypt.gensalt()
+def hash_password(password: str, rounds: int = None) -> str:
+    """Hash password using bcrypt at the password policy's cost unless given"""
+    if rounds is None:
+        from services.password_policy import current_rounds
+        rounds = current_rounds()
+    salt = bcrypt.gensalt(rounds=rounds)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
@@ -12,6 +24,99 @@ def verify_password(password: str, hashed_password: str) -> bool:
     """Verify password against hash"""
     return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
 
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+# Placeholder secrets that must never sign session tokens
+INSECURE_SECRET_KEYS = ("", "dev-secret-key", "your-secret-key-here")
+
+def secret_key_is_set() -> bool:
+    """Whether SECRET_KEY has been changed from its placeholder default"""
+    return (Config.SECRET_KEY or "") not in INSECURE_SECRET_KEYS
+
+def require_secret_key():
+    """Refuse to start while SECRET_KEY is unset or a known placeholder"""
+    if not secret_key_is_set():
+        raise RuntimeError("SECRET_KEY is unset or a placeholder; set a long random value in the environment "
+                           "(e.g. python -c \"import secrets; print(secrets.token_urlsafe(48))\")")
+
+def _token_signature(payload: str) -> str:
+    return _b64encode(hmac.new(Config.SECRET_KEY.encode('utf-8'), payload.encode('ascii'), hashlib.sha256).digest())
+
 def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
-    """Create access token (simplified for demo)"""
-    return secrets.token_urlsafe(32)
\ No newline at end of file
+    """Create a stateless session token: base64url JSON claims plus an HMAC-SHA256 signature.
+    
+    ``data`` (e.g. the user id as ``sub``) is carried as-is alongside the
+    expiry (``exp``) and a random token id (``jti``) that revoke_token
+    records in the revoked_tokens table.
+    Claims are readable by anyone holding the token, so keep authorization
+    data such as roles out of them.
+    """
+    require_secret_key()
+    expires_delta = expires_delta or timedelta(seconds=Config.SESSION_TOKEN_TTL)
+    claims = dict(data, exp=int(time.time() + expires_delta.total_seconds()), jti=secrets.token_urlsafe(12))
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode('utf-8'))
+    return f"{payload}.{_token_signature(payload)}"
+
+def decode_access_token(token: str) -> Optional[dict]:
+    """Claims of a validly signed, unexpired token, otherwise None.
+    
+    Only the signature and expiry are checked; use session_claims to also
+    reject tokens revoked at logout.
+    """
+    if not secret_key_is_set():
+        return None
+    try:
+        payload, signature = (token or "").split(".")
+        if not hmac.compare_digest(_token_signature(payload), signature):
+            return None
+        claims = json.loads(_b64decode(payload))
+    except (ValueError, UnicodeError):
+        return None
+    if not isinstance(claims, dict) or not isinstance(claims.get("exp"), int) or claims["exp"] < time.time():
+        return None
+    return claims
+
+def session_claims(db, token: str) -> Optional[dict]:
+    """Claims of a valid token that has not been revoked, otherwise None"""
+    claims = decode_access_token(token)
+    if not claims or db.query(RevokedToken.id).filter(RevokedToken.jti == claims.get("jti")).first():
+        return None
+    return claims
+
+def revoke_token(db, token: str) -> bool:
+    """Reject a token from now on, e.g. at logout; False if it was already invalid or revoked.
+    
+    The token id is stored in revoked_tokens until the token would have
+    expired anyway, so logouts survive restarts and hold across workers.
+    Expired entries are purged on the way.
+    """
+    claims = decode_access_token(token)
+    if not claims:
+        return False
+    try:
+        db.query(RevokedToken).filter(RevokedToken.expires_at < datetime.now()).delete(synchronize_session=False)
+        db.add(RevokedToken(jti=claims["jti"], expires_at=datetime.fromtimestamp(claims["exp"])))
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return False
+    return True
+
+def sign_url_path(path: str, expires: int) -> str:
+    """Sign a URL path with an expiry timestamp using the app secret"""
+    message = f"{path}:{expires}".encode('utf-8')
+    return hmac.new(Config.SECRET_KEY.encode('utf-8'), message, hashlib.sha256).hexdigest()
+
+def verify_url_signature(path: str, expires: str, signature: str) -> bool:
+    """Check a signed URL path has a valid signature and has not expired"""
+    try:
+        expires_at = int(expires)
+    except (TypeError, ValueError):
+        return False
+    if expires_at < time.time():
+        return False
+    return hmac.compare_digest(sign_url_path(path, expires_at), signature or "")
\ No newline at end of file
@@ -0,0 +1,19 @@
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+
+def dialect_insert(db, table):
+    """Return an INSERT for the session's dialect.
+    
+    SQLite and PostgreSQL inserts support on_conflict_do_update/do_nothing;
+    other dialects get a plain insert.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        return sqlite.insert(table)
+    if dialect == "postgresql":
+        return postgresql.insert(table)
+    return insert(table)
+
+def supports_upsert(db) -> bool:
+    """Whether dialect_insert supports ON CONFLICT clauses"""
+    return db.get_bind().dialect.name in ("sqlite", "postgresql")
\ No newline at end of file
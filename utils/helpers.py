@@ -1,13 +1,10 @@
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
-import random
-import string
 
 def generate_receipt_number() -> str:
-    """Generate unique receipt number"""
-    timestamp = datetime.now().strftime("%Y%m%d")
-    random_part = ''.join(random.choices(string.digits, k=4))
-    return f"CMA{timestamp}{random_part}"
+    """Generate unique receipt number from the per-day receipt sequence"""
+    from services.receipts import get_receipt_allocator
+    return get_receipt_allocator().next_number()
 
 def format_currency(amount: float) -> str:
     """Format amount as Indian currency"""
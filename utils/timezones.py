@@ -0,0 +1,56 @@
+import logging
+from functools import lru_cache
+import pandas as pd
+import pytz
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+@lru_cache(maxsize=256)
+def get_zone(name: str):
+    """Cached pytz zone for a name, falling back to the academy timezone"""
+    try:
+        return pytz.timezone(name or Config.TIMEZONE)
+    except pytz.UnknownTimeZoneError:
+        logger.warning(f"Unknown timezone {name!r}, using {Config.TIMEZONE}")
+        return pytz.timezone(Config.TIMEZONE)
+
+def convert_times(values, to_zone: str, from_zone: str = None) -> pd.Series:
+    """Convert naive wall-clock datetimes between zones in one vectorized pass.
+    
+    ``values`` are naive datetimes in ``from_zone`` (the academy timezone by
+    default, as stored in class_date); the result is naive in ``to_zone``.
+    """
+    series = pd.to_datetime(pd.Series(values))
+    if series.empty:
+        return series
+    localized = series.dt.tz_localize(get_zone(from_zone or Config.TIMEZONE),
+                                      ambiguous="NaT", nonexistent="shift_forward")
+    return localized.dt.tz_convert(get_zone(to_zone)).dt.tz_localize(None)
+
+def convert_column_by_zone(df: pd.DataFrame, column: str, zone_column: str,
+                           from_zone: str = None) -> pd.Series:
+    """Convert a datetime column into a per-row target zone.
+    
+    Rows are grouped by ``zone_column`` so each distinct zone is converted
+    with a single vectorized call, however many rows share it.
+    """
+    if df.empty:
+        return pd.Series(index=df.index, dtype="datetime64[ns]")
+    parts = []
+    for zone_name, group in df.groupby(df[zone_column].fillna(Config.TIMEZONE), sort=False):
+        converted = convert_times(group[column], zone_name, from_zone)
+        converted.index = group.index
+        parts.append(converted)
+    return pd.concat(parts).reindex(df.index)
+
+def add_local_times(df: pd.DataFrame, viewer_zone: str, column: str = "class_date",
+                    student_zone_column: str = "student_timezone") -> pd.DataFrame:
+    """Add "my_time" and "student_time" columns for a schedule table"""
+    df = df.copy()
+    my_time = convert_times(df[column], viewer_zone)
+    my_time.index = df.index
+    df["my_time"] = my_time
+    if student_zone_column in df.columns:
+        df["student_time"] = convert_column_by_zone(df, column, student_zone_column)
+    return df
\ No newline at end of file